@@ -0,0 +1,39 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_CASES = {
+    'package': ['-c', 'import orangebeard'],
+    'entity': ['-c', 'from orangebeard.entity.Log import Log'],
+    'config': ['-c', 'from orangebeard.config import AutoConfig; AutoConfig.config'],
+    'client': ['-c', 'from orangebeard import OrangebeardClient; OrangebeardClient.__name__'],
+    'cli --help': ['-m', 'orangebeard.Cli', '--help'],
+}
+
+
+def measure(arguments: list[str], repeat: int) -> float:
+    """The median wall time in seconds of running the interpreter with the given arguments, in a fresh process."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.imports',
+                                     description='Measure the time it takes to import the client and start the CLI')
+    parser.add_argument('-n', '--repeat', type=int, default=10, help='The number of runs per case')
+    args = parser.parse_args()
+
+    baseline = measure(['-c', 'pass'], args.repeat)
+    print(f'interpreter start-up: {baseline * 1000:.1f} ms (subtracted below)')
+    for name, arguments in IMPORT_CASES.items():
+        print(f'{name:<12} {(measure(arguments, args.repeat) - baseline) * 1000:>8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
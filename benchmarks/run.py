@@ -0,0 +1,121 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.scenarios import SCENARIOS, Scenario
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from tests.mock_listener import MockListener
+
+_TIMED_METHODS = ('start_test_run', 'finish_test_run', 'start_suite', 'start_test', 'finish_test', 'start_step',
+                  'finish_step', 'log', 'send_attachment')
+
+
+class _TimedClient:
+    """Passes calls on to a client, adding up the time the calling thread spends in each public method."""
+
+    def __init__(self, client: OrangebeardClient) -> None:
+        self.__client = client
+        self.calls: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+
+    def __getattr__(self, name: str):
+        method = getattr(self.__client, name)
+        if name not in _TIMED_METHODS:
+            return method
+
+        def timed(*args):
+            started = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+                self.calls[name] = self.calls.get(name, 0) + 1
+
+        return timed
+
+
+def run_scenario(scenario: Scenario) -> dict:
+    """
+    Report a scenario's test run to a fresh mock listener.
+
+    Returns:
+        dict: The wall time, requests per second, peak RSS of the process, blocking time per client method and the
+        request and response counts of the listener.
+    """
+    with MockListener(**scenario.listener) as listener:
+        settings = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                         project='benchmark', **scenario.settings)
+        client = _TimedClient(OrangebeardClient(orangebeard_config=settings))
+        started = time.perf_counter()
+        scenario.run(client)
+        wall_time = time.perf_counter() - started
+
+        return {
+            'scenario': scenario.name,
+            'wall_seconds': round(wall_time, 3),
+            'requests': listener.requests,
+            'requests_per_second': round(listener.requests / wall_time, 1),
+            'mb_sent': round(listener.bytes_received / 1024 / 1024, 2),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'blocking': {name: {'calls': client.calls[name],
+                                'total_ms': round(client.seconds[name] * 1000, 2),
+                                'mean_us': round(client.seconds[name] / client.calls[name] * 1_000_000, 1)}
+                         for name in _TIMED_METHODS if name in client.calls},
+            'endpoints': listener.counts(),
+            'statuses': listener.statuses(),
+            'client': client.stats()
+        }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _print_result(result: dict) -> None:
+    print(f"{result['scenario']}: {result['wall_seconds']} s, {result['requests']} requests "
+          f"({result['requests_per_second']}/s), {result['mb_sent']} MB sent, peak RSS {result['peak_rss_mb']} MB")
+    for name, blocking in result['blocking'].items():
+        print(f"  {name:<16} {blocking['calls']:>7} calls {blocking['total_ms']:>10} ms "
+              f"{blocking['mean_us']:>10} us/call")
+    print(f"  responses: {', '.join(f'{status}: {count}' for status, count in sorted(result['statuses'].items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description='Measure the client against a local mock Orangebeard listener')
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f'The scenarios to run, all by default: {", ".join(SCENARIOS)}')
+    parser.add_argument('-o', '--output', help='A file to write the results to as JSON', default=None)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f'unknown scenario {", ".join(unknown)}')
+    args.scenarios = args.scenarios or list(SCENARIOS)
+
+    if len(args.scenarios) == 1:
+        results = [run_scenario(SCENARIOS[args.scenarios[0]])]
+    else:
+        # one process per scenario, so the peak RSS of one does not carry over to the next; the client's own
+        # output comes before the JSON line
+        results = [json.loads(subprocess.run([sys.executable, '-m', 'benchmarks.run', '--json', name],
+                                             check=True, capture_output=True, text=True).stdout.splitlines()[-1])[0]
+                   for name in args.scenarios]
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for result in results:
+            _print_result(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+from datetime import datetime
+
+import pytz
+
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishStep import FinishStep
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.StartStep import StartStep
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus
+from orangebeard.entity.TestType import TestType
+
+
+class Scenario:
+    """
+        A test run shape to report: suites × tests × steps × logs, with optional attachments, against a mock listener
+        with the given behaviour and a client with the given settings.
+
+        Args:
+            name (str): The name to select the scenario by.
+            description (str): What the scenario measures.
+            suites (int): The number of suites, each two levels deep.
+            tests (int): The number of tests per suite.
+            steps (int): The number of steps per test.
+            logs (int): The number of logs per step.
+            attachment_size (int): The size in bytes of the attachment sent per test, 0 for none.
+            listener (dict): Keyword arguments for MockListener.
+            settings (dict): Client settings, as OrangebeardParameters keyword arguments.
+        """
+
+    def __init__(self, name: str, description: str, suites: int, tests: int, steps: int, logs: int,
+                 attachment_size: int = 0, listener: dict = None, settings: dict = None) -> None:
+        self.name = name
+        self.description = description
+        self.suites = suites
+        self.tests = tests
+        self.steps = steps
+        self.logs = logs
+        self.attachment_size = attachment_size
+        self.listener = listener or {}
+        self.settings = settings or {}
+
+    def run(self, client) -> None:
+        """Report the test run through a client with the public methods of OrangebeardClient."""
+        attachment_content = os.urandom(self.attachment_size) if self.attachment_size else None
+        test_run_uuid = client.start_test_run(StartTestRun('benchmark', _now(), self.description))
+        for suite in range(self.suites):
+            suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['benchmark', f'suite {suite}']))[-1]
+            for test in range(self.tests):
+                test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, f'test {test}', _now(),
+                                                        TestType.TEST))
+                log_uuid = None
+                for step in range(self.steps):
+                    step_uuid = client.start_step(StartStep(test_run_uuid, test_uuid, f'step {step}', _now()))
+                    for line in range(self.logs):
+                        log_uuid = client.log(Log(test_run_uuid, test_uuid, f'{self.name} log line {line}',
+                                                  LogLevel.INFO, LogFormat.PLAIN_TEXT, step_uuid, _now()))
+                    client.finish_step(step_uuid, FinishStep(test_run_uuid, TestStatus.PASSED, _now()))
+                if attachment_content is not None:
+                    if log_uuid is None:
+                        log_uuid = client.log(Log(test_run_uuid, test_uuid, 'attachment', LogLevel.INFO,
+                                                  LogFormat.PLAIN_TEXT, None, _now()))
+                    client.send_attachment(Attachment(AttachmentFile(f'test-{test}.bin', attachment_content),
+                                                      AttachmentMetaData(test_run_uuid, test_uuid, log_uuid)))
+                client.finish_test(test_uuid, FinishTest(test_run_uuid, TestStatus.PASSED, _now()))
+        client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+
+def _now() -> datetime:
+    return datetime.now(pytz.utc)
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario('small', 'A short run with few logs', suites=2, tests=10, steps=2, logs=5),
+    Scenario('logs', 'A run dominated by logs', suites=4, tests=25, steps=4, logs=50),
+    Scenario('batched', 'The logs scenario with logs sent in batches of 100',
+             suites=4, tests=25, steps=4, logs=50, settings={'log_batch_size': 100}),
+    Scenario('background', 'The logs scenario with the event loop in a background thread',
+             suites=4, tests=25, steps=4, logs=50, settings={'background_loop': True}),
+    Scenario('attachments', 'A run sending a 5 MB attachment per test', suites=2, tests=10, steps=1, logs=2,
+             attachment_size=5 * 1024 * 1024),
+    Scenario('slow', 'The small scenario against a listener with 50 ms latency',
+             suites=2, tests=10, steps=2, logs=5, listener={'latency': 0.05}),
+    Scenario('flaky', 'The small scenario against a listener failing 5% and throttling 5% of the requests',
+             suites=2, tests=10, steps=2, logs=5,
+             listener={'error_rate': 0.05, 'throttle_rate': 0.05, 'retry_after': 0.05, 'seed': 1}),
+)}
@@ -0,0 +1,141 @@
+import asyncio
+from uuid import UUID
+
+from orangebeard.ClientStats import RequestHook
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.entity.Attachment import Attachment
+from orangebeard.entity.FinishStep import FinishStep
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartStep import StartStep
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+
+
+class AsyncOrangebeardClient:
+    """
+        Reports to Orangebeard from async code, on the caller's event loop: no loop of its own and no threads, so it
+        works within pytest-asyncio, Playwright async and other frameworks that already run a loop. Create it and make
+        all calls on that loop.
+
+        Every reporting method comes in two variants, both returning the temporary UUID to refer to the entity with:
+        the coroutine waits until Orangebeard has accepted the call, the _nowait variant only hands the call to the
+        client and returns at once. wait_for waits for a call made earlier. With logBatchSize, awaiting a log sends
+        the batch holding it right away, without waiting for logBatchDelay.
+
+        Args:
+            endpoint (str): The Orangebeard API endpoint.
+            access_token (UUID): The access token for authentication.
+            project_name (str): The name of the Orangebeard project.
+            orangebeard_config (OrangebeardParameters): Configuration, as for OrangebeardClient. backgroundLoop is
+            ignored.
+            retry_policy (RetryPolicy): Decides when failed calls are retried, RetryPolicy() if not given.
+        """
+
+    def __init__(
+            self,
+            endpoint: str = None,
+            access_token: UUID = None,
+            project_name: str = None,
+            orangebeard_config: OrangebeardParameters = None,
+            retry_policy: RetryPolicy = None
+    ) -> None:
+        self.__client = OrangebeardClient(endpoint, access_token, project_name, orangebeard_config, retry_policy,
+                                          event_loop=asyncio.get_running_loop())
+
+    async def wait_for(self, temp_uuid: UUID) -> UUID | None:
+        """
+        Wait until a call is done. Calls whose entity was finished and released already are done.
+
+        Args:
+            temp_uuid (UUID): The temporary UUID returned for the call.
+
+        Returns:
+            UUID: The real UUID assigned by Orangebeard, or None if the call failed, does not create an entity or was
+            released too long ago to be remembered.
+        """
+        resolution = self.__client.resolutions.get(temp_uuid)
+        return await resolution.wait() if resolution is not None else None
+
+    async def start_test_run(self, start_test_run: StartTestRun) -> UUID:
+        return await self.__completed(self.start_test_run_nowait(start_test_run))
+
+    def start_test_run_nowait(self, start_test_run: StartTestRun) -> UUID:
+        return self.__client.start_test_run(start_test_run)
+
+    async def start_announced_test_run(self, test_run_uuid: UUID) -> None:
+        self.start_announced_test_run_nowait(test_run_uuid)
+        await self.__completed(test_run_uuid)
+
+    def start_announced_test_run_nowait(self, test_run_uuid: UUID) -> None:
+        self.__client.start_announced_test_run(test_run_uuid)
+
+    async def finish_test_run(self, test_run_uuid: UUID, finish_test_run: FinishTestRun) -> None:
+        """Wait for all calls to finish, then finish the test run and close the connections."""
+        await self.__client.finish_test_run(test_run_uuid, finish_test_run)
+
+    async def start_suite(self, start_suite: StartSuite) -> list[UUID]:
+        temp_uuids = self.start_suite_nowait(start_suite)
+        await asyncio.gather(*(self.wait_for(temp_uuid) for temp_uuid in temp_uuids))
+        return temp_uuids
+
+    def start_suite_nowait(self, start_suite: StartSuite) -> list[UUID]:
+        return self.__client.start_suite(start_suite)
+
+    async def start_test(self, start_test: StartTest) -> UUID:
+        return await self.__completed(self.start_test_nowait(start_test))
+
+    def start_test_nowait(self, start_test: StartTest) -> UUID:
+        return self.__client.start_test(start_test)
+
+    async def finish_test(self, test_uuid: UUID, finish_test: FinishTest) -> UUID:
+        return await self.__completed(self.finish_test_nowait(test_uuid, finish_test))
+
+    def finish_test_nowait(self, test_uuid: UUID, finish_test: FinishTest) -> UUID:
+        return self.__client.finish_test(test_uuid, finish_test)
+
+    async def start_step(self, start_step: StartStep) -> UUID:
+        return await self.__completed(self.start_step_nowait(start_step))
+
+    def start_step_nowait(self, start_step: StartStep) -> UUID:
+        return self.__client.start_step(start_step)
+
+    async def finish_step(self, step_uuid: UUID, finish_step: FinishStep) -> UUID:
+        return await self.__completed(self.finish_step_nowait(step_uuid, finish_step))
+
+    def finish_step_nowait(self, step_uuid: UUID, finish_step: FinishStep) -> UUID:
+        return self.__client.finish_step(step_uuid, finish_step)
+
+    async def log(self, log: Log) -> UUID:
+        return await self.__completed(self.log_nowait(log))
+
+    def log_nowait(self, log: Log) -> UUID:
+        return self.__client.log(log)
+
+    async def send_attachment(self, attachment: Attachment) -> UUID:
+        return await self.__completed(self.send_attachment_nowait(attachment))
+
+    def send_attachment_nowait(self, attachment: Attachment) -> UUID:
+        return self.__client.send_attachment(attachment)
+
+    async def close(self) -> None:
+        """Close the connections to Orangebeard, when done without finishing a test run."""
+        task = self.__client.close()
+        if task is not None:
+            await task
+
+    def stats(self) -> dict:
+        """A snapshot of the client's metrics, see OrangebeardClient.stats."""
+        return self.__client.stats()
+
+    def add_request_hook(self, hook: RequestHook) -> None:
+        """Register a function to call after every API request attempt, see OrangebeardClient.add_request_hook."""
+        self.__client.add_request_hook(hook)
+
+    async def __completed(self, temp_uuid: UUID) -> UUID:
+        await self.wait_for(temp_uuid)
+        return temp_uuid
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from orangebeard.entity.Attachment import AttachmentFile
+
+_COMPRESSIBLE_CONTENT_TYPES = ('text/', 'application/json', 'application/xml', 'application/javascript',
+                               'application/x-ndjson', 'image/svg+xml')
+_COMPRESSIBLE_EXTENSIONS = ('.csv', '.har', '.html', '.js', '.json', '.log', '.md', '.svg', '.txt', '.xml', '.yaml',
+                            '.yml')
+_MIN_COMPRESSED_SIZE = 1024
+_CHUNK_SIZE = 1024 * 1024
+
+
+class AttachmentProcessor:
+    """
+        Prepares attachments for upload by gzipping compressible content. Compressed payloads are cached by the
+        SHA-256 digest of their content, so content that is attached many times in a run is compressed only once.
+        The methods do blocking I/O and are meant to run in an executor.
+        Compression is not transparent: compressed files are uploaded with a .gz suffix and the application/gzip
+        content type, and Orangebeard keeps them that way, so they are downloaded as .gz files.
+        Large files are compressed into temporary files. A temporary file handed out by prepare is kept until it is
+        released, also when it is evicted from the cache meanwhile.
+
+        Args:
+            cache_size (int): The maximum number of compressed payloads to keep.
+        """
+
+    def __init__(self, cache_size: int = 64) -> None:
+        self.__cache_size = cache_size
+        self.__cache: OrderedDict[str, AttachmentFile | None] = OrderedDict()
+        self.__users: dict[str, int] = {}
+        self.__evicted: set[str] = set()
+        self.__lock = threading.Lock()
+        self.__temp_dir = None
+
+    def prepare(self, file: AttachmentFile) -> AttachmentFile:
+        """
+        Compress an attachment file if applicable. Pass the returned file to release once it was uploaded.
+
+        Args:
+            file (AttachmentFile): The file to upload.
+
+        Returns:
+            AttachmentFile: The file to upload instead, which is the given file if it is not compressed.
+        """
+        if not self.__is_compressible(file):
+            return file
+        digest = self.digest(file)
+
+        with self.__lock:
+            if digest in self.__cache:
+                self.__cache.move_to_end(digest)
+                return self.__handed_out(self.__cache[digest], file)
+
+        compressed = self.__gzip(file, digest)
+        with self.__lock:
+            self.__cache[digest] = compressed
+            while len(self.__cache) > self.__cache_size:
+                _, evicted = self.__cache.popitem(last=False)
+                if evicted is not None and evicted.path is not None:
+                    if self.__users.get(evicted.path):
+                        self.__evicted.add(evicted.path)
+                    else:
+                        os.remove(evicted.path)
+            return self.__handed_out(compressed, file)
+
+    def release(self, file: AttachmentFile) -> None:
+        """
+        Let go of a file returned by prepare, removing its temporary file if it was evicted and is not used anymore.
+
+        Args:
+            file (AttachmentFile): The file prepare returned.
+        """
+        with self.__lock:
+            users = self.__users.get(file.path)
+            if users is None:
+                return
+            if users > 1:
+                self.__users[file.path] = users - 1
+                return
+            del self.__users[file.path]
+            if file.path in self.__evicted:
+                self.__evicted.discard(file.path)
+                os.remove(file.path)
+
+    def close(self) -> None:
+        """Forget all cached payloads and remove their temporary files."""
+        with self.__lock:
+            self.__cache.clear()
+            self.__users.clear()
+            self.__evicted.clear()
+            if self.__temp_dir is not None:
+                shutil.rmtree(self.__temp_dir, ignore_errors=True)
+                self.__temp_dir = None
+
+    @staticmethod
+    def digest(file: AttachmentFile) -> str:
+        hasher = hashlib.sha256()
+        with file.reader() as content:
+            if isinstance(content, bytes):
+                hasher.update(content)
+            else:
+                for chunk in iter(lambda: content.read(_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def __is_compressible(file: AttachmentFile) -> bool:
+        return (file.contentType.startswith(_COMPRESSIBLE_CONTENT_TYPES)
+                or file.name.lower().endswith(_COMPRESSIBLE_EXTENSIONS))
+
+    def __handed_out(self, compressed: AttachmentFile | None, file: AttachmentFile) -> AttachmentFile:
+        """The compressed file to upload under the name of the original one; must be called holding the lock."""
+        if compressed is None:
+            return file
+        renamed = AttachmentFile(f'{file.name}.gz', compressed.content, compressed.path)
+        renamed.contentType = 'application/gzip'
+        if compressed.path is not None:
+            self.__users[compressed.path] = self.__users.get(compressed.path, 0) + 1
+        return renamed
+
+    def __gzip(self, file: AttachmentFile, digest: str) -> AttachmentFile | None:
+        """Compress the content into memory or a temporary file; returns None when that does not make it smaller."""
+        if file.path is None:
+            if len(file.content) < _MIN_COMPRESSED_SIZE:
+                return None
+            compressed_content = gzip.compress(file.content, mtime=0)
+            if len(compressed_content) >= len(file.content):
+                return None
+            return AttachmentFile(digest, compressed_content)
+
+        if os.path.getsize(file.path) < _MIN_COMPRESSED_SIZE:
+            return None
+        with self.__lock:
+            if self.__temp_dir is None:
+                self.__temp_dir = tempfile.mkdtemp(prefix='orangebeard-attachments-')
+            handle, compressed_path = tempfile.mkstemp(suffix='.gz', dir=self.__temp_dir)
+        with file.reader() as source, os.fdopen(handle, 'wb') as temp_file, \
+                gzip.GzipFile(fileobj=temp_file, mode='wb', mtime=0) as target:
+            shutil.copyfileobj(source, target, _CHUNK_SIZE)
+        if os.path.getsize(compressed_path) >= os.path.getsize(file.path):
+            os.remove(compressed_path)
+            return None
+        return AttachmentFile(digest, path=compressed_path)
@@ -1,55 +1,92 @@
 import argparse
-import asyncio
 import sys
+import time
+from uuid import UUID
 
-from datetime import datetime
-
-from orangebeard.OrangebeardClient import OrangebeardClient
 from orangebeard.config import AutoConfig
 from orangebeard.entity.FinishTestRun import FinishTestRun
 from orangebeard.entity.StartTestRun import StartTestRun
-from pytz import reference
-
-tz = reference.LocalTimezone()
+from orangebeard.entity.Timestamp import now
 
 
 def main():
-    config = AutoConfig.config
-
     parser = argparse.ArgumentParser(prog="Orangebeard CommandLine Utility",
-                                     description="CLI to start or finish a test run")
-    parser.add_argument('-e', '--endpoint', help="Your Orangebeard endpoint", default=config.endpoint)
-    parser.add_argument('-t', '--accessToken', help="Your Orangebeard Access Token", default=config.token)
-    parser.add_argument('-p', '--project', help="Orangebeard Project Name", default=config.project)
-    parser.add_argument('-x', '--cmd', required=True, choices=['start', 'finish'], help="Command to execute")
-    parser.add_argument('-s', '--testset', help="The testset name", default=config.testset)
-    parser.add_argument('-d', '--description', help="The test run description", default=config.description)
+                                     description="CLI to start or finish a test run, replay a spool file, import "
+                                                 "test results or log the output of a process")
+    parser.add_argument('-e', '--endpoint', help="Your Orangebeard endpoint", default=None)
+    parser.add_argument('-t', '--accessToken', help="Your Orangebeard Access Token", default=None)
+    parser.add_argument('-p', '--project', help="Orangebeard Project Name", default=None)
+    parser.add_argument('-x', '--cmd', required=True, choices=['start', 'finish', 'replay', 'import', 'log'],
+                        help="Command to execute")
+    parser.add_argument('-s', '--testset', help="The testset name", default=None)
+    parser.add_argument('-d', '--description', help="The test run description", default=None)
     parser.add_argument('-a', '--attributes', help="Test run attributes", default=None)
-    parser.add_argument('-id', '--testRunUuid', help="The UUID of the test run to finish, required for finish",
-                        default=None)
+    parser.add_argument('-id', '--testRunUuid',
+                        help="The UUID of the test run to finish, required for finish and log. For import, the "
+                             "running test run to import into instead of a new one", default=None)
+    parser.add_argument('-f', '--file', help="The spool file to send, required for replay. For import, the JUnit XML "
+                                             "or NDJSON result file", default=None)
+    parser.add_argument('--format', choices=['junit', 'ndjson'], default=None,
+                        help="The format of the result file to import, by its extension if not given")
+    parser.add_argument('--testUuid', default=None,
+                        help="For log, the UUID of the test to log to. A test named after --testName is started and "
+                             "finished around the output if not given")
+    parser.add_argument('--stepUuid', default=None, help="For log, the UUID of a step of the test to log to")
+    parser.add_argument('--testName', default='stdin', help="For log, the name of the test to start")
+    parser.add_argument('--window', type=float, default=1.0,
+                        help="For log, the maximum time in seconds a line of output is held back")
+    parser.add_argument('--tee', action='store_true', help="For log, copy the output to stdout as well")
 
     args = parser.parse_args()
 
-    config.endpoint = args.endpoint
-    config.token = args.accessToken
-    config.project = args.project
-    config.testset = args.testset
-    config.description = args.description
+    # read the configuration and import the client only now, so --help and argument errors come back quickly
+    from orangebeard.OrangebeardClient import OrangebeardClient
+
+    config = AutoConfig.config
+    config.endpoint = args.endpoint if args.endpoint is not None else config.endpoint
+    config.token = args.accessToken if args.accessToken is not None else config.token
+    config.project = args.project if args.project is not None else config.project
+    config.testset = args.testset if args.testset is not None else config.testset
+    config.description = args.description if args.description is not None else config.description
 
+    if args.cmd in ("start", "finish", "replay"):
+        # these calls are made one at a time and must be done before the CLI exits
+        config.backgroundLoop = False
     if args.attributes is not None:
         config.attributes = config.attributes.extend(AutoConfig.get_attributes_from_string(args.attributes))
+    if args.cmd == "import" and args.file is not None:
+        config.backgroundLoop = True
+        config.maxInFlight = max(config.maxInFlight, 64)
+        if args.testRunUuid is not None:
+            config.testrun_uuid = UUID(args.testRunUuid)
+    if args.cmd == "log" and args.testRunUuid is not None:
+        config.backgroundLoop = True
+        config.testrun_uuid = UUID(args.testRunUuid)
 
     client = OrangebeardClient(orangebeard_config=config)
 
     if args.cmd == "start":
-        temp_uuid = client.start_test_run(StartTestRun(config.testset, datetime.now(tz), config.description, config.attributes), True)
-        asyncio.gather(client.call_events[temp_uuid].wait())
-        print(client.uuid_mapping[temp_uuid])
+        temp_uuid = client.start_test_run(StartTestRun(config.testset, now(), config.description, config.attributes), True)
+        client.close()
+        print(client.resolutions[temp_uuid].real_uuid)
+        sys.exit(0)
+
+    elif args.cmd == "replay" and args.file is not None:
+        client.replay_spool(args.file)
+        client.close()
+        sys.exit(0)
+
+    elif args.cmd == "import" and args.file is not None:
+        import_results(client, config, args.file, args.format)
+        sys.exit(0)
+
+    elif args.cmd == "log" and args.testRunUuid is not None:
+        log_stdin(client, config.testrun_uuid, args)
         sys.exit(0)
 
     else:
         if args.cmd == "finish" and args.testRunUuid is not None:
-            client.finish_test_run(args.testRunUuid, FinishTestRun(datetime.now(tz)), True)
+            client.finish_test_run(args.testRunUuid, FinishTestRun(now()), True)
             print('Orangebeard report Finished!')
             sys.exit(0)
 
@@ -57,5 +94,53 @@ def main():
     sys.exit(1)
 
 
+def import_results(client, config, file: str, file_format: str = None) -> None:
+    from orangebeard.ResultImporter import ResultImporter, read_junit, read_ndjson
+
+    if file_format is None:
+        file_format = 'junit' if file.lower().endswith('.xml') else 'ndjson'
+    started = time.perf_counter()
+    if config.testrun_uuid is not None:
+        test_run_uuid = config.testrun_uuid
+    else:
+        test_run_uuid = client.start_test_run(StartTestRun(config.testset, now(), config.description,
+                                                           config.attributes))
+
+    importer = ResultImporter(client, test_run_uuid)
+    importer.report(read_junit(file) if file_format == 'junit' else read_ndjson(file))
+    client.finish_test_run(test_run_uuid, FinishTestRun(now()))
+
+    elapsed = time.perf_counter() - started
+    counts = importer.counts
+    print(f"Imported {counts['tests']} tests, {counts['logs']} logs and {counts['attachments']} attachments "
+          f"in {elapsed:.1f} seconds ({counts['tests'] / elapsed:.0f} tests per second)")
+
+
+def log_stdin(client, test_run_uuid: UUID, args) -> None:
+    import io
+
+    from orangebeard.LogStreamer import LogStreamer
+    from orangebeard.entity.FinishTest import FinishTest
+    from orangebeard.entity.StartSuite import StartSuite
+    from orangebeard.entity.StartTest import StartTest
+    from orangebeard.entity.TestStatus import TestStatus
+    from orangebeard.entity.TestType import TestType
+
+    if args.testUuid is not None:
+        test_uuid = client.register_external_uuid(UUID(args.testUuid), test_run_uuid)
+    else:
+        suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['orangebeard-cli']))[-1]
+        test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, args.testName, now(), TestType.TEST))
+    step_uuid = client.register_external_uuid(UUID(args.stepUuid), test_uuid) if args.stepUuid is not None else None
+
+    streamer = LogStreamer(client, test_run_uuid, test_uuid, step_uuid, window=args.window)
+    streamer.stream(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace'),
+                    sys.stdout if args.tee else None)
+    if args.testUuid is None:
+        client.finish_test(test_uuid, FinishTest(test_run_uuid, TestStatus.PASSED, now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(now()))
+    print(f"Logged {streamer.counts['lines']} lines in {streamer.counts['logs']} logs", file=sys.stderr)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,172 @@
+import bisect
+import re
+import threading
+from typing import Callable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ENDPOINT_PREFIX = re.compile(r'^/?listener/v3/[^/]+/')
+_UUID_SEGMENT = re.compile(r'/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+RequestHook = Callable[[str, 'int | None', float, int], None]
+
+
+class _EndpointStats:
+    __slots__ = ('requests', 'retries', 'bytes_sent', 'statuses', 'latency_buckets', 'latency_sum')
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.statuses: dict[str, int] = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+
+class ClientStats:
+    """
+        Collects metrics on the API requests of a client: per endpoint the number of requests, retries, response
+        statuses, bytes sent and a latency histogram, plus the time the calling threads spent blocked. Endpoints are
+        named by method and path, with the project and UUIDs left out, e.g. "PUT test/finish/{id}".
+        Request hooks are called with the endpoint, the response status (None for connection errors), the latency in
+        seconds and the number of bytes sent, on the client's event loop thread; they must return quickly.
+        Thread-safe.
+        """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__endpoints: dict[str, _EndpointStats] = {}
+        self.__blocked_seconds = 0.0
+        self.__blocked_calls = 0
+        self.__hooks: list[RequestHook] = []
+
+    @staticmethod
+    def endpoint(method: str, uri: str) -> str:
+        return f'{method} {_UUID_SEGMENT.sub("/{id}", _ENDPOINT_PREFIX.sub("", uri))}'
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """
+        Register a function to call after every request attempt.
+
+        Args:
+            hook (Callable): Called with the endpoint, status, latency and bytes sent.
+        """
+        with self.__lock:
+            self.__hooks.append(hook)
+
+    def record_request(self, endpoint: str, status: int | None, latency: float, bytes_sent: int,
+                       retry: bool) -> None:
+        """
+        Record a request attempt.
+
+        Args:
+            endpoint (str): The endpoint, as returned by endpoint().
+            status (int): The response status, None if there was no response.
+            latency (float): The time in seconds from sending the request to its outcome.
+            bytes_sent (int): The size of the request body.
+            retry (bool): Whether the attempt was a retry.
+        """
+        with self.__lock:
+            stats = self.__endpoints.get(endpoint)
+            if stats is None:
+                stats = self.__endpoints[endpoint] = _EndpointStats()
+            stats.requests += 1
+            stats.retries += retry
+            stats.bytes_sent += bytes_sent
+            status_key = str(status) if status is not None else 'error'
+            stats.statuses[status_key] = stats.statuses.get(status_key, 0) + 1
+            stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.latency_sum += latency
+            hooks = list(self.__hooks)
+        for hook in hooks:
+            hook(endpoint, status, latency, bytes_sent)
+
+    def record_blocked(self, seconds: float) -> None:
+        """Record time a calling thread spent waiting for the client."""
+        with self.__lock:
+            self.__blocked_seconds += seconds
+            self.__blocked_calls += 1
+
+    def snapshot(self) -> dict:
+        """
+        The metrics collected so far.
+
+        Returns:
+            dict: "endpoints" with the metrics per endpoint, the latency histogram holding cumulative counts by upper
+            bound in seconds, and "blocked" with the time calling threads spent blocked.
+        """
+        with self.__lock:
+            endpoints = {}
+            for name, stats in self.__endpoints.items():
+                cumulative = 0
+                histogram = {}
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), stats.latency_buckets):
+                    cumulative += count
+                    histogram['+Inf' if bound == float('inf') else str(bound)] = cumulative
+                endpoints[name] = {
+                    'requests': stats.requests,
+                    'retries': stats.retries,
+                    'bytes_sent': stats.bytes_sent,
+                    'statuses': dict(stats.statuses),
+                    'latency_seconds': {'sum': stats.latency_sum, 'buckets': histogram}
+                }
+            return {
+                'endpoints': endpoints,
+                'blocked': {'seconds': self.__blocked_seconds, 'calls': self.__blocked_calls}
+            }
+
+
+def to_prometheus(snapshot: dict, prefix: str = 'orangebeard_client') -> str:
+    """
+    Format a stats snapshot of OrangebeardClient.stats() in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): The snapshot.
+        prefix (str): The prefix of the metric names.
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+    lines = []
+
+    def metric(name: str, metric_type: str, help_text: str) -> str:
+        full_name = f'{prefix}_{name}'
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} {metric_type}')
+        return full_name
+
+    def labels(**values) -> str:
+        return '{' + ','.join(f'{key}="{_escape_label(str(value))}"' for key, value in values.items()) + '}'
+
+    endpoints = snapshot.get('endpoints', {})
+    name = metric('requests_total', 'counter', 'API request attempts by endpoint and response status.')
+    for endpoint, stats in endpoints.items():
+        for status, count in stats['statuses'].items():
+            lines.append(f'{name}{labels(endpoint=endpoint, status=status)} {count}')
+    name = metric('retries_total', 'counter', 'API request attempts that were retries.')
+    for endpoint, stats in endpoints.items():
+        lines.append(f'{name}{labels(endpoint=endpoint)} {stats["retries"]}')
+    name = metric('sent_bytes_total', 'counter', 'Request body bytes sent.')
+    for endpoint, stats in endpoints.items():
+        lines.append(f'{name}{labels(endpoint=endpoint)} {stats["bytes_sent"]}')
+    name = metric('request_duration_seconds', 'histogram', 'API request latency.')
+    for endpoint, stats in endpoints.items():
+        latency = stats['latency_seconds']
+        for bound, count in latency['buckets'].items():
+            lines.append(f'{name}_bucket{labels(endpoint=endpoint, le=bound)} {count}')
+        lines.append(f'{name}_sum{labels(endpoint=endpoint)} {latency["sum"]}')
+        lines.append(f'{name}_count{labels(endpoint=endpoint)} {stats["requests"]}')
+
+    name = metric('blocked_seconds_total', 'counter', 'Time calling threads spent blocked on the client.')
+    lines.append(f'{name} {snapshot["blocked"]["seconds"]}')
+    name = metric('calls_total', 'counter', 'Client calls by outcome.')
+    for outcome, count in snapshot.get('calls', {}).items():
+        lines.append(f'{name}{labels(outcome=outcome)} {count}')
+    name = metric('pending', 'gauge', 'Work waiting in the client.')
+    for kind, count in snapshot.get('pending', {}).items():
+        lines.append(f'{name}{labels(kind=kind)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from uuid import UUID
+
+from orangebeard.UuidResolution import UuidResolution
+
+_MAX_RELEASED = 65536
+
+
+class _Node:
+    __slots__ = ('temp_uuid', 'resolution', 'parent', 'children', 'pending', 'closed')
+
+    def __init__(self, temp_uuid: UUID, resolution: UuidResolution, parent: '_Node | None') -> None:
+        self.temp_uuid = temp_uuid
+        self.resolution = resolution
+        self.parent = parent
+        self.children: dict[UUID, _Node] = {}
+        self.pending = 0
+        self.closed = False
+
+
+class EntityRegistry:
+    """
+        Keeps the UuidResolution of every call in a tree that follows the reported entities: test run, suites, tests,
+        steps and logs, with attachments and finish calls as children of the entity they belong to.
+
+        A closed entity (its finish call completed) is released together with everything below it as soon as no call
+        in that subtree is pending anymore, so memory use does not grow with the length of a run. Logs, attachments and
+        finish calls are registered closed, so those of a test that is still running are released once done. The real
+        UUIDs of the last max_released released calls are kept, so a late log or attachment for a finished test, or an
+        attachment for a sent log, still finds the UUID it refers to; calls registered below a released entity are
+        released as soon as they resolve.
+        Registering and resolving may happen from different threads.
+
+        Args:
+            max_released (int): The number of released calls to keep the real UUID of.
+        """
+
+    def __init__(self, max_released: int = _MAX_RELEASED) -> None:
+        self.__nodes: dict[UUID, _Node] = {}
+        self.__released: OrderedDict[UUID, UUID | None] = OrderedDict()
+        self.__max_released = max_released
+        self.__lock = threading.Lock()
+
+    def __getitem__(self, temp_uuid: UUID) -> UuidResolution:
+        resolution = self.get(temp_uuid)
+        if resolution is None:
+            raise KeyError(temp_uuid)
+        return resolution
+
+    def __contains__(self, temp_uuid: UUID) -> bool:
+        return temp_uuid in self.__nodes
+
+    def __len__(self) -> int:
+        return len(self.__nodes)
+
+    def get(self, temp_uuid: UUID) -> UuidResolution | None:
+        """The resolution of a call, a resolved one if the call was released, None if it is not known (anymore)."""
+        node = self.__nodes.get(temp_uuid)
+        if node is not None:
+            return node.resolution
+        with self.__lock:
+            if temp_uuid not in self.__released:
+                return None
+            real_uuid = self.__released[temp_uuid]
+        resolution = UuidResolution(real_uuid)
+        if real_uuid is None:
+            resolution.resolve(None)
+        return resolution
+
+    def has_children(self, temp_uuid: UUID) -> bool:
+        """Whether calls were registered below an entity, such as the attachments of a log."""
+        node = self.__nodes.get(temp_uuid)
+        return node is not None and bool(node.children)
+
+    def items(self) -> list[tuple[UUID, UuidResolution]]:
+        """A snapshot of the registered temporary UUIDs and their resolutions."""
+        with self.__lock:
+            return [(temp_uuid, node.resolution) for temp_uuid, node in self.__nodes.items()]
+
+    def register(self, temp_uuid: UUID, parent_uuid: UUID = None, real_uuid: UUID = None,
+                 closed: bool = False) -> UuidResolution:
+        """
+        Register a call.
+
+        Args:
+            temp_uuid (UUID): The temporary UUID handed out for the call.
+            parent_uuid (UUID): The temporary UUID of the entity the call belongs to, if any.
+            real_uuid (UUID): The real UUID, if it is already known.
+            closed (bool): Whether the call is released as soon as it and the calls below it are done, as for logs,
+            attachments and finish calls, which are not finished by a call of their own.
+
+        Returns:
+            UuidResolution: The resolution of the call.
+        """
+        resolution = UuidResolution(real_uuid)
+        with self.__lock:
+            parent = self.__nodes.get(parent_uuid) if parent_uuid is not None else None
+            node = _Node(temp_uuid, resolution, parent)
+            node.closed = closed
+            self.__nodes[temp_uuid] = node
+            if parent is not None:
+                parent.children[temp_uuid] = node
+            elif parent_uuid in self.__released:
+                node.closed = True
+            if not resolution.is_set():
+                while node is not None:
+                    node.pending += 1
+                    node = node.parent
+            elif node.closed:
+                self.__release(node)
+        return resolution
+
+    def resolve(self, temp_uuid: UUID, real_uuid: UUID | None) -> None:
+        """
+        Resolve a call and release the closed entities that were only waiting for it.
+
+        Args:
+            temp_uuid (UUID): The temporary UUID of the call.
+            real_uuid (UUID): The real UUID, or None if the call did not yield one.
+        """
+        with self.__lock:
+            node = self.__nodes.get(temp_uuid)
+            if node is None or node.resolution.is_set():
+                return
+            node.resolution.resolve(real_uuid)
+            while node is not None:
+                node.pending -= 1
+                if node.closed and node.pending == 0:
+                    self.__release(node)
+                node = node.parent
+
+    def close(self, temp_uuid: UUID) -> None:
+        """
+        Mark an entity as finished, so it is released once nothing in its subtree is pending anymore.
+
+        Args:
+            temp_uuid (UUID): The temporary UUID of the entity.
+        """
+        with self.__lock:
+            node = self.__nodes.get(temp_uuid)
+            if node is None:
+                return
+            node.closed = True
+            if node.pending == 0:
+                self.__release(node)
+
+    def __release(self, node: _Node) -> None:
+        if node.parent is not None:
+            node.parent.children.pop(node.temp_uuid, None)
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.__nodes.pop(current.temp_uuid, None)
+            self.__released[current.temp_uuid] = current.resolution.real_uuid
+            stack.extend(current.children.values())
+            current.children = {}
+        while len(self.__released) > self.__max_released:
+            self.__released.popitem(last=False)
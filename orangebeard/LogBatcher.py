@@ -0,0 +1,119 @@
+import asyncio
+from typing import Awaitable, Callable, Coroutine
+from uuid import UUID
+
+from orangebeard.entity.Log import Log
+
+
+class BatchNotSupported(Exception):
+    """Raised when a probed batch endpoint is not available on the listener (404, 405 or 501)."""
+
+
+class LogBatcher:
+    """
+        Buffers logs per test/step and hands them to a sender in batches.
+
+        A buffer is flushed when it holds max_batch_size logs, when its oldest log has waited max_delay seconds, or
+        explicitly through flush() (e.g. when the test or step it belongs to finishes).
+        Must only be used from the thread that owns the event loop, or while the loop is not running.
+
+        Args:
+            event_loop (asyncio.AbstractEventLoop): The loop to run timers and flush tasks on.
+            send_batch (Callable): Coroutine function receiving a list of (Log, temporary UUID) tuples.
+            max_batch_size (int): The maximum number of logs in one batch.
+            max_delay (float): The maximum time in seconds a log is buffered.
+            submit (Callable): Runs a batch send as a task, such as RequestScheduler.submit; the loop's create_task if
+            not given.
+        """
+
+    def __init__(
+            self,
+            event_loop: asyncio.AbstractEventLoop,
+            send_batch: Callable[[list[tuple[Log, UUID]]], Awaitable[None]],
+            max_batch_size: int = 100,
+            max_delay: float = 1.0,
+            submit: Callable[[Coroutine], asyncio.Task] = None
+    ) -> None:
+        self.__event_loop = event_loop
+        self.__send_batch = send_batch
+        self.__submit = submit if submit is not None else event_loop.create_task
+        self.__max_batch_size = max_batch_size
+        self.__max_delay = max_delay
+        self.__buffers: dict[tuple[UUID, UUID | None], list[tuple[Log, UUID]]] = {}
+        self.__timers: dict[tuple[UUID, UUID | None], asyncio.TimerHandle] = {}
+        self.__flushing: dict[tuple[UUID, UUID | None], set[asyncio.Task]] = {}
+        self.__buffered = 0
+        self.__sending = 0
+
+    @property
+    def buffered(self) -> int:
+        """The number of logs waiting to be sent in a batch."""
+        return self.__buffered
+
+    @property
+    def sending(self) -> int:
+        """The number of logs in batches that were handed to the sender and are not done yet."""
+        return self.__sending
+
+    def add(self, log: Log, temp_uuid: UUID) -> None:
+        """
+        Buffer a log, grouped by the (temporary) test and step UUID it belongs to.
+
+        Args:
+            log (Log): The log to send.
+            temp_uuid (UUID): The temporary UUID handed out for this log.
+        """
+        key = (log.testUUID, log.stepUUID)
+        buffer = self.__buffers.setdefault(key, [])
+        buffer.append((log, temp_uuid))
+        self.__buffered += 1
+
+        if len(buffer) >= self.__max_batch_size:
+            self.__flush(key)
+        elif len(buffer) == 1:
+            self.__timers[key] = self.__event_loop.call_later(self.__max_delay, self.__flush, key)
+
+    def send_all(self) -> None:
+        """Hand all buffered logs to the sender, without waiting for them to be sent."""
+        for key in list(self.__buffers):
+            self.__flush(key)
+
+    async def flush(self, test_uuid: UUID = None, step_uuid: UUID = None) -> None:
+        """
+        Send the buffered logs and wait until they, and batches already being sent, are done.
+
+        Args:
+            test_uuid (UUID): Only flush the logs of this test, including its steps.
+            step_uuid (UUID): Only flush the logs of this step.
+        """
+        keys = [key for key in set(self.__buffers) | set(self.__flushing)
+                if (test_uuid is None or key[0] == test_uuid) and (step_uuid is None or key[1] == step_uuid)]
+        for key in keys:
+            self.__flush(key)
+
+        tasks = [task for key in keys for task in self.__flushing.get(key, ())]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __flush(self, key: tuple[UUID, UUID | None]) -> None:
+        timer = self.__timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self.__buffers.pop(key, None)
+        if not batch:
+            return
+        self.__buffered -= len(batch)
+        self.__sending += len(batch)
+
+        task = self.__submit(self.__send_batch(batch))
+        self.__flushing.setdefault(key, set()).add(task)
+        task.add_done_callback(lambda done_task: self.__discard(key, done_task, len(batch)))
+
+    def __discard(self, key: tuple[UUID, UUID | None], task: asyncio.Task, size: int) -> None:
+        self.__sending -= size
+        tasks = self.__flushing.get(key)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self.__flushing[key]
@@ -0,0 +1,125 @@
+import queue
+import re
+import threading
+import time
+from typing import TextIO
+from uuid import UUID
+
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.Timestamp import now
+
+_LEVEL_PATTERN = re.compile(r'\b(FATAL|CRITICAL|SEVERE|ERROR|ERR|WARNING|WARN|INFO|NOTICE|DEBUG|TRACE)\b'
+                            r'|\blevel=(\w+)', re.IGNORECASE)
+_LEVELS = {'FATAL': LogLevel.ERROR, 'CRITICAL': LogLevel.ERROR, 'SEVERE': LogLevel.ERROR, 'ERROR': LogLevel.ERROR,
+           'ERR': LogLevel.ERROR, 'WARNING': LogLevel.WARN, 'WARN': LogLevel.WARN, 'INFO': LogLevel.INFO,
+           'NOTICE': LogLevel.INFO, 'DEBUG': LogLevel.DEBUG, 'TRACE': LogLevel.DEBUG}
+_LEVEL_PREFIX_LENGTH = 48
+_MAX_PENDING_CALLS = 1000
+_END = object()
+
+
+def level_of(line: str) -> LogLevel | None:
+    """
+    The log level a line announces near its start: an upper case level name such as ERROR or [WARN], or level=...
+    in any case. None if the line does not announce one, as with the continuation lines of a stack trace.
+    """
+    for match in _LEVEL_PATTERN.finditer(line, 0, _LEVEL_PREFIX_LENGTH):
+        name, level_value = match.groups()
+        if name is not None and name.isupper():
+            return _LEVELS[name]
+        if level_value is not None and level_value.upper() in _LEVELS:
+            return _LEVELS[level_value.upper()]
+    return None
+
+
+class LogStreamer:
+    """
+        Reports the lines of a stream, such as the output of a long-running process, as logs of a test or step while
+        the stream is being written. Consecutive lines of the same level are combined into one log, which is sent
+        when it reaches max_size characters, when the level changes or when its first line has waited window seconds.
+        Lines without a level take the level of the line before them.
+
+        The stream is read in a separate thread into a queue of max_lines lines. When the client falls behind, the
+        queue fills up and reading pauses, which in turn makes the writing process wait, so nothing is buffered
+        without bound.
+
+        Args:
+            client (OrangebeardClient): The client to report through, preferably with backgroundLoop.
+            test_run_uuid (UUID): The UUID of the test run.
+            test_uuid (UUID): The UUID of the test to log to.
+            step_uuid (UUID): The UUID of the step to log to, if any.
+            window (float): The maximum time in seconds a line is held back.
+            max_size (int): The maximum number of characters in one log.
+            max_lines (int): The maximum number of lines read ahead.
+        """
+
+    def __init__(self, client, test_run_uuid: UUID, test_uuid: UUID, step_uuid: UUID = None, window: float = 1.0,
+                 max_size: int = 65536, max_lines: int = 10000) -> None:
+        self.__client = client
+        self.__test_run_uuid = test_run_uuid
+        self.__test_uuid = test_uuid
+        self.__step_uuid = step_uuid
+        self.__window = window
+        self.__max_size = max_size
+        self.__lines: queue.Queue = queue.Queue(max_lines)
+        self.counts = {'lines': 0, 'logs': 0}
+
+    def stream(self, source: TextIO, tee: TextIO = None) -> None:
+        """
+        Report the lines of a stream until it ends.
+
+        Args:
+            source (TextIO): The stream to read.
+            tee (TextIO): A stream to copy the lines to as they are read, such as stdout.
+        """
+        reader = threading.Thread(target=self.__read, args=(source, tee), name='orangebeard-log-reader', daemon=True)
+        reader.start()
+
+        level = LogLevel.INFO
+        lines: list[str] = []
+        size = 0
+        deadline = None
+        while True:
+            try:
+                line = self.__lines.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.__send(level, lines)
+                lines, size, deadline = [], 0, None
+                continue
+            if line is _END:
+                break
+
+            line = line.rstrip('\r\n')
+            line_level = level_of(line) or level
+            if lines and (line_level != level or size + len(line) > self.__max_size):
+                self.__send(level, lines)
+                lines, size, deadline = [], 0, None
+            level = line_level
+            lines.append(line)
+            size += len(line) + 1
+            self.counts['lines'] += 1
+            if deadline is None:
+                deadline = time.monotonic() + self.__window
+        self.__send(level, lines)
+        reader.join()
+
+    def __read(self, source: TextIO, tee: TextIO | None) -> None:
+        try:
+            for line in source:
+                if tee is not None:
+                    tee.write(line)
+                    tee.flush()
+                self.__lines.put(line)
+        finally:
+            self.__lines.put(_END)
+
+    def __send(self, level: LogLevel, lines: list[str]) -> None:
+        if not lines:
+            return
+        while self.__client.pending_work > _MAX_PENDING_CALLS:
+            time.sleep(0.05)
+        self.__client.log(Log(self.__test_run_uuid, self.__test_uuid, '\n'.join(lines), level, LogFormat.PLAIN_TEXT,
+                              self.__step_uuid, now()))
+        self.counts['logs'] += 1
@@ -1,16 +1,27 @@
 import asyncio
+import functools
+import gzip
+import json
+import os
+import threading
+import time
 import uuid
-from asyncio.locks import Event
 from types import MappingProxyType
-
-import aiohttp
+from typing import TYPE_CHECKING, BinaryIO, Coroutine
 
 from uuid import UUID
 
-from aiohttp import ContentTypeError, ClientError
-
+from orangebeard.AttachmentProcessor import AttachmentProcessor
+from orangebeard.ClientStats import ClientStats, RequestHook, to_prometheus
+from orangebeard.EntityRegistry import EntityRegistry
+from orangebeard.LogBatcher import BatchNotSupported, LogBatcher
+from orangebeard.RequestScheduler import RequestPriority, RequestScheduler
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.Spool import Spool, UUID_PATTERN, read_spool
+from orangebeard.SubmissionQueue import SubmissionQueue
+from orangebeard.UuidResolution import UuidResolution
 from orangebeard.config import AutoConfig
-from orangebeard.entity.Attachment import Attachment
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
 from orangebeard.entity.FinishStep import FinishStep
 from orangebeard.entity.FinishTest import FinishTest
 from orangebeard.entity.FinishTestRun import FinishTestRun
@@ -23,11 +34,19 @@ from orangebeard.entity.StartTest import StartTest
 from orangebeard.entity.StartTestRun import StartTestRun
 from orangebeard.entity.Suite import Suite
 
+if TYPE_CHECKING:
+    import aiohttp
+
 
 class OrangebeardClient:
     """
         OrangebeardClient class for interacting with the Orangebeard API.
 
+        A client can be shared by any number of threads, such as the workers of a thread pool. With backgroundLoop,
+        their calls are handed to the loop thread through a submission queue without waiting for each other; without
+        it, calls go onto the same queue and the threads take turns running the event loop until their own start call
+        is done, so a thread never holds the loop while waiting for a call another thread has not handed over yet.
+
         Args:
             endpoint (str): The Orangebeard API endpoint.
             access_token (UUID): The access token for authentication.
@@ -37,11 +56,35 @@ class OrangebeardClient:
             __endpoint (str): The Orangebeard API endpoint.
             __access_token (UUID): The access token for authentication.
             __project_name (str): The name of the Orangebeard project.
-            __connection_with_orangebeard_is_valid (bool): Flag indicating whether the connection with
-            Orangebeard is valid.
-            __uuid_mapping (dict): Mapping of temporary UUIDs to actual UUIDs.
-            __call_events (dict): Mapping of UUIDs to asyncio.Event objects.
-            __client (aiohttp.ClientSession): A client session for making API requests.
+            __retry_policy (RetryPolicy): Decides when failed calls are retried, with a circuit breaker shared by all
+            calls.
+            __spooling (bool): Whether calls go to the spool directly, which they do for the rest of the client's
+                life once a call has been spooled: later calls may refer to the entities of spooled ones, and the spool
+                must keep them in order.
+            __registry (EntityRegistry): The UuidResolution of every call by temporary UUID, in a tree that follows the
+            reported entities.
+            __client (aiohttp.ClientSession): A client session for making API requests, kept open for the lifetime of
+            the client.
+            __settings (OrangebeardParameters): The client settings, including the connection pool settings.
+            __loop_thread (threading.Thread): The thread running the event loop in background mode, None otherwise.
+            __submissions (SubmissionQueue): Hands calls to the thread running the event loop, None if the loop is the
+            caller's.
+            __loop_lock (threading.RLock): Lets one thread at a time run the event loop when it has no thread of its
+            own.
+            __attached (bool): Whether the client runs on the caller's event loop rather than its own.
+            __scheduler (RequestScheduler): Runs background calls and bounds the number of requests in flight.
+            __log_batcher (LogBatcher): Buffers logs to send them in batches, None if batching is disabled.
+            __log_batch_supported (bool): Whether the listener API accepts log batches.
+            __call_outcomes (dict): The number of API calls that succeeded, failed, were dropped or were spooled.
+            __spool (Spool): Keeps the calls that could not be delivered, for replay_spool. None if not configured.
+            __coalesce_window (float): Time in seconds test and step starts are deferred, None if they are not. Only
+                used with a background or attached loop.
+            __deferred_starts (dict): The deferred start calls that were not made yet, by temporary UUID.
+            __suite_paths (dict): The temporary UUIDs of started suites, by parent UUID and suite name path.
+            __suite_lock (threading.Lock): Keeps threads starting the same suite path from both starting it.
+            __stats (ClientStats): Metrics on the API requests and the time calling threads spent blocked.
+            __attachment_processor (AttachmentProcessor): Compresses attachments, None if disabled.
+            __log_size_limit (int): The maximum length of a log message, None for no limit.
         """
 
     def __init__(
@@ -49,7 +92,9 @@ class OrangebeardClient:
             endpoint: str = None,
             access_token: UUID = None,
             project_name: str = None,
-            orangebeard_config: OrangebeardParameters = None
+            orangebeard_config: OrangebeardParameters = None,
+            retry_policy: RetryPolicy = None,
+            event_loop: asyncio.AbstractEventLoop = None
     ) -> None:
         """
             Initialize the OrangebeardClient.
@@ -58,7 +103,15 @@ class OrangebeardClient:
                 endpoint (str): The Orangebeard API endpoint.
                 access_token (UUID): The access token for authentication.
                 project_name (str): The name of the Orangebeard project.
+                orangebeard_config (OrangebeardParameters): Configuration, also used for client settings such as
+                backgroundLoop, logBatchSize, logSizeLimit, maxInFlight, drainTimeout, attachmentCompression,
+                spoolDirectory, coalesceWindow, statsFile and the connection pool settings.
+                retry_policy (RetryPolicy): Decides when failed calls are retried, RetryPolicy() if not given.
+                event_loop (asyncio.AbstractEventLoop): A running event loop to attach to instead of creating one,
+                as AsyncOrangebeardClient does. All calls must then be made on that loop's thread; start calls do not
+                block, and finish_test_run, close and replay_spool return a task to await. backgroundLoop is ignored.
             """
+        settings = orangebeard_config
         if orangebeard_config is not None:
             endpoint = orangebeard_config.endpoint if endpoint is None else endpoint
             access_token = orangebeard_config.token if access_token is None else access_token
@@ -73,24 +126,60 @@ class OrangebeardClient:
             endpoint = config.endpoint
             access_token = config.token
             project_name = config.project
+            settings = config
+
+        if settings is None:
+            settings = OrangebeardParameters()
 
         self.__external_run_lifecycle = False
         self.__endpoint = endpoint
         self.__access_token = access_token
         self.__project_name = project_name
-        self.__connection_with_orangebeard_is_valid: bool = True
+        self.__retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.__spooling = False
         self.__client = None
-
-        self.__uuid_mapping = {}
-        self.__call_events = {}
-        self.__event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.__event_loop)
+        self.__settings = settings
+        self.__drain_timeout = settings.drainTimeout
+        self.__call_outcomes = {'succeeded': 0, 'failed': 0, 'dropped': 0, 'spooled': 0}
+        self.__spool = Spool(settings.spoolDirectory) if settings.spoolDirectory else None
+        self.__coalesce_window = None
+        self.__deferred_starts: dict[UUID, Coroutine] = {}
+        self.__suite_paths: dict[tuple[UUID, tuple[str, ...]], UUID] = {}
+        self.__suite_lock = threading.Lock()
+        self.__stats = ClientStats()
+        self.__log_size_limit = settings.logSizeLimit if settings.logSizeLimit else None
+
+        self.__registry = EntityRegistry()
+        self.__attached = event_loop is not None
+        self.__event_loop = event_loop if self.__attached else asyncio.new_event_loop()
+        self.__loop_thread = None
+        self.__submissions = SubmissionQueue(self.__event_loop) if not self.__attached else None
+        self.__loop_lock = threading.RLock()
+        if settings.backgroundLoop and not self.__attached:
+            self.__loop_thread = threading.Thread(target=self.__run_event_loop, name='orangebeard-event-loop',
+                                                  daemon=True)
+            self.__loop_thread.start()
+        elif not self.__attached:
+            asyncio.set_event_loop(self.__event_loop)
+        if settings.coalesceWindow and self.__loop_thread is None and not self.__attached:
+            # without a loop that keeps running between calls, the window would not close until the run finishes
+            print('Orangebeard coalesceWindow is ignored, as it needs backgroundLoop')
+        elif settings.coalesceWindow:
+            self.__coalesce_window = settings.coalesceWindow
+
+        self.__scheduler = RequestScheduler(self.__event_loop, settings.maxInFlight)
+        self.__log_batch_supported = True
+        self.__log_batcher = None
+        self.__attachment_processor = None
+        if settings.attachmentCompression:
+            self.__attachment_processor = AttachmentProcessor()
+        if settings.logBatchSize is not None and settings.logBatchSize > 1:
+            self.__log_batcher = LogBatcher(self.__event_loop, self.__exec_log_batch, settings.logBatchSize,
+                                            settings.logBatchDelay, self.__scheduler.submit)
 
         if orangebeard_config is not None and orangebeard_config.testrun_uuid is not None:
             self.__external_run_lifecycle = True
-            self.__call_events[orangebeard_config.testrun_uuid] = asyncio.Event()
-            self.__uuid_mapping[orangebeard_config.testrun_uuid] = orangebeard_config.testrun_uuid
-            self.__call_events[orangebeard_config.testrun_uuid].set()
+            self.__registry.register(orangebeard_config.testrun_uuid, real_uuid=orangebeard_config.testrun_uuid)
 
     def start_test_run(self, start_test_run: StartTestRun, direct=False) -> UUID:
         """
@@ -98,17 +187,15 @@ class OrangebeardClient:
 
         Args:
             start_test_run (StartTestRun): The StartTestRun object containing information about the test run.
-            direct: boolean indicating a standalone, direct cli call
+            direct: boolean indicating a standalone, direct cli call. Call close() when done with the client.
 
         Returns:
             UUID: The UUID associated with the started test run.
         """
         temp_uuid = uuid.uuid4()
-        start_test_run_event = asyncio.Event()
+        self.__registry.register(temp_uuid)
 
-        self.__call_events[temp_uuid] = start_test_run_event
-
-        self.__event_loop.run_until_complete(self.__exec_start_test_run(start_test_run, temp_uuid, direct))
+        self.__run(self.__exec_start_test_run(start_test_run, temp_uuid))
         return temp_uuid
 
     def start_announced_test_run(self, test_run_uuid: UUID) -> None:
@@ -118,26 +205,117 @@ class OrangebeardClient:
         Args:
             test_run_uuid (UUID): The UUID of the test run to be started.
         """
-        start_test_run_event = asyncio.Event()
-        self.__call_events[test_run_uuid] = start_test_run_event
-        self.__event_loop.run_until_complete(self.__exec_start_announced_test_run(test_run_uuid))
+        self.__registry.register(test_run_uuid)
+        self.__run(self.__exec_start_announced_test_run(test_run_uuid))
 
-    def finish_test_run(self, test_run_uuid: UUID, finish_test_run: FinishTestRun, direct=False) -> None:
+    def finish_test_run(self, test_run_uuid: UUID, finish_test_run: FinishTestRun,
+                        direct=False) -> asyncio.Task | None:
         """
-        Wait for all events to finish and then finish the test run.
+        Wait for all events to finish and then finish the test run. This call blocks, also in background mode,
+        and stops the background event loop once the test run is finished.
 
         Args:
             test_run_uuid (UUID): The UUID of the test run to be finished.
             finish_test_run (FinishTestRun): The FinishTestRun object containing information about finishing the
             test run.
             direct (Bool): indication that a standalone finish call is required. True for CLI
+
+        Returns:
+            asyncio.Task: The task to await when attached to the caller's event loop, None otherwise.
+        """
+        task = self.__run_to_completion(self.__exec_finish_test_run(test_run_uuid, finish_test_run, direct))
+        self.__stop_loop_thread()
+        return task
+
+    def close(self) -> asyncio.Task | None:
+        """
+        Close the connections to Orangebeard. Only needed when the client is done without finishing a test run,
+        as finish_test_run closes them as well; closing after that does nothing.
+
+        Returns:
+            asyncio.Task: The task to await when attached to the caller's event loop, None otherwise.
+        """
+        if self.__loop_thread is not None and not self.__loop_thread.is_alive():
+            return None  # finish_test_run stopped the background loop, after closing the connections
+        task = None
+        if self.__client is not None and not self.__client.closed and not self.__event_loop.is_closed():
+            task = self.__run_to_completion(self.__client.close())
+        self.__stop_loop_thread()
+        return task
+
+    def replay_spool(self, spool_file: str) -> asyncio.Task | None:
+        """
+        Send the calls kept in a spool file, in their original order, replacing the temporary UUIDs of spooled
+        entities with the real UUIDs returned while replaying. Calls that fail during replay are not spooled again.
+        A client that spooled calls itself sends everything to its spool, so the file must be replayed by another
+        client, such as the CLI's -x replay.
+
+        Args:
+            spool_file (str): The spool file written by a client with a spoolDirectory.
+
+        Returns:
+            asyncio.Task: The task to await when attached to the caller's event loop, None otherwise.
+
+        Raises:
+            RuntimeError: If this client spooled calls.
+        """
+        if self.__spooling:
+            raise RuntimeError('This client spools all of its calls; replay the spool with another client')
+        return self.__run_to_completion(self.__exec_replay_spool(spool_file))
+
+    def stats(self) -> dict:
+        """
+        A snapshot of the client's metrics, which to_prometheus in orangebeard.ClientStats formats for Prometheus.
+
+        Returns:
+            dict: "endpoints" with the request count, retries, response statuses, bytes sent and latency histogram per
+            endpoint, "blocked" with the time calling threads spent blocked, "calls" with the call outcomes and
+            "pending" with the work waiting in the client.
+        """
+        snapshot = self.__stats.snapshot()
+        snapshot['calls'] = dict(self.__call_outcomes)
+        snapshot['pending'] = {
+            'queued_requests': self.__scheduler.queue_depth,
+            'requests_in_flight': self.__scheduler.in_flight,
+            'scheduled_calls': self.__scheduler.pending,
+            'buffered_logs': self.__log_batcher.buffered if self.__log_batcher is not None else 0,
+            'sending_logs': self.__log_batcher.sending if self.__log_batcher is not None else 0,
+            'deferred_starts': len(self.__deferred_starts),
+            'entities': len(self.__registry)
+        }
+        return snapshot
+
+    def add_request_hook(self, hook: RequestHook) -> None:
+        """
+        Register a function to call after every API request attempt, on the client's event loop thread.
+
+        Args:
+            hook (Callable): Called with the endpoint (e.g. "POST log/batch"), the response status or None for a
+            connection error, the latency in seconds and the number of bytes sent.
+        """
+        self.__stats.add_hook(hook)
+
+    def register_external_uuid(self, real_uuid: UUID, parent_uuid: UUID = None) -> UUID:
         """
-        self.__event_loop.run_until_complete(
-            self.__exec_finish_test_run(test_run_uuid, finish_test_run, direct))
+        Make an entity that was reported elsewhere, such as a test started by another process, known to the client by
+        its real UUID, so logs, attachments and children can be reported to it.
+
+        Args:
+            real_uuid (UUID): The UUID Orangebeard assigned to the entity.
+            parent_uuid (UUID): The UUID of the entity it belongs to, if it is known to the client.
+
+        Returns:
+            UUID: The UUID to refer to the entity with, which is real_uuid itself.
+        """
+        if real_uuid not in self.__registry:
+            self.__registry.register(real_uuid, parent_uuid, real_uuid=real_uuid)
+        return real_uuid
 
     def start_suite(self, start_suite: StartSuite) -> list[UUID]:
         """
-        Start a suite and return a list of UUIDs associated with the started suites.
+        Start a suite and return a list of UUIDs associated with the started suites. Suites that were started before
+        with the same parent and path are not started again: their UUIDs are returned, and only the rest of the path
+        is sent.
 
         Args:
             start_suite (StartSuite): The StartSuite object containing information about the suite.
@@ -145,17 +323,36 @@ class OrangebeardClient:
         Returns:
             list[UUID]: List of UUIDs associated with the started suites.
         """
-        start_suite_event = asyncio.Event()
-        temp_uuids = [uuid.uuid4() for _ in start_suite.suiteNames]
-        for temp_uuid in temp_uuids:
-            self.__call_events[temp_uuid] = start_suite_event
-
-        parent_event_uuid: UUID = start_suite.testRunUUID if start_suite.parentSuiteUUID is None \
+        root_uuid: UUID = start_suite.testRunUUID if start_suite.parentSuiteUUID is None \
             else start_suite.parentSuiteUUID
-        parent_event = self.__call_events[parent_event_uuid]
+        suite_path = tuple(start_suite.suiteNames)
 
-        self.__event_loop.run_until_complete(self.__exec_start_suite(start_suite, temp_uuids, parent_event))
-        return temp_uuids
+        with self.__suite_lock:
+            known_uuids = []
+            for depth in range(1, len(suite_path) + 1):
+                known_uuid = self.__suite_paths.get((root_uuid, suite_path[:depth]))
+                if known_uuid is None or known_uuid not in self.__registry:
+                    break
+                known_uuids.append(known_uuid)
+            if len(known_uuids) == len(suite_path):
+                return known_uuids
+
+            parent_uuid = known_uuids[-1] if known_uuids else root_uuid
+            parent = self.__resolution_of(parent_uuid, 'suite start')
+            if parent is None:
+                return known_uuids + [uuid.uuid4() for _ in suite_path[len(known_uuids):]]
+            if known_uuids:
+                start_suite.parentSuiteUUID = parent_uuid
+                start_suite.suiteNames = list(suite_path[len(known_uuids):])
+
+            temp_uuids = [uuid.uuid4() for _ in start_suite.suiteNames]
+            for depth, temp_uuid in enumerate(temp_uuids, len(known_uuids) + 1):
+                self.__registry.register(temp_uuid, parent_uuid)
+                self.__suite_paths[(root_uuid, suite_path[:depth])] = temp_uuid
+                parent_uuid = temp_uuid
+
+        self.__run(self.__exec_start_suite(start_suite, temp_uuids, parent, root_uuid, suite_path))
+        return known_uuids + temp_uuids
 
     def start_test(self, start_test: StartTest) -> UUID:
         """
@@ -167,28 +364,34 @@ class OrangebeardClient:
         Returns:
             UUID: The UUID associated with the started test.
         """
-        start_test_event = asyncio.Event()
+        parent = self.__resolution_of(start_test.suiteUUID, 'test start')
         temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = start_test_event
+        if parent is None:
+            return temp_uuid
+        self.__registry.register(temp_uuid, start_test.suiteUUID)
 
-        parent_event = self.__call_events[start_test.suiteUUID]
-        self.__event_loop.run_until_complete(self.__exec_start_test(start_test, temp_uuid, parent_event))
+        self.__run_start(self.__exec_start_test(start_test, temp_uuid, parent), temp_uuid)
         return temp_uuid
 
-    def finish_test(self, test_uuid: UUID, finish_test: FinishTest) -> None:
+    def finish_test(self, test_uuid: UUID, finish_test: FinishTest) -> UUID:
         """
         Finish a test.
 
         Args:
             test_uuid (UUID): The UUID of the test to be finished.
             finish_test (FinishTest): The FinishTest object containing information about finishing the test.
+
+        Returns:
+            UUID: The temporary UUID of the finish call, which resolves once the test is finished.
         """
-        finish_test_event = asyncio.Event()
+        parent = self.__resolution_of(test_uuid, 'test finish')
         temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = finish_test_event
+        if parent is None:
+            return temp_uuid
+        self.__registry.register(temp_uuid, test_uuid, closed=True)
 
-        parent_event = self.__call_events[test_uuid]
-        asyncio.ensure_future(self.__exec_finish_test(test_uuid, finish_test, temp_uuid, parent_event))
+        self.__schedule(self.__exec_finish_test(test_uuid, finish_test, temp_uuid, parent))
+        return temp_uuid
 
     def start_step(self, start_step: StartStep) -> UUID:
         """
@@ -200,36 +403,43 @@ class OrangebeardClient:
         Returns:
             UUID: The UUID associated with the started step.
         """
-        start_step_event = asyncio.Event()
-        temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = start_step_event
-
-        parent_event_uuid = start_step.testUUID if start_step.parentStepUUID is None \
+        parent_uuid = start_step.testUUID if start_step.parentStepUUID is None \
             else start_step.parentStepUUID
 
-        parent_event = self.__call_events[parent_event_uuid]
+        parent = self.__resolution_of(parent_uuid, 'step start')
+        temp_uuid = uuid.uuid4()
+        if parent is None:
+            return temp_uuid
+        self.__registry.register(temp_uuid, parent_uuid)
 
-        self.__event_loop.run_until_complete(self.__exec_start_step(start_step, temp_uuid, parent_event))
+        self.__run_start(self.__exec_start_step(start_step, temp_uuid, parent), temp_uuid)
         return temp_uuid
 
-    def finish_step(self, step_uuid: UUID, finish_step: FinishStep) -> None:
+    def finish_step(self, step_uuid: UUID, finish_step: FinishStep) -> UUID:
         """
         Finish a step.
 
         Args:
             step_uuid (UUID): The UUID of the step to be finished.
             finish_step (FinishStep): The FinishStep object containing information about finishing the step.
+
+        Returns:
+            UUID: The temporary UUID of the finish call, which resolves once the step is finished.
         """
-        finish_step_event = asyncio.Event()
+        parent = self.__resolution_of(step_uuid, 'step finish')
         temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = finish_step_event
+        if parent is None:
+            return temp_uuid
+        self.__registry.register(temp_uuid, step_uuid, closed=True)
 
-        parent_event = self.__call_events[step_uuid]
-        asyncio.ensure_future(self.__exec_finish_step(step_uuid, finish_step, temp_uuid, parent_event))
+        self.__schedule(self.__exec_finish_step(step_uuid, finish_step, temp_uuid, parent))
+        return temp_uuid
 
     def log(self, log: Log) -> UUID:
         """
-        Send a log.
+        Send a log. A message longer than logSizeLimit is cut down to its start and end, and the full message is
+        attached to the log as a gzipped text file. A message that is not a str is sent as str(message), and None as
+        an empty message.
 
         Args:
             log (Log): The Log object containing information to store.
@@ -237,15 +447,32 @@ class OrangebeardClient:
         Returns:
             UUID: The UUID associated with the log.
         """
-        log_event = asyncio.Event()
-        temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = log_event
-
-        parent_event_uuid = log.testUUID if log.stepUUID is None \
+        parent_uuid = log.testUUID if log.stepUUID is None \
             else log.stepUUID
-        parent_event = self.__call_events[parent_event_uuid]
+        parent = self.__resolution_of(parent_uuid, 'log')
+        temp_uuid = uuid.uuid4()
+        if parent is None:
+            return temp_uuid
+        resolution = self.__registry.register(temp_uuid, parent_uuid, closed=True)
+
+        if not isinstance(log.message, str):
+            log.message = '' if log.message is None else str(log.message)
+        overflow = None
+        if self.__log_size_limit is not None and len(log.message) > self.__log_size_limit:
+            overflow_name = 'log-message.txt.gz'
+            overflow = (log.message, overflow_name,
+                        AttachmentMetaData(log.testRunUUID, log.testUUID, temp_uuid, log.stepUUID, log.logTime))
+            log.message = self.__truncate(log.message, self.__log_size_limit, overflow_name)
+
+        if self.__log_batcher is None:
+            self.__schedule(self.__exec_log(log, temp_uuid, parent))
+        else:
+            self.__call_on_loop(self.__add_to_batch, log, temp_uuid)
 
-        asyncio.ensure_future(self.__exec_log(log, temp_uuid, parent_event))
+        if overflow is not None:
+            attachment_uuid = uuid.uuid4()
+            self.__registry.register(attachment_uuid, temp_uuid, closed=True)
+            self.__schedule(self.__exec_send_log_overflow(*overflow, attachment_uuid, resolution))
         return temp_uuid
 
     def send_attachment(self, attachment: Attachment) -> UUID:
@@ -258,15 +485,112 @@ class OrangebeardClient:
         Returns:
             UUID: The UUID associated with the attachment that was sent.
         """
-        attachment_event = asyncio.Event()
+        parent = self.__resolution_of(attachment.AttachmentMetaData.logUUID, 'attachment')
         temp_uuid = uuid.uuid4()
-        self.__call_events[temp_uuid] = attachment_event
+        if parent is None:
+            return temp_uuid
+        self.__registry.register(temp_uuid, attachment.AttachmentMetaData.logUUID, closed=True)
 
-        parent_event = self.__call_events[attachment.AttachmentMetaData.logUUID]
-        asyncio.ensure_future(self.__exec_send_attachment(attachment, temp_uuid, parent_event))
+        self.__schedule(self.__exec_send_attachment(attachment, temp_uuid, parent))
         return temp_uuid
 
+    def __resolution_of(self, temp_uuid: UUID, call: str) -> UuidResolution | None:
+        """The resolution of the entity a call refers to. The call is dropped with a warning if it is not known."""
+        resolution = self.__registry.get(temp_uuid)
+        if resolution is None:
+            print(f'Orangebeard {call} was dropped, as {temp_uuid} is not a known test run, suite, test, step or log')
+            self.__call_outcomes['dropped'] += 1
+        return resolution
+
+    def __add_to_batch(self, log: Log, temp_uuid: UUID) -> None:
+        """Buffer a log; anything waiting for its UUID, such as its attachment, sends its batch right away."""
+        self.__log_batcher.add(log, temp_uuid)
+        self.__registry[temp_uuid].defer(lambda: self.__log_batcher.flush(log.testUUID, log.stepUUID))
+
+    def __run_event_loop(self) -> None:
+        asyncio.set_event_loop(self.__event_loop)
+        self.__event_loop.run_forever()
+
+    def __run(self, coroutine) -> None:
+        """
+        Run a start call. Blocks until it is done, unless the event loop runs in the background or is the caller's,
+        in which case the call is only scheduled and resolved later through its temporary UUID.
+
+        When blocking, the call is scheduled before taking the loop, so it runs even while another thread holds the
+        loop waiting for it, such as for the suite it starts a test in.
+        """
+        if self.__loop_thread is None and not self.__attached:
+            started = time.perf_counter()
+            done = self.__event_loop.create_future()
+            self.__submissions.put(self.__submit_and_notify, coroutine, done)
+            with self.__loop_lock:
+                self.__event_loop.run_until_complete(done)
+            self.__stats.record_blocked(time.perf_counter() - started)
+        else:
+            self.__schedule(coroutine)
+
+    def __submit_and_notify(self, coroutine, done: asyncio.Future) -> None:
+        def notify(task: asyncio.Task) -> None:
+            if task.cancelled():
+                done.cancel()
+            elif task.exception() is not None:
+                done.set_exception(task.exception())
+            else:
+                done.set_result(None)
+
+        self.__scheduler.submit(coroutine).add_done_callback(notify)
+
+    def __run_start(self, coroutine, temp_uuid: UUID) -> None:
+        """
+        Run a test or step start call. With a coalesce window, the call is deferred: it is made as soon as anything
+        needs its UUID, such as a log, a child or the finish call, or when the window has passed. A test or step that
+        finishes within the window thus has its start, logs and finish sent back-to-back.
+        """
+        if self.__coalesce_window is None:
+            self.__run(coroutine)
+        else:
+            self.__call_on_loop(self.__defer_start, coroutine, temp_uuid)
+
+    def __defer_start(self, coroutine, temp_uuid: UUID) -> None:
+        self.__deferred_starts[temp_uuid] = coroutine
+        self.__registry[temp_uuid].defer(lambda: self.__deferred_starts.pop(temp_uuid, None))
+        self.__event_loop.call_later(self.__coalesce_window, self.__release_deferred_start, temp_uuid)
+
+    def __release_deferred_start(self, temp_uuid: UUID) -> None:
+        coroutine = self.__deferred_starts.pop(temp_uuid, None)
+        if coroutine is not None:
+            self.__scheduler.submit(coroutine)
+
+    def __run_to_completion(self, coroutine) -> asyncio.Task | None:
+        if self.__attached:
+            return self.__event_loop.create_task(coroutine)
+        started = time.perf_counter()
+        if self.__loop_thread is None:
+            with self.__loop_lock:
+                self.__event_loop.run_until_complete(coroutine)
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, self.__event_loop).result()
+        self.__stats.record_blocked(time.perf_counter() - started)
+        return None
+
+    def __stop_loop_thread(self) -> None:
+        if self.__loop_thread is not None and self.__loop_thread.is_alive():
+            self.__event_loop.call_soon_threadsafe(self.__event_loop.stop)
+            self.__loop_thread.join()
+
+    def __schedule(self, coroutine) -> None:
+        self.__call_on_loop(self.__scheduler.submit, coroutine)
+
+    def __call_on_loop(self, callback, *args) -> None:
+        if self.__submissions is not None:
+            self.__submissions.put(callback, *args)
+        else:
+            callback(*args)
+
     async def __ensure_client(self):
+        # aiohttp takes long to import, so it is only imported once a request is about to be made
+        import aiohttp
+
         if self.__client is None or self.__client.closed:
             if not self.__endpoint.endswith('/'):
                 self.__endpoint = self.__endpoint.rstrip('/') + '/'
@@ -277,57 +601,152 @@ class OrangebeardClient:
                     "Authorization": f"Bearer {str(self.__access_token)}",
                     "Content-Type": "application/json",
                 },
+                connector=aiohttp.TCPConnector(
+                    limit=self.__settings.connectionLimit,
+                    limit_per_host=self.__settings.connectionLimitPerHost,
+                    keepalive_timeout=self.__settings.keepaliveTimeout,
+                    ttl_dns_cache=self.__settings.dnsCacheTtl
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=self.__settings.connectTimeout,
+                    sock_read=self.__settings.readTimeout
+                ),
                 raise_for_status=True
             )
 
-    async def __make_api_request(self, method: str, uri: str, data: Serializable = None, retry_count: int = 4):
+    async def __make_api_request(self, method: str, uri: str, data: Serializable | str = None,
+                                 probe: bool = False, priority: RequestPriority = RequestPriority.START,
+                                 spool_response=None, spool: bool = True):
+        """
+        Send a request to the listener API, with data as entity or serialized JSON. Each attempt waits for a request
+        slot with the given priority.
+        With probe set, a 404, 405 or 501 response raises BatchNotSupported instead of being retried.
+        If the request cannot be delivered and a spool is configured, it is spooled and spool_response, the response
+        with temporary UUIDs standing in for real ones, is returned.
+        """
         await self.__ensure_client()
-        for attempt in range(retry_count):
-            if self.__connection_with_orangebeard_is_valid:
+        from aiohttp import ContentTypeError
+
+        body = data.to_json() if isinstance(data, Serializable) else data
+
+        async def attempt():
+            async with self.__client.request(method, uri, data=body) as response:
                 try:
-                    async with (self.__client.request(method, uri, data=data.to_json() if data is not None else None)
-                                as response):
-                        if response.status == 400:
-                            print(f"Bad request (400): {uri}")
-                            return None
-                        try:
-                            return await response.json()
-                        except ContentTypeError:
-                            return None
-                except ClientError:
-                    await asyncio.sleep(2 ** (attempt + 1))
-            else:
+                    return response.status, await response.json()
+                except ContentTypeError:
+                    return response.status, None
+
+        delivered, result = await self.__call_with_retries(
+            method, uri, attempt, priority, len(body.encode()) if body is not None else 0, probe)
+        if delivered:
+            return result
+        if self.__spool is not None and spool:
+            self.__spooling = True
+            self.__spool.append(method, uri, body, self.__placeholders(spool_response))
+            self.__call_outcomes['spooled'] += 1
+            return spool_response
+        self.__call_outcomes['failed'] += 1
+        return None
+
+    async def __call_with_retries(self, method: str, uri: str, attempt, priority: RequestPriority, size: int,
+                                  probe: bool = False) -> tuple[bool, object]:
+        """
+        Make a call following the retry policy. Each attempt waits for a request slot with the given priority.
+
+        Args:
+            method (str): The HTTP method.
+            uri (str): The request URI.
+            attempt: Makes a single attempt and returns the response status and its result.
+            priority (RequestPriority): The priority of the call.
+            size (int): The size of the request body in bytes, for the stats.
+            probe (bool): Whether a 404, 405 or 501 response raises BatchNotSupported.
+
+        Returns:
+            tuple[bool, object]: Whether the call reached the listener, and the result of the attempt that did.
+        """
+        from aiohttp import ClientError, ClientResponseError
+
+        policy = self.__retry_policy
+        endpoint = ClientStats.endpoint(method, uri)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline if policy.deadline is not None else None
+        attempts = 0
+        delay = None
+        while not self.__spooling:
+            wait = policy.attempt_delay()
+            if wait is None:
                 break
-        else:
-            self.__connection_with_orangebeard_is_valid = False
-            print(f'Failed to communicate with Orangebeard after {retry_count} attempts')
+            if wait == 0:
+                attempts += 1
+                status = None
+                retry_after = None
+                async with self.__scheduler.slot(priority):
+                    started = loop.time()
+                    try:
+                        status, result = await attempt()
+                        self.__stats.record_request(endpoint, status, loop.time() - started, size, attempts > 1)
+                        policy.record_success()
+                        self.__call_outcomes['succeeded'] += 1
+                        return True, result
+                    except ClientResponseError as error:
+                        status = error.status
+                        self.__stats.record_request(endpoint, status, loop.time() - started, size, attempts > 1)
+                        if probe and status in (404, 405, 501):
+                            policy.record_success()
+                            raise BatchNotSupported(uri) from error
+                        retry_after = policy.retry_after(status, error.headers)
+                    except (ClientError, asyncio.TimeoutError):
+                        self.__stats.record_request(endpoint, None, loop.time() - started, size, attempts > 1)
+
+                if policy.is_failure(status):
+                    policy.record_failure()
+                else:
+                    policy.record_success()
+                if not policy.is_retryable(status):
+                    print(f"Bad request ({status}): {uri}")
+                    self.__call_outcomes['failed'] += 1
+                    return True, None
+                if attempts >= policy.max_attempts:
+                    break
+                wait = delay = retry_after if retry_after is not None else policy.backoff(delay)
+
+            if deadline is not None and loop.time() + wait > deadline:
+                break
+            await asyncio.sleep(wait)
+        return False, None
 
-    async def __exec_start_test_run(self, start_test_run: StartTestRun, temp_uuid: UUID, direct=False) -> None:
+    async def __exec_start_test_run(self, start_test_run: StartTestRun, temp_uuid: UUID) -> None:
         response = await self.__make_api_request(
             'POST',
             f'listener/v3/{self.__project_name}/test-run/start',
-            start_test_run
+            start_test_run,
+            spool_response=str(temp_uuid)
         )
-        actual_uuid = response if response else None
-        self.__uuid_mapping[temp_uuid] = actual_uuid
-        self.__call_events[temp_uuid].set()
-
-        if direct is True:
-            await self.__client.close()
+        self.__registry.resolve(temp_uuid, response if response else None)
 
     async def __exec_start_announced_test_run(self, test_run_uuid: UUID) -> None:
         await self.__make_api_request(
             'PUT',
             f'listener/v3/{self.__project_name}/test-run/start/{test_run_uuid}'
         )
-        self.__uuid_mapping[test_run_uuid] = test_run_uuid
-        self.__call_events[test_run_uuid].set()
+        self.__registry.resolve(test_run_uuid, test_run_uuid)
 
     async def __exec_finish_test_run(self, test_run_uuid: UUID, finish_test_run: FinishTestRun, direct=False) -> None:
-        print(f'Waiting for {len(self.__call_events.values()) + 1} Orangebeard events to finish...')
-
-        for event in self.__call_events.values():
-            await event.wait()
+        for temp_uuid in list(self.__deferred_starts):
+            self.__release_deferred_start(temp_uuid)
+        if self.__log_batcher is not None:
+            # batches are sent as scheduled calls, so the drain below waits for them within the drain timeout
+            self.__log_batcher.send_all()
+
+        print(f'Waiting for {self.__scheduler.pending + 1} Orangebeard calls to finish...')
+        dropped = await self.__scheduler.drain(
+            self.__drain_timeout,
+            lambda pending: print(f'Still waiting for {pending} Orangebeard calls to finish...')
+        )
+        if dropped > 0:
+            self.__call_outcomes['dropped'] += dropped
+            print(f'Stopped waiting for {dropped} Orangebeard calls after {self.__drain_timeout} seconds')
 
         if direct is True:
             real_test_run_uuid = test_run_uuid
@@ -338,175 +757,403 @@ class OrangebeardClient:
             await self.__make_api_request(
                 'PUT',
                 f'listener/v3/{self.__project_name}/test-run/finish/{real_test_run_uuid}',
-                finish_test_run
+                finish_test_run,
+                priority=RequestPriority.FINISH
             )
             print(f'Done. Orangebeard Report: {self.__endpoint}p/{self.__project_name}/test-results')
         else:
             print('Done. Remember to finish run using CLI!')
 
-        await self.__client.close()
+        print(f"Orangebeard calls: {self.__call_outcomes['succeeded']} succeeded, "
+              f"{self.__call_outcomes['failed']} failed, {self.__call_outcomes['dropped']} dropped, "
+              f"{self.__call_outcomes['spooled']} spooled")
+        if self.__spool is not None and self.__spool.path is not None:
+            self.__spool.close()
+            print(f'Spooled calls were written to {self.__spool.path}. '
+                  f'Send them with: orangebeard-cli -x replay -f {self.__spool.path}')
+        if self.__settings.statsFile:
+            await asyncio.get_running_loop().run_in_executor(None, self.__write_stats, self.__settings.statsFile)
+        self.__registry.close(test_run_uuid)
+        self.__suite_paths.clear()
+        if self.__attachment_processor is not None:
+            self.__attachment_processor.close()
+        if self.__client is not None and not self.__client.closed:
+            await self.__client.close()
 
-    async def __exec_start_suite(self, start_suite: StartSuite, suite_temp_ids: list[UUID],
-                                 parent_event: Event) -> None:
-        await parent_event.wait()
+    async def __exec_start_suite(self, start_suite: StartSuite, suite_temp_ids: list[UUID], parent: UuidResolution,
+                                 root_uuid: UUID, suite_path: tuple[str, ...]) -> None:
+        parent_uuid = await parent.wait()
 
-        start_suite.testRunUUID = await self.__get_real_uuid(start_suite.testRunUUID)
         if start_suite.parentSuiteUUID is not None:
-            start_suite.parentSuiteUUID = await self.__get_real_uuid(start_suite.parentSuiteUUID)
+            start_suite.parentSuiteUUID = parent_uuid
+        start_suite.testRunUUID = await self.__get_real_uuid(start_suite.testRunUUID)
 
         suites: list[Suite] = await self.__make_api_request(
             'POST',
             f'listener/v3/{self.__project_name}/suite/start',
-            start_suite
+            start_suite,
+            spool_response=[{'suiteUUID': str(temp_uuid)} for temp_uuid in suite_temp_ids]
         )
 
-        actual_uuids = [suite['suiteUUID'] for suite in suites]
+        actual_uuids = [suite['suiteUUID'] for suite in suites] if suites else []
+        first_depth = len(suite_path) - len(suite_temp_ids) + 1
         for i, temp_uuid in enumerate(suite_temp_ids):
-            self.__uuid_mapping[temp_uuid] = actual_uuids[i]
-            self.__call_events[temp_uuid].set()
+            if i >= len(actual_uuids):
+                self.__suite_paths.pop((root_uuid, suite_path[:first_depth + i]), None)
+            self.__registry.resolve(temp_uuid, actual_uuids[i] if i < len(actual_uuids) else None)
 
-    async def __exec_start_test(self, start_test: StartTest, temp_uuid: UUID, parent_event: Event) -> None:
-        await parent_event.wait()
+    async def __exec_start_test(self, start_test: StartTest, temp_uuid: UUID, parent: UuidResolution) -> None:
+        start_test.suiteUUID = await parent.wait()
         start_test.testRunUUID = await self.__get_real_uuid(start_test.testRunUUID)
-        start_test.suiteUUID = await self.__get_real_uuid(start_test.suiteUUID)
 
         response = await self.__make_api_request(
             'POST',
             f'listener/v3/{self.__project_name}/test/start',
-            start_test
+            start_test,
+            spool_response=str(temp_uuid)
         )
-        actual_uuid = response if response else None
-        self.__uuid_mapping[temp_uuid] = actual_uuid
-        self.__call_events[temp_uuid].set()
+        self.__registry.resolve(temp_uuid, response if response else None)
 
     async def __exec_finish_test(self, test_uuid: UUID, finish_test: FinishTest, temp_uuid: UUID,
-                                 parent_event: Event) -> None:
-        await parent_event.wait()
-        test_uuid = await self.__get_real_uuid(test_uuid)
+                                 parent: UuidResolution) -> None:
+        real_test_uuid = await parent.wait()
+        if self.__log_batcher is not None:
+            await self.__log_batcher.flush(test_uuid=test_uuid)
         finish_test.testRunUUID = await self.__get_real_uuid(finish_test.testRunUUID)
 
         await self.__make_api_request(
             'PUT',
-            f'listener/v3/{self.__project_name}/test/finish/{test_uuid}',
-            finish_test
+            f'listener/v3/{self.__project_name}/test/finish/{real_test_uuid}',
+            finish_test,
+            priority=RequestPriority.FINISH
         )
-        self.__call_events[temp_uuid].set()
+        self.__registry.resolve(temp_uuid, None)
+        self.__registry.close(test_uuid)
 
-    async def __exec_start_step(self, start_step: StartStep, temp_uuid: UUID, parent_event: Event) -> None:
-        await parent_event.wait()
+    async def __exec_start_step(self, start_step: StartStep, temp_uuid: UUID, parent: UuidResolution) -> None:
+        parent_uuid = await parent.wait()
+        if start_step.parentStepUUID is not None:
+            start_step.parentStepUUID = parent_uuid
         start_step.testRunUUID = await self.__get_real_uuid(start_step.testRunUUID)
         start_step.testUUID = await self.__get_real_uuid(start_step.testUUID)
-        if start_step.parentStepUUID is not None:
-            start_step.parentStepUUID = await self.__get_real_uuid(start_step.parentStepUUID)
 
         response = await self.__make_api_request(
             'POST',
             f'listener/v3/{self.__project_name}/step/start',
-            start_step
+            start_step,
+            spool_response=str(temp_uuid)
         )
 
-        actual_uuid = response if response else None
-        self.__uuid_mapping[temp_uuid] = actual_uuid
-        self.__call_events[temp_uuid].set()
+        self.__registry.resolve(temp_uuid, response if response else None)
 
     async def __exec_finish_step(self, step_uuid: UUID, finish_step: FinishStep, temp_uuid: UUID,
-                                 parent_event: Event) -> None:
-        await parent_event.wait()
-        step_uuid = await self.__get_real_uuid(step_uuid)
+                                 parent: UuidResolution) -> None:
+        real_step_uuid = await parent.wait()
+        if self.__log_batcher is not None:
+            await self.__log_batcher.flush(step_uuid=step_uuid)
         finish_step.testRunUUID = await self.__get_real_uuid(finish_step.testRunUUID)
 
         await self.__make_api_request(
             'PUT',
-            f'listener/v3/{self.__project_name}/step/finish/{step_uuid}',
-            finish_step
+            f'listener/v3/{self.__project_name}/step/finish/{real_step_uuid}',
+            finish_step,
+            priority=RequestPriority.FINISH
         )
-        self.__call_events[temp_uuid].set()
+        self.__registry.resolve(temp_uuid, None)
+        self.__registry.close(step_uuid)
 
-    async def __exec_log(self, log: Log, temp_uuid: UUID, parent_event: Event) -> None:
-        await parent_event.wait()
+    async def __exec_log(self, log: Log, temp_uuid: UUID, parent: UuidResolution) -> None:
+        await parent.wait()
         if log.message.strip() == '':
             log.message = '_empty_'
         log.testRunUUID = await self.__get_real_uuid(log.testRunUUID)
         log.testUUID = await self.__get_real_uuid(log.testUUID)
         log.stepUUID = await self.__get_real_uuid(log.stepUUID) if log.stepUUID is not None else None
 
+        await self.__send_single_log(log, temp_uuid)
+
+    async def __send_single_log(self, log: Log, temp_uuid: UUID) -> None:
         response = await self.__make_api_request(
             'POST',
             f'listener/v3/{self.__project_name}/log',
-            log
+            log,
+            priority=RequestPriority.LOG,
+            spool_response=str(temp_uuid)
         )
 
-        actual_uuid = response if response else None
-        self.__uuid_mapping[temp_uuid] = actual_uuid
-        self.__call_events[temp_uuid].set()
-
-    async def __exec_send_attachment(self, attachment: Attachment, temp_uuid: UUID, parent_event: Event) -> None:
-        await parent_event.wait()
+        self.__registry.resolve(temp_uuid, response if response else None)
+
+    async def __exec_send_log_overflow(self, message: str, name: str, meta_data: AttachmentMetaData, temp_uuid: UUID,
+                                       parent: UuidResolution) -> None:
+        content = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(gzip.compress, message.encode(), mtime=0))
+        overflow_file = AttachmentFile(name, content)
+        overflow_file.contentType = 'application/gzip'
+        await self.__exec_send_attachment(Attachment(overflow_file, meta_data), temp_uuid, parent)
+
+    @staticmethod
+    def __truncate(message: str, limit: int, attachment_name: str) -> str:
+        """Keep the start and the end of a message, which hold the gist of most stack traces and dumps."""
+        summary = f'\n\n[... {{}} of {len(message)} characters left out, the full message is attached as ' \
+                  f'{attachment_name} ...]\n\n'
+        kept = max(0, limit - len(summary) - len(str(len(message))))
+        head = kept - kept // 4
+        tail = kept // 4
+        return message[:head] + summary.format(len(message) - head - tail) + (message[-tail:] if tail else '')
+
+    async def __exec_log_batch(self, batch: list[tuple[Log, UUID]]) -> None:
+        first_log = batch[0][0]
+        parent_uuid = first_log.testUUID if first_log.stepUUID is None else first_log.stepUUID
+        await self.__get_real_uuid(parent_uuid)
+
+        test_run_uuid = await self.__get_real_uuid(first_log.testRunUUID)
+        test_uuid = await self.__get_real_uuid(first_log.testUUID)
+        step_uuid = await self.__get_real_uuid(first_log.stepUUID) if first_log.stepUUID is not None else None
+        for log, _ in batch:
+            if log.message.strip() == '':
+                log.message = '_empty_'
+            log.testRunUUID = test_run_uuid
+            log.testUUID = test_uuid
+            log.stepUUID = step_uuid
+
+        if self.__log_batch_supported:
+            try:
+                response = await self.__make_api_request(
+                    'POST',
+                    f'listener/v3/{self.__project_name}/log/batch',
+                    '[' + ','.join(log.to_json() for log, _ in batch) + ']',
+                    probe=True,
+                    priority=RequestPriority.LOG,
+                    spool_response=[str(temp_uuid) for _, temp_uuid in batch]
+                )
+                actual_uuids = response if isinstance(response, list) else []
+                for i, (log, temp_uuid) in enumerate(batch):
+                    if i < len(actual_uuids):
+                        self.__registry.resolve(temp_uuid, actual_uuids[i])
+                    elif self.__registry.has_children(temp_uuid):
+                        # the response does not say which UUID the log got, while an attachment needs it
+                        await self.__send_single_log(log, temp_uuid)
+                    else:
+                        self.__registry.resolve(temp_uuid, None)
+                return
+            except BatchNotSupported:
+                self.__log_batch_supported = False
+
+        await self.__exec_combined_logs(batch)
+
+    async def __exec_combined_logs(self, batch: list[tuple[Log, UUID]]) -> None:
+        """
+        Fallback for listeners without a batch endpoint: consecutive logs with the same level and format are combined
+        into a single log entry, which all of their temporary UUIDs map to.
+        """
+        combined: list[tuple[Log, list[UUID]]] = []
+        for log, temp_uuid in batch:
+            if combined and combined[-1][0].logLevel == log.logLevel and combined[-1][0].logFormat == log.logFormat:
+                combined[-1][0].message += '\n' + log.message
+                combined[-1][1].append(temp_uuid)
+            else:
+                combined.append((log, [temp_uuid]))
+
+        for log, temp_uuids in combined:
+            response = await self.__make_api_request(
+                'POST',
+                f'listener/v3/{self.__project_name}/log',
+                log,
+                priority=RequestPriority.LOG,
+                spool_response=str(temp_uuids[0])
+            )
+            actual_uuid = response if response else None
+            for temp_uuid in temp_uuids:
+                self.__registry.resolve(temp_uuid, actual_uuid)
+
+    async def __exec_send_attachment(self, attachment: Attachment, temp_uuid: UUID, parent: UuidResolution) -> None:
+        try:
+            await self.__send_attachment(attachment, temp_uuid, parent)
+        except OSError as error:
+            print(f'Attachment {attachment.AttachmentFile.name} could not be read: {error}')
+            self.__call_outcomes['failed'] += 1
+        finally:
+            self.__registry.resolve(temp_uuid, None)
+
+    async def __send_attachment(self, attachment: Attachment, temp_uuid: UUID, parent: UuidResolution) -> None:
+        attachment.AttachmentMetaData.logUUID = await parent.wait()
+        if attachment.AttachmentMetaData.logUUID is None:
+            print(f'Attachment {attachment.AttachmentFile.name} was not sent, '
+                  'as the log it belongs to was not reported')
+            self.__call_outcomes['dropped'] += 1
+            return
         attachment.AttachmentMetaData.testRunUUID = await self.__get_real_uuid(
             attachment.AttachmentMetaData.testRunUUID)
         attachment.AttachmentMetaData.testUUID = await self.__get_real_uuid(attachment.AttachmentMetaData.testUUID)
         if attachment.AttachmentMetaData.stepUUID is not None:
             attachment.AttachmentMetaData.stepUUID = await self.__get_real_uuid(attachment.AttachmentMetaData.stepUUID)
-        attachment.AttachmentMetaData.logUUID = await self.__get_real_uuid(attachment.AttachmentMetaData.logUUID)
 
-        if self.__connection_with_orangebeard_is_valid:
-            boundary = f"boundary_{uuid.uuid4().hex}"
-            multipart_message = aiohttp.MultipartWriter('form-data', boundary=boundary)
+        if self.__attachment_processor is None:
+            await self.__upload_prepared_attachment(attachment, temp_uuid)
+            return
+
+        attachment.AttachmentFile = await asyncio.get_running_loop().run_in_executor(
+            None, self.__attachment_processor.prepare, attachment.AttachmentFile)
+        try:
+            await self.__upload_prepared_attachment(attachment, temp_uuid)
+        finally:
+            self.__attachment_processor.release(attachment.AttachmentFile)
+
+    async def __upload_prepared_attachment(self, attachment: Attachment, temp_uuid: UUID) -> None:
+        response = await self.__upload_attachment(attachment.AttachmentMetaData.to_json(), attachment.AttachmentFile,
+                                                   spool_response=str(temp_uuid))
+        self.__registry.resolve(temp_uuid, response)
+
+    async def __upload_attachment(self, meta_data: str, file: AttachmentFile, spool_response: str = None,
+                                  spool: bool = True) -> str | None:
+        uri = f'listener/v3/{self.__project_name}/attachment'
+        await self.__ensure_client()
 
-            multipart_message.append(
-                attachment.AttachmentMetaData.to_json(),
-                MappingProxyType({'Content-Disposition': 'form-data; name="json"', 'Content-Type': 'application/json'})
-            )
-            multipart_message.append(
-                attachment.AttachmentFile.content,
-                MappingProxyType({
-                    'Content-Disposition': f'form-data; name="attachment"; filename="{attachment.AttachmentFile.name}"',
-                    'Content-Type': attachment.AttachmentFile.contentType
-                })
-            )
+        async def attempt():
+            with file.reader() as content:
+                multipart_message, headers = self.__create_attachment_message(meta_data, file, content)
+                async with self.__client.request('POST', uri, data=multipart_message, headers=headers) as response:
+                    response_text = await response.text()
+                    return response.status, response_text if response_text else None
+
+        size = len(meta_data.encode()) + (len(file.content) if file.path is None else os.path.getsize(file.path))
+        delivered, result = await self.__call_with_retries('POST', uri, attempt, RequestPriority.ATTACHMENT, size)
+        if delivered:
+            return result
+        if self.__spool is not None and spool:
+            self.__spooling = True
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.__spool.append, 'POST', uri, meta_data, self.__placeholders(spool_response), file)
+            self.__call_outcomes['spooled'] += 1
+            return spool_response
+        self.__call_outcomes['failed'] += 1
+        return None
 
-            headers = {
-                'Authorization': f'Bearer {str(self.__access_token)}',
-                'Content-Type': f'multipart/form-data; boundary={boundary}'
-            }
+    def __create_attachment_message(self, meta_data: str, file: AttachmentFile,
+                                    content: bytes | BinaryIO) -> tuple['aiohttp.MultipartWriter', dict]:
+        from aiohttp import MultipartWriter
 
-            uri = f'listener/v3/{self.__project_name}/attachment'
-            retry_count = 4
-            await self.__ensure_client()
-            for attempt in range(retry_count):
-                if self.__connection_with_orangebeard_is_valid:
-                    try:
-                        async with self.__client.request('POST', uri, data=multipart_message,
-                                                         headers=headers) as response:
-                            try:
-                                if 200 <= response.status < 300:
-                                    response_text = await response.text()
-                                    actual_uuid = response_text if response_text else None
-                                    self.__uuid_mapping[temp_uuid] = actual_uuid
-                                    self.__call_events[temp_uuid].set()
-                                    return response_text
-                            except ContentTypeError:
-                                return None
-                    except ClientError:
-                        await asyncio.sleep(2 ** (attempt + 1))
-                else:
-                    break
+        boundary = f"boundary_{uuid.uuid4().hex}"
+        multipart_message = MultipartWriter('form-data', boundary=boundary)
+
+        multipart_message.append(
+            meta_data,
+            MappingProxyType({'Content-Disposition': 'form-data; name="json"', 'Content-Type': 'application/json'})
+        )
+        multipart_message.append(
+            content,
+            MappingProxyType({
+                'Content-Disposition': f'form-data; name="attachment"; filename="{file.name}"',
+                'Content-Type': file.contentType
+            })
+        )
 
+        headers = {
+            'Authorization': f'Bearer {str(self.__access_token)}',
+            'Content-Type': f'multipart/form-data; boundary={boundary}'
+        }
+        return multipart_message, headers
+
+    def __write_stats(self, path: str) -> None:
+        snapshot = self.stats()
+        with open(path, 'w', encoding='utf-8') as stats_file:
+            if path.endswith('.prom'):
+                stats_file.write(to_prometheus(snapshot))
             else:
-                self.__connection_with_orangebeard_is_valid = False
-                raise ConnectionError(f'Failed to communicate with Orangebeard after {retry_count} attempts')
+                json.dump(snapshot, stats_file, indent=2)
+        print(f'Orangebeard client stats were written to {path}')
+
+    @staticmethod
+    def __placeholders(spool_response) -> list[str]:
+        if spool_response is None:
+            return []
+        if isinstance(spool_response, list):
+            return [item['suiteUUID'] if isinstance(item, dict) else item for item in spool_response]
+        return [spool_response]
+
+    async def __exec_replay_spool(self, spool_file: str) -> None:
+        uuid_mapping: dict[str, str] = {}
+
+        def remap(text: str | None) -> str | None:
+            return UUID_PATTERN.sub(lambda match: uuid_mapping.get(match.group(0), match.group(0)), text) \
+                if text is not None else None
+
+        replayed = 0
+        for record in read_spool(spool_file):
+            uri = remap(record['uri'])
+            body = remap(record['body'])
+            if 'file' in record:
+                file = AttachmentFile.from_path(record['file']['path'], record['file']['name'])
+                file.contentType = record['file']['contentType']
+                response = await self.__upload_attachment(body, file, spool=False)
+            elif uri.endswith('/log/batch'):
+                response = await self.__replay_log_batch(uri, body)
+            else:
+                response = await self.__make_api_request(record['method'], uri, body, spool=False)
+
+            actual_uuids = self.__placeholders(response) if response else []
+            for i, placeholder in enumerate(record['placeholders']):
+                if i < len(actual_uuids) and actual_uuids[i]:
+                    uuid_mapping[placeholder] = str(actual_uuids[i])
+            replayed += 1
+
+        print(f"Replayed {replayed} Orangebeard calls: {self.__call_outcomes['succeeded']} succeeded, "
+              f"{self.__call_outcomes['failed']} failed, {self.__call_outcomes['dropped']} dropped")
+
+    async def __replay_log_batch(self, uri: str, body: str) -> list | None:
+        """Replay a spooled log batch; a listener without a batch endpoint gets its logs one at a time."""
+        if self.__log_batch_supported:
+            try:
+                return await self.__make_api_request('POST', uri, body, probe=True, priority=RequestPriority.LOG,
+                                                     spool=False)
+            except BatchNotSupported:
+                self.__log_batch_supported = False
+
+        log_uri = uri[:-len('/batch')]
+        return [await self.__make_api_request('POST', log_uri, json.dumps(log), priority=RequestPriority.LOG,
+                                              spool=False)
+                for log in json.loads(body)]
 
     async def __get_real_uuid(self, temp_uuid: UUID) -> UUID | None:
-        for _ in range(3):  # Retry up to 3 times, avoid None value on sporadic race condition between event set and value write
-            if temp_uuid in self.__uuid_mapping and self.__uuid_mapping[temp_uuid] is not None:
-                return self.__uuid_mapping[temp_uuid]
-            await asyncio.sleep(0.05)  #50ms
-        return None
+        resolution = self.__registry.get(temp_uuid)
+        return await resolution.wait() if resolution is not None else None
+
+    @property
+    def resolutions(self) -> EntityRegistry:
+        """The UuidResolution of every call that is still tracked, by temporary UUID."""
+        return self.__registry
 
     @property
-    def call_events(self):
-        return self.__call_events
+    def call_events(self) -> EntityRegistry:
+        """Kept for compatibility: the resolutions, which can be awaited like the events they replace."""
+        return self.__registry
 
     @property
-    def uuid_mapping(self):
-        return self.__uuid_mapping
+    def uuid_mapping(self) -> dict[UUID, UUID | None]:
+        """Kept for compatibility: a snapshot of the real UUIDs resolved so far, by temporary UUID."""
+        return {temp_uuid: resolution.real_uuid for temp_uuid, resolution in self.__registry.items()
+                if resolution.is_set()}
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of API requests waiting for a free request slot."""
+        return self.__scheduler.queue_depth
+
+    @property
+    def requests_in_flight(self) -> int:
+        """The number of API requests currently being sent."""
+        return self.__scheduler.in_flight
+
+    @property
+    def pending_work(self) -> int:
+        """
+        The number of calls handed to the client that are not done yet, counting every log not sent yet, whether
+        buffered or in a batch being sent. Code that reports a large input can wait while it is high, so the client
+        does not buffer without bound.
+        """
+        pending = self.__scheduler.pending
+        if self.__submissions is not None:
+            pending += len(self.__submissions)
+        if self.__log_batcher is not None:
+            pending += self.__log_batcher.buffered + self.__log_batcher.sending
+        return pending
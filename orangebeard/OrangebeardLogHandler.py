@@ -0,0 +1,194 @@
+import contextlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterator
+from uuid import UUID
+
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+
+_MAX_TRACKED_TESTS = 1024
+
+
+class _TokenBucket:
+    __slots__ = ('tokens', 'updated', 'dropped', 'test_run_uuid', 'step_uuid')
+
+    def __init__(self, tokens: float) -> None:
+        self.tokens = tokens
+        self.updated = time.monotonic()
+        self.dropped = 0
+        self.test_run_uuid = None
+        self.step_uuid = None
+
+
+class _Folded:
+    __slots__ = ('test_run_uuid', 'message', 'level', 'repeats')
+
+    def __init__(self, test_run_uuid: UUID, message: str, level: LogLevel) -> None:
+        self.test_run_uuid = test_run_uuid
+        self.message = message
+        self.level = level
+        self.repeats = 0
+
+
+class OrangebeardLogHandler(logging.Handler):
+    """
+        Sends the records of Python's logging module to Orangebeard as logs of the current test or step. The test and
+        step are set per thread with set_context or test_context; records of threads without a context are ignored,
+        which also keeps the client's own threads out.
+
+        To keep a noisy test from flooding the client, records are rate limited per test with a token bucket: a burst
+        of records goes through at once, after that rate records per second. ERROR records and up are never dropped.
+        Dropped records are counted and reported in a single log once records go through again, the context changes
+        or the handler is flushed. A record identical to the one before it, in the same test or step, is not sent
+        again: a log with the number of repeats follows once a different record arrives, the context changes or the
+        handler is flushed.
+
+        Args:
+            client (OrangebeardClient): The client to report through.
+            level (int): The minimum level of the records to send.
+            rate (float): The number of records per second that may be sent per test, None for no limit.
+            burst (int): The number of records that may be sent at once per test.
+            fold (bool): Whether to fold repeated records.
+        """
+
+    def __init__(self, client, level: int = logging.NOTSET, rate: float | None = 20.0, burst: int = 200,
+                 fold: bool = True) -> None:
+        super().__init__(level)
+        self.__client = client
+        self.__rate = rate
+        self.__burst = burst
+        self.__fold = fold
+        self.__context = threading.local()
+        self.__buckets: OrderedDict[UUID, _TokenBucket] = OrderedDict()
+        self.__folded: dict[tuple[UUID, UUID | None], _Folded] = {}
+
+    def set_context(self, test_run_uuid: UUID, test_uuid: UUID, step_uuid: UUID = None) -> None:
+        """
+        Send the records of the current thread to a test or step, until the context is changed or cleared.
+
+        Args:
+            test_run_uuid (UUID): The UUID of the test run.
+            test_uuid (UUID): The UUID of the test.
+            step_uuid (UUID): The UUID of the step, if any.
+        """
+        self.__close_context()
+        self.__context.value = (test_run_uuid, test_uuid, step_uuid)
+
+    def clear_context(self) -> None:
+        """Stop sending the records of the current thread, e.g. before the test is finished."""
+        self.__close_context()
+        self.__context.value = None
+
+    @contextlib.contextmanager
+    def test_context(self, test_run_uuid: UUID, test_uuid: UUID, step_uuid: UUID = None) -> Iterator[None]:
+        """Send the records of the current thread to a test or step within a with block, restoring the context after."""
+        previous = getattr(self.__context, 'value', None)
+        self.set_context(test_run_uuid, test_uuid, step_uuid)
+        try:
+            yield
+        finally:
+            self.__close_context()
+            self.__context.value = previous
+
+    def emit(self, record: logging.LogRecord) -> None:
+        context = getattr(self.__context, 'value', None)
+        if context is None:
+            return
+        try:
+            test_run_uuid, test_uuid, step_uuid = context
+            message = self.format(record)
+            level = self.level_of(record.levelno)
+
+            if self.__fold:
+                folded = self.__folded.get((test_uuid, step_uuid))
+                if folded is not None and folded.message == message and folded.level == level:
+                    folded.repeats += 1
+                    return
+                self.__send_repeats(test_uuid, step_uuid)
+
+            if record.levelno < logging.ERROR and not self.__take_token(context):
+                return
+            self.__send_dropped(test_uuid)
+            if self.__fold:
+                self.__folded[(test_uuid, step_uuid)] = _Folded(test_run_uuid, message, level)
+            self.__client.log(Log(test_run_uuid, test_uuid, message, level, LogFormat.PLAIN_TEXT, step_uuid,
+                                  datetime.fromtimestamp(record.created).astimezone()))
+        except Exception:  # logging must never break the code under test
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Send the repeat counts of all folded records and the number of records dropped in each test."""
+        with self.lock:
+            for test_uuid, step_uuid in list(self.__folded):
+                self.__send_repeats(test_uuid, step_uuid)
+            for test_uuid in list(self.__buckets):
+                self.__send_dropped(test_uuid)
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+    @staticmethod
+    def level_of(levelno: int) -> LogLevel:
+        """The LogLevel of a logging level: ERROR and up are ERROR, WARNING is WARN, INFO is INFO, lower is DEBUG."""
+        if levelno >= logging.ERROR:
+            return LogLevel.ERROR
+        if levelno >= logging.WARNING:
+            return LogLevel.WARN
+        if levelno >= logging.INFO:
+            return LogLevel.INFO
+        return LogLevel.DEBUG
+
+    def __close_context(self) -> None:
+        context = getattr(self.__context, 'value', None)
+        if context is not None:
+            with self.lock:
+                self.__send_repeats(context[1], context[2])
+                self.__send_dropped(context[1])
+
+    def __send_repeats(self, test_uuid: UUID, step_uuid: UUID | None) -> None:
+        """Send the number of repeats of the record folded in a test or step, and forget the record."""
+        folded = self.__folded.pop((test_uuid, step_uuid), None)
+        if folded is None or folded.repeats == 0:
+            return
+        self.__client.log(Log(folded.test_run_uuid, test_uuid,
+                              f'Previous message repeated {folded.repeats} more times', folded.level,
+                              LogFormat.PLAIN_TEXT, step_uuid, datetime.now().astimezone()))
+
+    def __send_dropped(self, test_uuid: UUID) -> None:
+        """Send the number of records dropped in a test since the last time, if any."""
+        bucket = self.__buckets.get(test_uuid)
+        if bucket is None or bucket.dropped == 0:
+            return
+        self.__client.log(Log(bucket.test_run_uuid, test_uuid,
+                              f'{bucket.dropped} log messages were dropped to stay within {self.__rate} per second',
+                              LogLevel.WARN, LogFormat.PLAIN_TEXT, bucket.step_uuid, datetime.now().astimezone()))
+        bucket.dropped = 0
+
+    def __take_token(self, context: tuple[UUID, UUID, UUID | None]) -> bool:
+        """Take a token from the bucket of the test, or count the record as dropped if there is none."""
+        if self.__rate is None:
+            return True
+        test_run_uuid, test_uuid, step_uuid = context
+        bucket = self.__buckets.get(test_uuid)
+        if bucket is None:
+            bucket = self.__buckets[test_uuid] = _TokenBucket(self.__burst)
+            while len(self.__buckets) > _MAX_TRACKED_TESTS:
+                self.__buckets.popitem(last=False)
+        else:
+            self.__buckets.move_to_end(test_uuid)
+
+        current_time = time.monotonic()
+        bucket.tokens = min(self.__burst, bucket.tokens + (current_time - bucket.updated) * self.__rate)
+        bucket.updated = current_time
+        if bucket.tokens < 1:
+            bucket.dropped += 1
+            bucket.test_run_uuid, bucket.step_uuid = test_run_uuid, step_uuid
+            return False
+        bucket.tokens -= 1
+        return True
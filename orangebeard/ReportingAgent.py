@@ -0,0 +1,193 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from multiprocessing.connection import Client, Connection, Listener
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from orangebeard.entity.Attachment import Attachment
+from orangebeard.entity.FinishStep import FinishStep
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.StartStep import StartStep
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+
+if TYPE_CHECKING:
+    from orangebeard.OrangebeardClient import OrangebeardClient
+
+_FORWARDED_CALLS = frozenset({'start_test_run', 'start_announced_test_run', 'finish_test_run', 'start_suite',
+                              'start_test', 'finish_test', 'start_step', 'finish_step', 'log', 'send_attachment'})
+_ANSWERED_CALLS = frozenset({'finish_test_run'})
+_MAX_TRACKED_LOGS = 1024
+
+
+class ReportingAgent:
+    """
+        Shares one OrangebeardClient, with its connections, batching and UUID resolution, between processes. Worker
+        processes report through an AgentClient connected to the agent's address. Workers hand out their own temporary
+        UUIDs at once; the agent maps them to the temporary UUIDs of its client. Temporary UUIDs of the agent's client
+        itself, such as the test run's, may be used by workers as they are.
+        Calls of one worker are handled in order; calls of different workers are handled one at a time. Run the client
+        with backgroundLoop, so start calls do not hold up other workers.
+
+        Args:
+            client (OrangebeardClient): The client to report through.
+            address: The address to listen on, a Unix socket in the temp directory if not given.
+            authkey (bytes): The key workers must authenticate with, random if not given.
+        """
+
+    def __init__(self, client: 'OrangebeardClient', address=None, authkey: bytes = None) -> None:
+        self.__client = client
+        self.__lock = threading.Lock()
+        self.__authkey = authkey if authkey is not None else os.urandom(32)
+        self.__listener = Listener(address, authkey=self.__authkey)
+        self.__threads: list[threading.Thread] = []
+        self.__stopping = False
+        self.__accept_thread = threading.Thread(target=self.__accept, name='orangebeard-agent', daemon=True)
+
+    @property
+    def address(self):
+        """The address AgentClients connect to."""
+        return self.__listener.address
+
+    @property
+    def authkey(self) -> bytes:
+        return self.__authkey
+
+    def start(self) -> None:
+        """Start accepting workers."""
+        self.__accept_thread.start()
+
+    def stop(self) -> None:
+        """Stop accepting workers and wait until the connected workers have disconnected."""
+        self.__stopping = True
+        if self.__accept_thread.is_alive():
+            Client(self.address, authkey=self.__authkey).close()
+            self.__accept_thread.join()
+        self.__listener.close()
+        for thread in self.__threads:
+            thread.join()
+
+    def __accept(self) -> None:
+        while True:
+            try:
+                connection = self.__listener.accept()
+            except OSError:
+                return
+            if self.__stopping:
+                connection.close()
+                return
+            thread = threading.Thread(target=self.__serve, args=(connection,), name='orangebeard-agent-worker',
+                                      daemon=True)
+            self.__threads.append(thread)
+            thread.start()
+
+    def __serve(self, connection: Connection) -> None:
+        uuid_mapping: dict[UUID, UUID] = {}
+        log_mapping: OrderedDict[UUID, UUID] = OrderedDict()
+        with connection:
+            while True:
+                try:
+                    name, worker_uuids, args = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                result = None
+                try:
+                    result = self.__handle(name, worker_uuids, args, uuid_mapping, log_mapping)
+                except Exception as error:  # the worker does not wait for the outcome, so report it here
+                    print(f'Orangebeard agent failed to handle {name}: {error!r}')
+                if name in _ANSWERED_CALLS:
+                    connection.send(result)
+
+    def __handle(self, name: str, worker_uuids: list[UUID] | None, args: tuple,
+                 uuid_mapping: dict[UUID, UUID], log_mapping: OrderedDict[UUID, UUID]):
+        if name not in _FORWARDED_CALLS:
+            raise ValueError(f'Unknown call {name}')
+
+        def translate(value):
+            if isinstance(value, UUID):
+                return uuid_mapping.get(value) or log_mapping.get(value) or value
+            if isinstance(value, Serializable):
+                for field in type(value)._fields:
+                    setattr(value, field, translate(getattr(value, field)))
+            return value
+
+        translated_args = [translate(arg) for arg in args]
+        with self.__lock:
+            result = getattr(self.__client, name)(*translated_args)
+
+        if worker_uuids is not None:
+            agent_uuids = result if isinstance(result, list) else [result]
+            mapping = log_mapping if name == 'log' else uuid_mapping
+            mapping.update(zip(worker_uuids, agent_uuids))
+            while len(log_mapping) > _MAX_TRACKED_LOGS:
+                log_mapping.popitem(last=False)
+        if name in ('finish_test', 'finish_step'):
+            uuid_mapping.pop(args[0], None)
+        return result
+
+
+class AgentClient:
+    """
+        Reports through a ReportingAgent in another process, with the reporting methods of OrangebeardClient. Calls
+        return at once: they are handed to the agent and its client makes them, except for finish_test_run, which
+        waits until the test run is finished. Thread-safe.
+
+        Args:
+            address: The address of the agent.
+            authkey (bytes): The key of the agent.
+        """
+
+    def __init__(self, address, authkey: bytes) -> None:
+        self.__connection = Client(address, authkey=authkey)
+        self.__lock = threading.Lock()
+
+    def start_test_run(self, start_test_run: StartTestRun) -> UUID:
+        return self.__send('start_test_run', start_test_run)[0]
+
+    def start_announced_test_run(self, test_run_uuid: UUID) -> None:
+        self.__send('start_announced_test_run', test_run_uuid, uuid_count=0)
+
+    def finish_test_run(self, test_run_uuid: UUID, finish_test_run: FinishTestRun) -> None:
+        with self.__lock:
+            self.__connection.send(('finish_test_run', None, (test_run_uuid, finish_test_run)))
+            self.__connection.recv()
+
+    def start_suite(self, start_suite: StartSuite) -> list[UUID]:
+        return self.__send('start_suite', start_suite, uuid_count=len(start_suite.suiteNames))
+
+    def start_test(self, start_test: StartTest) -> UUID:
+        return self.__send('start_test', start_test)[0]
+
+    def finish_test(self, test_uuid: UUID, finish_test: FinishTest) -> None:
+        self.__send('finish_test', test_uuid, finish_test, uuid_count=0)
+
+    def start_step(self, start_step: StartStep) -> UUID:
+        return self.__send('start_step', start_step)[0]
+
+    def finish_step(self, step_uuid: UUID, finish_step: FinishStep) -> None:
+        self.__send('finish_step', step_uuid, finish_step, uuid_count=0)
+
+    def log(self, log: Log) -> UUID:
+        return self.__send('log', log)[0]
+
+    def send_attachment(self, attachment: Attachment) -> UUID:
+        return self.__send('send_attachment', attachment)[0]
+
+    def close(self) -> None:
+        """Disconnect from the agent. Calls made before are still handled by the agent."""
+        with self.__lock:
+            self.__connection.close()
+
+    def __send(self, name: str, *args, uuid_count: int = 1) -> list[UUID] | None:
+        """Hand a call to the agent, with the temporary UUIDs it is to be known by in this worker."""
+        worker_uuids = [uuid.uuid4() for _ in range(uuid_count)] if uuid_count > 0 else None
+        with self.__lock:
+            self.__connection.send((name, worker_uuids, args))
+        return worker_uuids
@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+import enum
+import heapq
+import itertools
+from typing import AsyncIterator, Callable, Coroutine
+
+
+class RequestPriority(enum.IntEnum):
+    START = 0
+    FINISH = 1
+    LOG = 2
+    ATTACHMENT = 3
+
+
+class RequestScheduler:
+    """
+        Runs the client's background work and bounds the number of API requests in flight.
+
+        Requests wait for a free slot; waiting requests are admitted by priority first and in arrival order second,
+        so start and finish calls overtake bulk logs and attachments.
+        Must only be used from the thread that owns the event loop, or while the loop is not running.
+
+        Args:
+            event_loop (asyncio.AbstractEventLoop): The loop to run the work on.
+            max_in_flight (int): The maximum number of concurrent requests.
+        """
+
+    def __init__(self, event_loop: asyncio.AbstractEventLoop, max_in_flight: int = 16) -> None:
+        self.__event_loop = event_loop
+        self.__max_in_flight = max(1, max_in_flight)
+        self.__in_flight = 0
+        self.__queued = 0
+        self.__waiting: list[tuple[int, int, asyncio.Future]] = []
+        self.__sequence = itertools.count()
+        self.__tasks: set[asyncio.Task] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests waiting for a free slot."""
+        return self.__queued
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently being sent."""
+        return self.__in_flight
+
+    @property
+    def pending(self) -> int:
+        """The number of submitted calls that have not completed yet."""
+        return len(self.__tasks)
+
+    def submit(self, coroutine: Coroutine) -> asyncio.Task:
+        """
+        Run a coroutine as a tracked task.
+
+        Args:
+            coroutine (Coroutine): The call to run.
+
+        Returns:
+            asyncio.Task: The task running the call.
+        """
+        task = self.__event_loop.create_task(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
+
+    async def drain(self, timeout: float = None, report: Callable[[int], None] = None,
+                    report_interval: float = 5.0) -> int:
+        """
+        Wait concurrently for all submitted calls, including calls submitted while draining.
+
+        Args:
+            timeout (float): The maximum time in seconds to wait; calls still running after it are cancelled.
+            report (Callable): Called with the number of calls still running, every report_interval seconds.
+            report_interval (float): The time in seconds between progress reports.
+
+        Returns:
+            int: The number of calls that were cancelled because the timeout expired.
+        """
+        deadline = self.__event_loop.time() + timeout if timeout is not None else None
+        current_task = asyncio.current_task()
+        while True:
+            tasks = [task for task in self.__tasks if task is not current_task]
+            if not tasks:
+                return 0
+
+            wait_time = report_interval
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - self.__event_loop.time())
+                if wait_time <= 0:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    return len(tasks)
+
+            _, pending = await asyncio.wait(tasks, timeout=wait_time)
+            if pending and report is not None:
+                report(len(pending))
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: RequestPriority) -> AsyncIterator[None]:
+        """
+        Hold a request slot for the duration of the context.
+
+        Args:
+            priority (RequestPriority): The priority to wait for a slot with.
+        """
+        await self.__acquire(priority)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    async def __acquire(self, priority: RequestPriority) -> None:
+        if self.__in_flight < self.__max_in_flight and self.__queued == 0:
+            self.__in_flight += 1
+            return
+
+        waiter = self.__event_loop.create_future()
+        heapq.heappush(self.__waiting, (priority, next(self.__sequence), waiter))
+        self.__queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.__release()
+            else:
+                self.__queued -= 1
+            raise
+
+    def __release(self) -> None:
+        while self.__waiting:
+            _, _, waiter = heapq.heappop(self.__waiting)
+            if not waiter.done():
+                self.__queued -= 1
+                waiter.set_result(None)
+                return
+        self.__in_flight -= 1
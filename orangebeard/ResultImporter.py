@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timedelta
+from typing import Iterator
+from uuid import UUID
+
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.TestStatus import TestStatus
+from orangebeard.entity.TestType import TestType
+
+_ATTACHMENT_REFERENCE = re.compile(r'\[\[ATTACHMENT\|(.+?)]]')
+_MAX_PENDING_CALLS = 10000
+
+
+class ImportedTest:
+    """
+        A test result read from a result file.
+
+        Args:
+            suite_path (list[str]): The names of the suites the test is in, outermost first.
+            name (str): The name of the test.
+            status (TestStatus): The outcome of the test.
+            start_time (datetime): When the test started.
+            end_time (datetime): When the test ended.
+            description (str): The description of the test.
+            logs (list[tuple[LogLevel, str]]): The logs of the test, in order.
+            attachments (list[str]): The paths of the files attached to the test.
+        """
+    __slots__ = ('suite_path', 'name', 'status', 'start_time', 'end_time', 'description', 'logs', 'attachments')
+
+    def __init__(self, suite_path: list[str], name: str, status: TestStatus, start_time: datetime,
+                 end_time: datetime, description: str = None, logs: list[tuple[LogLevel, str]] = None,
+                 attachments: list[str] = None) -> None:
+        self.suite_path = suite_path
+        self.name = name
+        self.status = status
+        self.start_time = start_time
+        self.end_time = end_time
+        self.description = description
+        self.logs = logs or []
+        self.attachments = attachments or []
+
+
+def read_junit(path: str) -> Iterator[ImportedTest]:
+    """
+    Read the test results of a JUnit XML file, one test case at a time, without loading the whole file. Suites are
+    named after the (nested) testsuite elements, with the classname of a test case added when it differs. Failures,
+    errors, system-out and system-err become logs; [[ATTACHMENT|path]] lines in the output are read as attachments,
+    relative to the file.
+
+    Args:
+        path (str): The JUnit XML file.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    suites: list[tuple[ElementTree.Element, str, list[datetime]]] = []
+    for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+        if element.tag == 'testsuite':
+            if event == 'start':
+                start = _parse_time(element.get('timestamp')) or (suites[-1][2][0] if suites else _now())
+                suites.append((element, element.get('name') or 'tests', [start]))
+            else:
+                suites.pop()
+                element.clear()
+                if suites:
+                    suites[-1][0].remove(element)
+            continue
+        if event != 'end' or element.tag != 'testcase':
+            continue
+
+        suite_path = [name for _, name, _ in suites] or ['tests']
+        class_name = element.get('classname')
+        if class_name and class_name != suite_path[-1]:
+            suite_path.append(class_name)
+        cursor = suites[-1][2] if suites else [_now()]
+        start_time = cursor[0]
+        end_time = start_time + timedelta(seconds=_parse_float(element.get('time')))
+        cursor[0] = end_time
+
+        status = TestStatus.PASSED
+        logs = []
+        attachments = []
+        for child in element:
+            text = (child.text or '').strip()
+            if child.tag in ('failure', 'error'):
+                status = TestStatus.FAILED
+                message = child.get('message')
+                kind = child.get('type')
+                header = ': '.join(part for part in (kind, message) if part)
+                logs.append((LogLevel.ERROR, '\n\n'.join(part for part in (header, text) if part) or child.tag))
+            elif child.tag == 'skipped':
+                status = TestStatus.SKIPPED
+                if child.get('message') or text:
+                    logs.append((LogLevel.INFO, child.get('message') or text))
+            elif child.tag in ('system-out', 'system-err') and text:
+                attachments.extend(os.path.join(base_dir, reference)
+                                   for reference in _ATTACHMENT_REFERENCE.findall(text))
+                text = _ATTACHMENT_REFERENCE.sub('', text).strip()
+                if text:
+                    logs.append((LogLevel.INFO if child.tag == 'system-out' else LogLevel.WARN, text))
+
+        yield ImportedTest(suite_path, element.get('name') or 'test', status, start_time, end_time, logs=logs,
+                           attachments=attachments)
+        element.clear()
+        if suites:
+            suites[-1][0].remove(element)
+
+
+def read_ndjson(path: str) -> Iterator[ImportedTest]:
+    """
+    Read the test results of a newline-delimited JSON file, one line at a time. Each line holds one test, e.g.
+    {"suite": ["api", "users"], "name": "creates a user", "status": "FAILED", "start": "2024-05-01T10:00:00+02:00",
+    "duration": 0.25, "description": "...", "logs": [{"level": "ERROR", "message": "..."}],
+    "attachments": ["screenshots/user.png"]}. Only name is required; end may be given instead of duration, and
+    attachment paths are relative to the file.
+
+    Args:
+        path (str): The NDJSON file.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    cursor = _now()
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                result = json.loads(line)
+                suite = result.get('suite') or ['tests']
+                start_time = _parse_time(result.get('start')) or cursor
+                end_time = _parse_time(result.get('end')) \
+                    or start_time + timedelta(seconds=_parse_float(result.get('duration')))
+                test = ImportedTest(
+                    [suite] if isinstance(suite, str) else list(suite), result['name'],
+                    TestStatus(result.get('status', TestStatus.PASSED).upper()), start_time, end_time,
+                    result.get('description'),
+                    [(LogLevel(log.get('level', LogLevel.INFO).upper()), log['message'])
+                     for log in result.get('logs', ())],
+                    [os.path.join(base_dir, attachment) for attachment in result.get('attachments', ())])
+            except (KeyError, TypeError, ValueError) as error:
+                print(f'Skipping line {line_number} of {path}: {error!r}')
+                continue
+            cursor = end_time
+            yield test
+
+
+class ResultImporter:
+    """
+        Reports test results read from files through a client, which should run with backgroundLoop so the calls are
+        made concurrently. The client starts each suite path only once. When the client falls far behind the file,
+        reading pauses until it catches up, so memory use stays bounded however large the file is.
+
+        Args:
+            client (OrangebeardClient): The client to report through.
+            test_run_uuid (UUID): The UUID of the test run to report to.
+        """
+
+    def __init__(self, client, test_run_uuid: UUID) -> None:
+        self.__client = client
+        self.__test_run_uuid = test_run_uuid
+        self.counts = {'tests': 0, 'logs': 0, 'attachments': 0}
+
+    def report(self, tests: Iterator[ImportedTest]) -> None:
+        """
+        Report test results.
+
+        Args:
+            tests (Iterator[ImportedTest]): The results, e.g. from read_junit or read_ndjson.
+        """
+        for test in tests:
+            self.__report_test(test)
+            while self.__client.pending_work > _MAX_PENDING_CALLS:
+                time.sleep(0.05)
+
+    def __report_test(self, test: ImportedTest) -> None:
+        client = self.__client
+        test_run_uuid = self.__test_run_uuid
+        suite_uuid = client.start_suite(StartSuite(test_run_uuid, list(test.suite_path)))[-1]
+
+        test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, test.name, test.start_time,
+                                                TestType.TEST, test.description))
+        for level, message in test.logs:
+            client.log(Log(test_run_uuid, test_uuid, message, level, LogFormat.PLAIN_TEXT, None, test.end_time))
+            self.counts['logs'] += 1
+        for attachment_path in test.attachments:
+            if not os.path.isfile(attachment_path):
+                print(f'Attachment not found: {attachment_path}')
+                continue
+            attachment_file = AttachmentFile.from_path(attachment_path)
+            attachment_log_uuid = client.log(Log(test_run_uuid, test_uuid, f'Attachment: {attachment_file.name}',
+                                                 LogLevel.INFO, LogFormat.PLAIN_TEXT, None, test.end_time))
+            client.send_attachment(Attachment(attachment_file, AttachmentMetaData(
+                test_run_uuid, test_uuid, attachment_log_uuid, attachmentTime=test.end_time)))
+            self.counts['attachments'] += 1
+        client.finish_test(test_uuid, FinishTest(test_run_uuid, test.status, test.end_time))
+        self.counts['tests'] += 1
+
+
+def _now() -> datetime:
+    return datetime.now().astimezone()
+
+
+def _parse_time(value) -> datetime | None:
+    """Parse an ISO 8601 time; times without an offset are taken as local time."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone()
+    except ValueError:
+        return None
+
+
+def _parse_float(value) -> float:
+    try:
+        return max(0.0, float(str(value).replace(',', ''))) if value is not None else 0.0
+    except ValueError:
+        return 0.0
@@ -0,0 +1,140 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Mapping
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+
+class RetryPolicy:
+    """
+        Decides when failed API calls are retried. Delays follow decorrelated jitter: each delay is drawn between
+        base_delay and three times the previous one, capped at max_delay, unless the listener asks for a specific delay
+        with Retry-After. A call is given up after max_attempts attempts or once its deadline would pass.
+
+        A circuit breaker shared by all calls opens after failure_threshold consecutive failed attempts. While it is
+        open, calls are given up without being attempted. After recovery_time it half-opens and lets a single attempt
+        through, while other calls wait for its outcome: success closes the circuit again, failure keeps it open for
+        another recovery_time.
+        Subclass to change any of these decisions; all methods are called on the client's event loop.
+
+        Args:
+            max_attempts (int): The maximum number of attempts per call.
+            base_delay (float): The minimum delay in seconds between attempts.
+            max_delay (float): The maximum delay in seconds between attempts.
+            deadline (float): The maximum time in seconds a call may spend on attempts and delays, None for no limit.
+            failure_threshold (int): The number of consecutive failed attempts that opens the circuit.
+            recovery_time (float): The time in seconds the circuit stays open before it half-opens.
+        """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 16.0,
+                 deadline: float | None = 30.0, failure_threshold: int = 8, recovery_time: float = 10.0) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.__state = CircuitState.CLOSED
+        self.__consecutive_failures = 0
+        self.__opened_at = 0.0
+        self.__probe_started = None
+
+    @property
+    def state(self) -> CircuitState:
+        return self.__state
+
+    def backoff(self, previous_delay: float | None) -> float:
+        """
+        The delay before the next attempt.
+
+        Args:
+            previous_delay (float): The delay before the previous attempt, None after the first attempt.
+        """
+        upper = max(self.base_delay, (previous_delay or self.base_delay) * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def retry_after(self, status: int, headers: Mapping[str, str] | None) -> float | None:
+        """
+        The delay the listener asked for with a 429 or 503 response, if any.
+
+        Args:
+            status (int): The response status.
+            headers (Mapping): The response headers.
+
+        Returns:
+            float: The delay in seconds, capped at max_delay, or None if the response does not ask for one.
+        """
+        if status not in (429, 503) or not headers:
+            return None
+        value = headers.get('Retry-After')
+        if value is None:
+            return self.backoff(None) if status == 429 else None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(self.max_delay, max(0.0, delay))
+
+    def is_retryable(self, status: int | None) -> bool:
+        """
+        Whether a failed attempt may be retried: after connection errors, timeouts, 429 and server errors it may,
+        other rejections by the listener are final.
+
+        Args:
+            status (int): The response status, None if there was no response.
+        """
+        return status is None or status in (408, 429) or status >= 500
+
+    def is_failure(self, status: int | None) -> bool:
+        """
+        Whether a failed attempt counts towards opening the circuit: connection errors and server errors do,
+        responses that show the listener is up, such as 429 and 503 asking to slow down, do not.
+
+        Args:
+            status (int): The response status, None if there was no response.
+        """
+        return status is None or (status >= 500 and status != 503)
+
+    def attempt_delay(self) -> float | None:
+        """
+        The time to wait before an attempt may be made: 0 if it may be made now, None if the circuit is open and the
+        call should be given up. In the half-open state, the first caller gets 0 and makes the single trial attempt.
+        """
+        if self.__state is CircuitState.CLOSED:
+            return 0.0
+        if self.__state is CircuitState.OPEN:
+            if time.monotonic() < self.__opened_at + self.recovery_time:
+                return None
+            self.__state = CircuitState.HALF_OPEN
+        if self.__probe_started is not None and time.monotonic() - self.__probe_started < self.recovery_time:
+            return self.base_delay
+        self.__probe_started = time.monotonic()
+        return 0.0
+
+    def record_success(self) -> None:
+        """Record an attempt that reached the listener, closing the circuit."""
+        if self.__state is not CircuitState.CLOSED:
+            print('Orangebeard is reachable again, resuming requests')
+        self.__state = CircuitState.CLOSED
+        self.__consecutive_failures = 0
+        self.__probe_started = None
+
+    def record_failure(self) -> None:
+        """Record an attempt that failed in a way that counts towards opening the circuit."""
+        self.__consecutive_failures += 1
+        if self.__state is CircuitState.HALF_OPEN or (
+                self.__state is CircuitState.CLOSED and self.__consecutive_failures >= self.failure_threshold):
+            if self.__state is CircuitState.CLOSED:
+                print(f'Orangebeard is not responding, pausing requests for {self.recovery_time} seconds')
+            self.__state = CircuitState.OPEN
+            self.__opened_at = time.monotonic()
+            self.__probe_started = None
@@ -0,0 +1,92 @@
+import json
+import os
+import re
+import shutil
+import time
+from typing import Iterator
+from uuid import uuid4
+
+from orangebeard.entity.Attachment import AttachmentFile
+
+UUID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+
+class Spool:
+    """
+        Append-only segment file holding the API calls that could not be delivered to Orangebeard, in the order they
+        were made. Entities created by spooled calls are referred to by their temporary UUID, which replay_spool maps
+        to the real UUID once the call is replayed. Attachment content is copied next to the segment file.
+
+        Args:
+            directory (str): The directory to create the segment file in.
+        """
+
+    def __init__(self, directory: str) -> None:
+        self.__directory = directory
+        self.__path = None
+        self.__file = None
+        self.__count = 0
+
+    @property
+    def path(self) -> str | None:
+        """The segment file, None as long as nothing was spooled."""
+        return self.__path
+
+    @property
+    def count(self) -> int:
+        """The number of spooled calls."""
+        return self.__count
+
+    def append(self, method: str, uri: str, body: str | None, placeholders: list[str],
+               attachment_file: AttachmentFile = None) -> None:
+        """
+        Write a call to the segment file.
+
+        Args:
+            method (str): The HTTP method.
+            uri (str): The request URI.
+            body (str): The JSON body, or the attachment metadata for attachments.
+            placeholders (list[str]): The temporary UUIDs standing in for the UUIDs the call would have returned.
+            attachment_file (AttachmentFile): The file to upload, for attachments.
+        """
+        if self.__file is None:
+            os.makedirs(self.__directory, exist_ok=True)
+            self.__path = os.path.join(self.__directory,
+                                       f'orangebeard-spool-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.ndjson')
+            self.__file = open(self.__path, 'a', encoding='utf-8')
+
+        record = {'method': method, 'uri': uri, 'body': body, 'placeholders': placeholders}
+        if attachment_file is not None:
+            files_directory = self.__path + '.files'
+            os.makedirs(files_directory, exist_ok=True)
+            file_path = os.path.join(files_directory, uuid4().hex)
+            with attachment_file.reader() as content:
+                with open(file_path, 'wb') as spooled_file:
+                    if isinstance(content, bytes):
+                        spooled_file.write(content)
+                    else:
+                        shutil.copyfileobj(content, spooled_file)
+            record['file'] = {'path': file_path, 'name': attachment_file.name,
+                              'contentType': attachment_file.contentType}
+
+        self.__file.write(json.dumps(record) + '\n')
+        self.__file.flush()
+        self.__count += 1
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+def read_spool(path: str) -> Iterator[dict]:
+    """
+    Read the calls from a segment file one at a time, in their original order.
+
+    Args:
+        path (str): The segment file.
+    """
+    with open(path, 'r', encoding='utf-8') as spool_file:
+        for line in spool_file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,52 @@
+import asyncio
+from collections import deque
+from typing import Callable
+
+
+class SubmissionQueue:
+    """
+        Hands calls from any number of threads to the thread running an event loop, in the order they were put.
+
+        Putting a call only appends it to a deque, which needs no lock. The loop is woken up, through its self-pipe,
+        only when no drain is scheduled yet, and then runs all calls that were put in the meantime at once. Threads
+        that report at a high rate thus hardly contend with each other or with the loop.
+
+        Args:
+            event_loop (asyncio.AbstractEventLoop): The loop to run the calls on.
+        """
+
+    def __init__(self, event_loop: asyncio.AbstractEventLoop) -> None:
+        self.__event_loop = event_loop
+        self.__calls: deque[tuple[Callable, tuple]] = deque()
+        self.__drain_scheduled = False
+
+    def __len__(self) -> int:
+        return len(self.__calls)
+
+    def put(self, callback: Callable, *args) -> None:
+        """
+        Run a callback on the loop's thread, after the callbacks put before it. Safe to call from any thread.
+
+        Args:
+            callback (Callable): The function to call.
+            *args: The arguments to call it with.
+        """
+        self.__calls.append((callback, args))
+        if not self.__drain_scheduled:
+            # another thread may schedule a drain at the same time; the second drain then finds nothing to run
+            self.__drain_scheduled = True
+            self.__event_loop.call_soon_threadsafe(self.__drain)
+
+    def __drain(self) -> None:
+        # reset the flag before taking calls, so a call put after the last one was taken schedules a new drain
+        self.__drain_scheduled = False
+        calls = self.__calls
+        while calls:
+            callback, args = calls.popleft()
+            try:
+                callback(*args)
+            except Exception as error:  # one failing call must not hold up the calls of other threads
+                self.__event_loop.call_exception_handler({
+                    'message': f'Orangebeard call {getattr(callback, "__qualname__", callback)} failed',
+                    'exception': error
+                })
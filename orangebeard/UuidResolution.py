@@ -0,0 +1,62 @@
+import asyncio
+from typing import Callable, Coroutine
+from uuid import UUID
+
+
+class UuidResolution:
+    """
+        The outcome of a call that was handed out a temporary UUID: the real UUID assigned by Orangebeard, or None
+        when the call failed or does not create an entity. The call itself may be deferred: it is then made by the
+        first caller of wait(), unless it was made already.
+
+        Args:
+            real_uuid (UUID): The real UUID, if it is already known.
+        """
+    __slots__ = ('__event', '__real_uuid', '__claim_call')
+
+    def __init__(self, real_uuid: UUID = None) -> None:
+        self.__event = asyncio.Event()
+        self.__real_uuid = None
+        self.__claim_call = None
+        if real_uuid is not None:
+            self.resolve(real_uuid)
+
+    @property
+    def real_uuid(self) -> UUID | None:
+        return self.__real_uuid
+
+    def resolve(self, real_uuid: UUID | None) -> None:
+        """
+        Store the real UUID and wake up everything waiting for it. Must be called on the event loop's thread.
+
+        Args:
+            real_uuid (UUID): The real UUID, or None if the call did not yield one.
+        """
+        self.__real_uuid = real_uuid
+        self.__event.set()
+
+    def defer(self, claim_call: Callable[[], Coroutine | None]) -> None:
+        """
+        Mark the call as deferred. Must be called on the event loop's thread.
+
+        Args:
+            claim_call (Callable): Returns the coroutine making the call, or None if it was made or claimed already.
+        """
+        self.__claim_call = claim_call
+
+    def is_set(self) -> bool:
+        return self.__event.is_set()
+
+    async def wait(self) -> UUID | None:
+        """
+        Wait until the call is done.
+
+        Returns:
+            UUID: The real UUID, or None if the call did not yield one.
+        """
+        if self.__claim_call is not None:
+            call, self.__claim_call = self.__claim_call(), None
+            if call is not None:
+                await call
+        await self.__event.wait()
+        return self.__real_uuid
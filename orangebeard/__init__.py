@@ -1,5 +1,30 @@
-from orangebeard.OrangebeardClient import OrangebeardClient
-
-__all__ = [
-    'OrangebeardClient',
-]
+import importlib
+import sys
+import types
+
+__all__ = [
+    'OrangebeardClient',
+    'AsyncOrangebeardClient',
+    'OrangebeardLogHandler',
+]
+
+
+def __getattr__(name: str):
+    # the clients pull in asyncio and, on their first request, aiohttp; they are only imported when used, so
+    # importing an entity or starting the CLI stays fast
+    if name in __all__:
+        client_class = getattr(importlib.import_module(f'orangebeard.{name}'), name)
+        globals()[name] = client_class
+        return client_class
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # importing a client module binds the module to the package under the class name; keep the class there
+        if name in __all__ and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -68,4 +68,9 @@ def get_config(path_to_resolve: str) -> OrangebeardParameters:
     return update_config_parameters_from_env(config_from_file)
 
 
-config = get_config(os.getcwd())
+def __getattr__(name: str):
+    # the configuration is looked up on first use rather than on import, as that walks up the directory tree
+    if name == 'config':
+        globals()['config'] = get_config(os.getcwd())
+        return globals()['config']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
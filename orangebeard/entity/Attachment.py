@@ -1,41 +1,62 @@
-from datetime import datetime
-import mimetypes
-from uuid import UUID
-from pytz import reference
-
-from orangebeard.entity.Serializable import Serializable
-
-tz = reference.LocalTimezone()
-
-
-class Attachment(Serializable):
-    def __init__(self, file, meta_data):
-        self.AttachmentFile: AttachmentFile = file
-        self.AttachmentMetaData: AttachmentMetaData = meta_data
-
-
-class AttachmentFile(Serializable):
-    def __init__(self, name, content):
-        self.name = name
-        self.content: bytes = content
-        self.contentType = mimetypes.guess_type(name)[0] or 'application/octet-stream'
-
-
-class AttachmentMetaData(Serializable):
-    def __init__(
-            self,
-            testRunUUID: UUID,
-            testUUID: UUID,
-            logUUID: UUID,
-            stepUUID: UUID = None,  # type: ignore
-            attachmentTime=None,
-    ):
-        self.testRunUUID = testRunUUID
-        self.testUUID = testUUID
-        self.stepUUID = stepUUID if stepUUID else None
-        self.logUUID = logUUID
-        self.attachmentTime = (
-            attachmentTime.strftime("%Y-%m-%dT%H:%M:%S%z")
-            if attachmentTime
-            else datetime.now(tz).strftime("%Y-%m-%dT%H:%M:%S%z")
-        )
+from contextlib import contextmanager
+import mimetypes
+import os
+from typing import BinaryIO, Iterator
+from uuid import UUID
+
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.Timestamp import Timestamp, now
+
+
+class Attachment(Serializable):
+    __slots__ = ('AttachmentFile', 'AttachmentMetaData')
+
+    def __init__(self, file, meta_data):
+        self.AttachmentFile: AttachmentFile = file
+        self.AttachmentMetaData: AttachmentMetaData = meta_data
+
+
+class AttachmentFile(Serializable):
+    __slots__ = ('name', 'content', 'path', 'contentType')
+
+    def __init__(self, name, content=None, path=None):
+        self.name = name
+        self.content: bytes = content
+        self.path = path
+        self.contentType = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    @classmethod
+    def from_path(cls, path, name=None):
+        """Create an attachment file that is streamed from disk when uploaded, instead of held in memory."""
+        return cls(name if name is not None else os.path.basename(path), path=path)
+
+    @contextmanager
+    def reader(self) -> Iterator[bytes | BinaryIO]:
+        """Yield the content to upload: the bytes, or the file opened anew so every upload reads it from the start."""
+        if self.path is None:
+            yield self.content
+        else:
+            with open(self.path, 'rb') as file:
+                yield file
+
+
+class AttachmentMetaData(Serializable):
+    __slots__ = ('testRunUUID', 'testUUID', 'stepUUID', 'logUUID', 'attachmentTime')
+
+    def __init__(
+            self,
+            testRunUUID: UUID,
+            testUUID: UUID,
+            logUUID: UUID,
+            stepUUID: UUID = None,  # type: ignore
+            attachmentTime=None,
+    ):
+        self.testRunUUID = testRunUUID
+        self.testUUID = testUUID
+        self.stepUUID = stepUUID if stepUUID else None
+        self.logUUID = logUUID
+        self.attachmentTime = (
+            Timestamp.of(attachmentTime, fraction=False)
+            if attachmentTime
+            else now(fraction=False)
+        )
@@ -2,6 +2,8 @@ from orangebeard.entity.Serializable import Serializable
 
 
 class Attribute(Serializable):
+    __slots__ = ('key', 'value')
+
     def __init__(self, key=None, value=None):
         if value is None:  # If only one argument is passed, treat it as a value
             self.key = None
@@ -1,8 +1,11 @@
-from orangebeard.entity.Serializable import Serializable
-
-
-class FinishStep(Serializable):
-    def __init__(self, testRunUUID, status, endTime):
-        self.testRunUUID = testRunUUID
-        self.status = status
-        self.endTime = endTime.strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.Timestamp import Timestamp
+
+
+class FinishStep(Serializable):
+    __slots__ = ('testRunUUID', 'status', 'endTime')
+
+    def __init__(self, testRunUUID, status, endTime):
+        self.testRunUUID = testRunUUID
+        self.status = status
+        self.endTime = Timestamp.of(endTime)
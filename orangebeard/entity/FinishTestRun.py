@@ -1,6 +1,9 @@
-from orangebeard.entity.Serializable import Serializable
-
-
-class FinishTestRun(Serializable):
-    def __init__(self, endTime):
-        self.endTime = endTime.strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.Timestamp import Timestamp
+
+
+class FinishTestRun(Serializable):
+    __slots__ = ('endTime',)
+
+    def __init__(self, endTime):
+        self.endTime = Timestamp.of(endTime)
@@ -1,14 +1,17 @@
-from orangebeard.entity.Serializable import Serializable
-
-
-class Log(Serializable):
-    def __init__(
-            self, testRunUUID, testUUID, message, logLevel, logFormat, stepUUID, logTime
-    ):
-        self.testRunUUID = testRunUUID
-        self.testUUID = testUUID
-        self.stepUUID = stepUUID if stepUUID else None
-        self.logTime = logTime.strftime("%Y-%m-%dT%H:%M:%S.%f%z")
-        self.message = message
-        self.logLevel = logLevel
-        self.logFormat = logFormat
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.Timestamp import Timestamp
+
+
+class Log(Serializable):
+    __slots__ = ('testRunUUID', 'testUUID', 'stepUUID', 'logTime', 'message', 'logLevel', 'logFormat')
+
+    def __init__(
+            self, testRunUUID, testUUID, message, logLevel, logFormat, stepUUID, logTime
+    ):
+        self.testRunUUID = testRunUUID
+        self.testUUID = testUUID
+        self.stepUUID = stepUUID if stepUUID else None
+        self.logTime = Timestamp.of(logTime)
+        self.message = message
+        self.logLevel = logLevel
+        self.logFormat = logFormat
@@ -10,7 +10,23 @@ class OrangebeardParameters(Serializable):
                  description=None,
                  attributes=None,
                  reference_url=None,
-                 testrun_uuid=None
+                 testrun_uuid=None,
+                 background_loop=False,
+                 log_batch_size=1,
+                 log_batch_delay=1.0,
+                 log_size_limit=262144,
+                 max_in_flight=16,
+                 drain_timeout=None,
+                 attachment_compression=False,
+                 connection_limit=100,
+                 connection_limit_per_host=0,
+                 keepalive_timeout=30.0,
+                 dns_cache_ttl=300,
+                 connect_timeout=30.0,
+                 read_timeout=300.0,
+                 spool_directory=None,
+                 coalesce_window=None,
+                 stats_file=None
                  ):
         self.token = token
         self.endpoint = endpoint
@@ -20,3 +36,19 @@ class OrangebeardParameters(Serializable):
         self.attributes = attributes or []
         self.referenceUrl = reference_url
         self.testrun_uuid = testrun_uuid
+        self.backgroundLoop = background_loop
+        self.logBatchSize = log_batch_size
+        self.logBatchDelay = log_batch_delay
+        self.logSizeLimit = log_size_limit
+        self.maxInFlight = max_in_flight
+        self.drainTimeout = drain_timeout
+        self.attachmentCompression = attachment_compression
+        self.connectionLimit = connection_limit
+        self.connectionLimitPerHost = connection_limit_per_host
+        self.keepaliveTimeout = keepalive_timeout
+        self.dnsCacheTtl = dns_cache_ttl
+        self.connectTimeout = connect_timeout
+        self.readTimeout = read_timeout
+        self.spoolDirectory = spool_directory
+        self.coalesceWindow = coalesce_window
+        self.statsFile = stats_file
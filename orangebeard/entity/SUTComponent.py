@@ -2,6 +2,8 @@ from orangebeard.entity.Serializable import Serializable
 
 
 class SUTComponent(Serializable):
+    __slots__ = ('componentId', 'componentName', 'version', 'status', 'createDateTime', 'updateDateTime')
+
     def __init__(self, componentId, componentName, version, status, createdDateTime, updatedDateTime):
         self.componentId = componentId
         self.componentName = componentName
@@ -1,24 +1,60 @@
-import json
-from uuid import UUID
-
-
-class Serializable:
-
-    def __make_serializable(self):
-        serializable_dict = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, UUID):
-                serializable_dict[key] = str(value)
-            else:
-                if value is not None:
-                    serializable_dict[key] = value
-        return serializable_dict
-
-    def __getitem__(self, key):
-        try:
-            return getattr(self, key)
-        except AttributeError:
-            raise KeyError(f'[{key}] not found in {self.__class__.__name__}')
-
-    def to_json(self):
-        return json.dumps(self.__make_serializable(), default=lambda o: o.__dict__)
+import json
+from operator import attrgetter
+from uuid import UUID
+
+from orangebeard.entity.Timestamp import Timestamp
+
+
+class Serializable:
+    """
+        Base class of the entities sent to Orangebeard. Entity classes list their fields in __slots__, in the order
+        they appear in the JSON; the fields are collected once per class, when the class is defined. Classes without
+        __slots__, such as OrangebeardParameters, are serialized from their __dict__.
+        """
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+    _get_values = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__') and name not in fields:
+                    fields.append(name)
+        cls._fields = tuple(fields)
+        cls._get_values = None
+        if fields and all('__slots__' in klass.__dict__ for klass in cls.__mro__[:-1]):
+            cls._get_values = attrgetter(*fields) if len(fields) > 1 else lambda entity: (getattr(entity, fields[0]),)
+
+    def __items(self):
+        get_values = type(self)._get_values
+        if get_values is not None:
+            try:
+                return zip(self._fields, get_values(self))
+            except AttributeError:
+                pass
+        items = {key: getattr(self, key) for key in self._fields if hasattr(self, key)}
+        items.update(getattr(self, '__dict__', {}))
+        return items.items()
+
+    def __make_serializable(self):
+        return {key: str(value) if isinstance(value, (UUID, Timestamp)) else value
+                for key, value in self.__items() if value is not None}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(f'[{key}] not found in {self.__class__.__name__}')
+
+    def to_json(self):
+        return _ENCODER.encode(self.__make_serializable())
+
+    @staticmethod
+    def _nested_fields(o):
+        return dict(o.__items()) if isinstance(o, Serializable) else o.__dict__
+
+
+_ENCODER = json.JSONEncoder(default=Serializable._nested_fields)
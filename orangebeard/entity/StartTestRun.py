@@ -1,21 +1,24 @@
-from datetime import datetime
-from typing import List
-from orangebeard.entity.Attribute import Attribute
-from orangebeard.entity.SUTComponent import SUTComponent
-from orangebeard.entity.Serializable import Serializable
-
-
-class StartTestRun(Serializable):
-    def __init__(
-        self,
-        testSetName,
-        startTime: datetime,
-        description,
-        attributes: List[Attribute] = None,
-        sutComponents: List[SUTComponent] = None,
-    ):
-        self.testSetName = testSetName
-        self.description = description
-        self.startTime = startTime.strftime("%Y-%m-%dT%H:%M:%S.%f%z")
-        self.attributes = attributes
-        self.sutComponents = sutComponents
+from datetime import datetime
+from typing import List
+from orangebeard.entity.Attribute import Attribute
+from orangebeard.entity.SUTComponent import SUTComponent
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.Timestamp import Timestamp
+
+
+class StartTestRun(Serializable):
+    __slots__ = ('testSetName', 'description', 'startTime', 'attributes', 'sutComponents')
+
+    def __init__(
+        self,
+        testSetName,
+        startTime: datetime | Timestamp,
+        description,
+        attributes: List[Attribute] = None,
+        sutComponents: List[SUTComponent] = None,
+    ):
+        self.testSetName = testSetName
+        self.description = description
+        self.startTime = Timestamp.of(startTime)
+        self.attributes = attributes
+        self.sutComponents = sutComponents
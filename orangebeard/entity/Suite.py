@@ -3,6 +3,8 @@ from orangebeard.entity.Serializable import Serializable
 
 
 class Suite(Serializable):
+    __slots__ = ('suiteUUID', 'parentUUID', 'localSuiteName', 'fullSuitePath')
+
     def __init__(
         self,
         suiteUUID: UUID,
@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_CLOCK_CHECK_INTERVAL = 900 * 1_000_000
+
+_last_prefix = (None, '')
+_offset_texts: dict[int, str] = {}
+_clock = (None, 0, 0)
+
+
+class Timestamp:
+    """
+        A point in time that is only formatted when the entity holding it is serialized. It keeps the wall-clock time in
+        microseconds together with its UTC offset, and formats as %Y-%m-%dT%H:%M:%S.%f%z would, or without the
+        microseconds. The date and time part is cached per second and the offset part per offset, so the many
+        timestamps of a busy run are cheap to format.
+
+        Args:
+            local_micros (int): The wall-clock time in microseconds since 1970-01-01T00:00:00.
+            utc_offset (int): The UTC offset in seconds, None for a naive time without offset.
+            fraction (bool): Whether to include the microseconds.
+        """
+    __slots__ = ('__local_micros', '__utc_offset', '__fraction', '__text')
+
+    def __init__(self, local_micros: int, utc_offset: int | None, fraction: bool = True) -> None:
+        self.__local_micros = local_micros
+        self.__utc_offset = utc_offset
+        self.__fraction = fraction
+        self.__text = None
+
+    @classmethod
+    def of(cls, moment: 'datetime | Timestamp', fraction: bool = True) -> 'Timestamp':
+        """
+        Wrap a datetime, which may be naive or timezone-aware. Timestamps are returned as they are, or converted to
+        the requested precision.
+        """
+        if isinstance(moment, Timestamp):
+            return moment if moment.__fraction == fraction \
+                else Timestamp(moment.__local_micros, moment.__utc_offset, fraction)
+        utc_offset = moment.utcoffset()
+        local_micros = (moment.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+        return cls(local_micros, int(utc_offset.total_seconds()) if utc_offset is not None else None, fraction)
+
+    @property
+    def epoch_micros(self) -> int:
+        """Microseconds since the Unix epoch; for a naive time the wall-clock time is taken as UTC."""
+        return self.__local_micros - (self.__utc_offset or 0) * 1_000_000
+
+    def __str__(self) -> str:
+        if self.__text is None:
+            self.__text = _format(self.__local_micros, self.__utc_offset, self.__fraction)
+        return self.__text
+
+    def __repr__(self) -> str:
+        return f'Timestamp({str(self)!r})'
+
+
+def now(fraction: bool = True) -> Timestamp:
+    """
+    The current local time. Reads the monotonic clock, anchored to the wall clock, so timestamps taken close together
+    never go backwards. Every 15 minutes the clock is anchored again and the UTC offset looked up again, so a
+    corrected wall clock, a suspend or a change to daylight saving time is picked up.
+
+    Args:
+        fraction (bool): Whether to include the microseconds.
+    """
+    global _clock
+    monotonic_micros = time.monotonic_ns() // 1000
+    checked_at, clock_base, utc_offset = _clock
+    if checked_at is None or not 0 <= monotonic_micros - checked_at < _CLOCK_CHECK_INTERVAL:
+        clock_base = time.time_ns() // 1000 - monotonic_micros
+        utc_offset = time.localtime((clock_base + monotonic_micros) // 1_000_000).tm_gmtoff
+        _clock = (monotonic_micros, clock_base, utc_offset)
+    epoch_micros = clock_base + monotonic_micros
+    return Timestamp(epoch_micros + utc_offset * 1_000_000, utc_offset, fraction)
+
+
+def _format(local_micros: int, utc_offset: int | None, fraction: bool) -> str:
+    global _last_prefix
+    second, micro = divmod(local_micros, 1_000_000)
+    last_second, prefix = _last_prefix
+    if second != last_second:
+        prefix = (_EPOCH + timedelta(seconds=second)).isoformat()
+        _last_prefix = (second, prefix)
+
+    if utc_offset is None:
+        offset_text = ''
+    else:
+        offset_text = _offset_texts.get(utc_offset)
+        if offset_text is None:
+            sign = '-' if utc_offset < 0 else '+'
+            hours, rest = divmod(abs(utc_offset), 3600)
+            minutes, seconds = divmod(rest, 60)
+            offset_text = f'{sign}{hours:02d}{minutes:02d}' + (f'{seconds:02d}' if seconds else '')
+            _offset_texts[utc_offset] = offset_text
+    return f'{prefix}.{micro:06d}{offset_text}' if fraction else prefix + offset_text
@@ -0,0 +1,9 @@
+import pytest
+
+from tests.mock_listener import MockListener
+
+
+@pytest.fixture
+def listener():
+    with MockListener(latency=0.001, record=True) as mock_listener:
+        yield mock_listener
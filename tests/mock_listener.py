@@ -0,0 +1,159 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import uuid
+
+from aiohttp import web
+
+_ENDPOINT_PREFIX = re.compile(r'^/?listener/v3/[^/]+/')
+_UUID_SEGMENT = re.compile(r'/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+
+class MockListener:
+    """
+        An in-process stand-in for the listener/v3 endpoints of Orangebeard, for testing and benchmarking the client
+        offline. It runs its own event loop in a background thread and answers every call with fresh UUIDs, after the
+        configured latency. Attempts can fail with a 500, or be throttled with a 429 and a Retry-After header, at
+        random. The settings may be changed while it runs, e.g. to let a listener that failed every call recover.
+
+        Args:
+            latency (float): The time in seconds each response is held back.
+            error_rate (float): The fraction of requests answered with a 500.
+            throttle_rate (float): The fraction of requests answered with a 429.
+            retry_after (float): The delay in seconds 429 responses ask for.
+            seed (int): The seed of the random error and throttle injection.
+            log_batch (bool): Whether the log batch endpoint exists; it answers 404 if not.
+            record (bool): Whether to keep every request and the UUIDs handed out, see received and issued.
+        """
+
+    def __init__(self, latency: float = 0.005, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: float = 0.1, seed: int | None = None, log_batch: bool = True,
+                 record: bool = False) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.log_batch = log_batch
+        self.__record = record
+        self.__random = random.Random(seed)
+        self.__counts: dict[str, int] = {}
+        self.__statuses: dict[int, int] = {}
+        self.__bytes_received = 0
+        self.__received: list[tuple[str, str, bytes]] = []
+        self.__issued: set[str] = set()
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(target=self.__loop.run_forever, name='mock-listener', daemon=True)
+        self.__runner = None
+        self.__port = None
+
+    @property
+    def endpoint(self) -> str:
+        """The base URL to configure the client with."""
+        return f'http://127.0.0.1:{self.__port}'
+
+    @property
+    def requests(self) -> int:
+        return sum(self.__counts.values())
+
+    @property
+    def bytes_received(self) -> int:
+        return self.__bytes_received
+
+    @property
+    def received(self) -> list[tuple[str, str, bytes]]:
+        """The endpoint, path and body of every request answered with a 2xx, in order, when recording."""
+        return list(self.__received)
+
+    @property
+    def issued(self) -> set[str]:
+        """The UUIDs handed out in responses, when recording."""
+        return set(self.__issued)
+
+    def counts(self) -> dict[str, int]:
+        """The number of requests per endpoint, named by method and path without the project and UUIDs."""
+        return dict(self.__counts)
+
+    def statuses(self) -> dict[int, int]:
+        """The number of responses per status."""
+        return dict(self.__statuses)
+
+    def start(self) -> None:
+        self.__thread.start()
+        asyncio.run_coroutine_threadsafe(self.__start(), self.__loop).result()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.__runner.cleanup(), self.__loop).result()
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop.close()
+
+    def __enter__(self) -> 'MockListener':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @staticmethod
+    def endpoint_of(method: str, path: str) -> str:
+        """The name of an endpoint, e.g. "PUT test/finish/{id}"."""
+        return f'{method} {_UUID_SEGMENT.sub("/{id}", _ENDPOINT_PREFIX.sub("", path))}'
+
+    async def __start(self) -> None:
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_route('*', '/{tail:.*}', self.__handle)
+        self.__runner = web.AppRunner(app, access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, '127.0.0.1', 0)
+        await site.start()
+        self.__port = self.__runner.addresses[0][1]
+
+    async def __handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        endpoint = self.endpoint_of(request.method, request.path)
+        self.__counts[endpoint] = self.__counts.get(endpoint, 0) + 1
+        self.__bytes_received += len(body)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        draw = self.__random.random()
+        if draw < self.error_rate:
+            response = web.Response(status=500)
+        elif draw < self.error_rate + self.throttle_rate:
+            response = web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+        elif request.path.endswith('/log/batch') and not self.log_batch:
+            response = web.Response(status=404)
+        else:
+            response = self.__respond(request, body)
+            if self.__record:
+                self.__received.append((endpoint, request.path, body))
+        self.__statuses[response.status] = self.__statuses.get(response.status, 0) + 1
+        return response
+
+    def __respond(self, request: web.Request, body: bytes) -> web.StreamResponse:
+        path = request.path
+        if path.endswith('/log/batch'):
+            return web.json_response([self.__new_uuid() for _ in json.loads(body)])
+        if path.endswith('/suite/start'):
+            start_suite = json.loads(body)
+            parent = start_suite.get('parentSuiteUUID')
+            suites = []
+            for depth, name in enumerate(start_suite['suiteNames']):
+                suite_uuid = self.__new_uuid()
+                suites.append({'suiteUUID': suite_uuid, 'parentUUID': parent, 'localSuiteName': name,
+                               'fullSuitePath': start_suite['suiteNames'][:depth + 1]})
+                parent = suite_uuid
+            return web.json_response(suites)
+        if path.endswith('/attachment'):
+            return web.Response(text=self.__new_uuid())
+        if request.method == 'PUT' or '/test-run/start/' in path:
+            return web.Response(status=200)
+        return web.json_response(self.__new_uuid())
+
+    def __new_uuid(self) -> str:
+        new_uuid = str(uuid.uuid4())
+        if self.__record:
+            self.__issued.add(new_uuid)
+        return new_uuid
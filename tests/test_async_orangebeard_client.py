@@ -0,0 +1,86 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from orangebeard.AsyncOrangebeardClient import AsyncOrangebeardClient
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+from tests.mock_listener import MockListener
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _client(listener: MockListener, **settings) -> AsyncOrangebeardClient:
+    config = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                   project='project')
+    for key, value in settings.items():
+        setattr(config, key, value)
+    return AsyncOrangebeardClient(orangebeard_config=config)
+
+
+@pytest.mark.parametrize('settings, log_endpoint, log_requests', [
+    ({}, 'POST log', 2),
+    ({'logBatchSize': 100, 'logBatchDelay': 60.0}, 'POST log/batch', 1),
+])
+def test_awaited_calls_are_done_when_they_return(listener, settings, log_endpoint, log_requests):
+    async def report() -> None:
+        client = _client(listener, **settings)
+        test_run_uuid = await client.start_test_run(StartTestRun('test set', _now(), 'description'))
+        assert await client.wait_for(test_run_uuid) in listener.issued
+
+        suite_uuid = (await client.start_suite(StartSuite(test_run_uuid, ['suite', 'nested'])))[-1]
+        test_uuid = await client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+        assert listener.counts()['POST test/start'] == 1
+
+        client.log_nowait(Log(test_run_uuid, test_uuid, 'first', LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _now()))
+        started = time.monotonic()
+        log_uuid = await client.log(Log(test_run_uuid, test_uuid, 'second', LogLevel.INFO, LogFormat.PLAIN_TEXT,
+                                        None, _now()))
+        assert time.monotonic() - started < 5
+        assert await client.wait_for(log_uuid) in listener.issued
+        assert listener.counts()[log_endpoint] == log_requests
+
+        await client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+        assert listener.counts()['PUT test/finish/{id}'] == 1
+        await client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+        assert client.stats()['calls']['failed'] == 0
+
+    asyncio.run(report())
+
+    counts = listener.counts()
+    assert counts['POST suite/start'] == 1
+    assert counts['PUT test-run/finish/{id}'] == 1
+
+
+def test_nowait_calls_are_sent_by_finish_test_run(listener):
+    async def report() -> None:
+        client = _client(listener, logBatchSize=10)
+        test_run_uuid = client.start_test_run_nowait(StartTestRun('test set', _now(), 'description'))
+        suite_uuid = client.start_suite_nowait(StartSuite(test_run_uuid, ['suite']))[-1]
+        for i in range(20):
+            test_uuid = client.start_test_nowait(StartTest(test_run_uuid, suite_uuid, f'test {i}', _now(), Type.TEST))
+            client.log_nowait(Log(test_run_uuid, test_uuid, 'log', LogLevel.INFO, LogFormat.PLAIN_TEXT, None,
+                                  _now()))
+            client.finish_test_nowait(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+        assert listener.requests == 0
+        await client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    asyncio.run(report())
+
+    counts = listener.counts()
+    assert counts['POST test/start'] == 20
+    assert counts['PUT test/finish/{id}'] == 20
+    assert counts['PUT test-run/finish/{id}'] == 1
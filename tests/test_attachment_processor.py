@@ -0,0 +1,72 @@
+import gzip
+import os
+
+from orangebeard.AttachmentProcessor import AttachmentProcessor
+from orangebeard.entity.Attachment import AttachmentFile
+
+_TEXT = b'a line of log output\n' * 500
+
+
+def _log_file(tmp_path, name: str, content: bytes = _TEXT) -> AttachmentFile:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return AttachmentFile.from_path(str(path))
+
+
+def test_compressible_content_is_gzipped():
+    file = AttachmentFile('output.txt', _TEXT)
+
+    prepared = AttachmentProcessor().prepare(file)
+
+    assert prepared.name == 'output.txt.gz'
+    assert prepared.contentType == 'application/gzip'
+    assert gzip.decompress(prepared.content) == _TEXT
+
+
+def test_small_incompressible_and_binary_content_is_left_alone():
+    processor = AttachmentProcessor()
+    files = [AttachmentFile('small.txt', b'short'), AttachmentFile('random.txt', os.urandom(4096)),
+             AttachmentFile('image.png', _TEXT)]
+
+    for file in files:
+        assert processor.prepare(file) is file
+
+
+def test_large_files_are_compressed_into_temporary_files(tmp_path):
+    processor = AttachmentProcessor()
+    first = processor.prepare(_log_file(tmp_path, 'first.log'))
+    second = processor.prepare(_log_file(tmp_path, 'second.log'))
+
+    assert first.name == 'first.log.gz' and second.name == 'second.log.gz'
+    assert first.path == second.path, 'identical content is compressed once'
+    with gzip.open(first.path) as content:
+        assert content.read() == _TEXT
+
+    processor.close()
+    assert not os.path.exists(first.path)
+
+
+def test_evicted_temporary_file_is_kept_until_released(tmp_path):
+    processor = AttachmentProcessor(cache_size=1)
+    first = processor.prepare(_log_file(tmp_path, 'first.log'))
+    again = processor.prepare(_log_file(tmp_path, 'again.log'))
+    second = processor.prepare(_log_file(tmp_path, 'second.log', _TEXT * 2))
+    assert os.path.exists(first.path), 'evicted while two uploads still use it'
+
+    processor.release(first)
+    assert os.path.exists(first.path)
+    processor.release(again)
+    assert not os.path.exists(first.path)
+
+    processor.release(second)
+    assert os.path.exists(second.path), 'still cached'
+    processor.close()
+    assert not os.path.exists(second.path)
+
+
+def test_releasing_files_that_were_not_compressed_does_nothing(tmp_path):
+    processor = AttachmentProcessor()
+    file = _log_file(tmp_path, 'small.log', b'short')
+
+    processor.release(processor.prepare(file))
+    assert os.path.exists(file.path)
@@ -0,0 +1,64 @@
+import os
+from datetime import datetime, timezone
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+from tests.mock_listener import MockListener
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def test_reader_opens_the_file_anew_every_time(tmp_path):
+    path = tmp_path / 'output.bin'
+    path.write_bytes(b'content')
+    file = AttachmentFile.from_path(str(path))
+
+    for _ in range(2):
+        with file.reader() as content:
+            assert content.read() == b'content'
+    assert (file.name, file.content, file.contentType) == ('output.bin', None, 'application/octet-stream')
+
+
+def test_streamed_attachments_are_sent_in_full_on_retry(tmp_path):
+    contents = [os.urandom(256 * 1024) for _ in range(5)]
+    for i, content in enumerate(contents):
+        (tmp_path / f'{i}.bin').write_bytes(content)
+
+    with MockListener(latency=0, error_rate=0.5, seed=7, record=True) as listener:
+        config = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                       project='project')
+        client = OrangebeardClient(orangebeard_config=config, retry_policy=RetryPolicy(
+            max_attempts=20, base_delay=0.001, max_delay=0.001, failure_threshold=100))
+        test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+        suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+        test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+        for i in range(len(contents)):
+            log_uuid = client.log(Log(test_run_uuid, test_uuid, f'file {i}', LogLevel.INFO, LogFormat.PLAIN_TEXT,
+                                      None, _now()))
+            client.send_attachment(Attachment(AttachmentFile.from_path(str(tmp_path / f'{i}.bin')),
+                                              AttachmentMetaData(test_run_uuid, test_uuid, log_uuid)))
+        client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+        client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+        assert client.stats()['calls']['failed'] == 0
+        assert listener.counts()['POST attachment'] > len(contents), 'some uploads were retried'
+        uploads = [body for endpoint, _, body in listener.received if endpoint == 'POST attachment']
+        assert len(uploads) == len(contents)
+        for content in contents:
+            assert sum(content in body for body in uploads) == 1
+        sent = client.stats()['endpoints']['POST attachment']['bytes_sent']
+        assert sent >= listener.counts()['POST attachment'] * len(contents[0])
@@ -0,0 +1,71 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+from tests.mock_listener import MockListener
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _client(listener: MockListener) -> OrangebeardClient:
+    return OrangebeardClient(orangebeard_config=OrangebeardParameters(
+        token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint, project='project',
+        background_loop=True))
+
+
+def _loop_threads() -> list[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name == 'orangebeard-event-loop']
+
+
+def test_start_calls_return_before_the_listener_answers(listener):
+    listener.latency = 0.3
+    threads_before = len(_loop_threads())
+    client = _client(listener)
+    assert len(_loop_threads()) == threads_before + 1
+
+    started = time.monotonic()
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+    client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    assert time.monotonic() - started < 0.3
+    assert not client.resolutions[test_uuid].is_set()
+
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+    assert time.monotonic() - started >= 4 * 0.3, 'each call waits for its parent'
+    assert listener.counts()['PUT test/finish/{id}'] == 1
+    assert len(_loop_threads()) == threads_before
+    assert client.close() is None
+
+
+def test_close_stops_the_loop_without_finishing(listener):
+    threads_before = len(_loop_threads())
+    client = _client(listener)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    while not client.resolutions[test_run_uuid].is_set():
+        time.sleep(0.01)
+    client.close()
+
+    assert len(_loop_threads()) == threads_before
+    assert 'PUT test-run/finish/{id}' not in listener.counts()
+    client.close()
+
+
+def test_close_before_any_request(listener):
+    threads_before = len(_loop_threads())
+    client = _client(listener)
+    client.close()
+
+    assert len(_loop_threads()) == threads_before
+    assert listener.requests == 0
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.mock_listener import MockListener
+
+_ROOT = Path(__file__).resolve().parent.parent
+_TOKEN = '00000000-0000-0000-0000-000000000000'
+_RUN_UUID = '11111111-1111-1111-1111-111111111111'
+
+
+def _cli(listener: MockListener, *args: str, stdin: str = '') -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, '-m', 'orangebeard.Cli', '-e', listener.endpoint, '-t', _TOKEN,
+                           '-p', 'project', *args], cwd=_ROOT, input=stdin, capture_output=True, text=True,
+                          timeout=60)
+
+
+def test_logging_empty_stdin_to_a_running_test(listener):
+    result = _cli(listener, '-x', 'log', '-id', _RUN_UUID, '--testUuid', '22222222-2222-2222-2222-222222222222')
+
+    assert result.returncode == 0, result.stderr
+    assert 'Logged 0 lines in 0 logs' in result.stderr
+    assert listener.requests == 0
+
+
+def test_importing_an_empty_file_into_a_running_test_run(listener, tmp_path):
+    results = tmp_path / 'results.ndjson'
+    results.write_text('')
+
+    result = _cli(listener, '-x', 'import', '-id', _RUN_UUID, '-f', str(results))
+
+    assert result.returncode == 0, result.stderr
+    assert 'Imported 0 tests' in result.stdout
+    assert listener.requests == 0
+
+
+def test_logging_stdin_to_a_new_test(listener):
+    result = _cli(listener, '-x', 'log', '-id', _RUN_UUID, '--window', '0.01',
+                  stdin='first line\nsecond line\n')
+
+    assert result.returncode == 0, result.stderr
+    counts = listener.counts()
+    assert counts['POST test/start'] == 1
+    assert counts['PUT test/finish/{id}'] == 1
+    assert 'Logged 2 lines' in result.stderr
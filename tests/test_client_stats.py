@@ -0,0 +1,106 @@
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from orangebeard.ClientStats import ClientStats, to_prometheus
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTestRun import StartTestRun
+
+
+@pytest.mark.parametrize('method, uri, endpoint', [
+    ('POST', 'listener/v3/project/test-run/start', 'POST test-run/start'),
+    ('PUT', 'listener/v3/my-project/test/finish/0b1c2d3e-4f50-6172-8394-a5b6c7d8e9f0', 'PUT test/finish/{id}'),
+    ('PUT', '/listener/v3/project/test-run/start/0B1C2D3E-4F50-6172-8394-A5B6C7D8E9F0', 'PUT test-run/start/{id}'),
+    ('POST', 'listener/v3/project/log/batch', 'POST log/batch'),
+])
+def test_endpoint_names(method, uri, endpoint):
+    assert ClientStats.endpoint(method, uri) == endpoint
+
+
+def test_counters_and_latency_histogram():
+    stats = ClientStats()
+    hooked = []
+    stats.add_hook(lambda *args: hooked.append(args))
+    stats.record_request('POST log', 200, 0.003, 100, False)
+    stats.record_request('POST log', 500, 0.2, 100, False)
+    stats.record_request('POST log', None, 40.0, 100, True)
+    stats.record_blocked(0.5)
+    stats.record_blocked(0.25)
+
+    snapshot = stats.snapshot()
+    log = snapshot['endpoints']['POST log']
+    assert (log['requests'], log['retries'], log['bytes_sent']) == (3, 1, 300)
+    assert log['statuses'] == {'200': 1, '500': 1, 'error': 1}
+    buckets = log['latency_seconds']['buckets']
+    assert (buckets['0.005'], buckets['0.1'], buckets['0.25'], buckets['30.0'], buckets['+Inf']) == (1, 1, 2, 2, 3)
+    assert log['latency_seconds']['sum'] == pytest.approx(40.203)
+    assert snapshot['blocked'] == {'seconds': 0.75, 'calls': 2}
+    assert hooked == [('POST log', 200, 0.003, 100), ('POST log', 500, 0.2, 100), ('POST log', None, 40.0, 100)]
+
+
+def test_prometheus_text():
+    stats = ClientStats()
+    stats.record_request('PUT test/finish/{id}', 200, 0.02, 10, False)
+    snapshot = stats.snapshot()
+    snapshot['calls'] = {'succeeded': 1, 'failed': 0}
+    snapshot['pending'] = {'queued_requests': 2}
+
+    lines = to_prometheus(snapshot).splitlines()
+    assert 'orangebeard_client_requests_total{endpoint="PUT test/finish/{id}",status="200"} 1' in lines
+    assert 'orangebeard_client_request_duration_seconds_bucket{endpoint="PUT test/finish/{id}",le="0.01"} 0' in lines
+    assert 'orangebeard_client_request_duration_seconds_bucket{endpoint="PUT test/finish/{id}",le="0.025"} 1' in lines
+    assert 'orangebeard_client_request_duration_seconds_count{endpoint="PUT test/finish/{id}"} 1' in lines
+    assert 'orangebeard_client_calls_total{outcome="succeeded"} 1' in lines
+    assert 'orangebeard_client_pending{kind="queued_requests"} 2' in lines
+    assert '# TYPE orangebeard_client_request_duration_seconds histogram' in lines
+    samples = [line for line in lines if not line.startswith('#')]
+    assert all(re.fullmatch(r'orangebeard_client_\w+(\{.*})? \S+', line) for line in samples)
+
+
+def test_label_values_are_escaped():
+    stats = ClientStats()
+    stats.record_request('POST "odd"\\path\n', 200, 0.01, 0, False)
+
+    assert 'endpoint="POST \\"odd\\"\\\\path\\n"' in to_prometheus(stats.snapshot())
+
+
+def _report(listener, stats_file: str) -> OrangebeardClient:
+    config = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                   project='project', stats_file=stats_file)
+    client = OrangebeardClient(orangebeard_config=config,
+                               retry_policy=RetryPolicy(max_attempts=20, base_delay=0.001, max_delay=0.001,
+                                                        failure_threshold=100))
+    test_run_uuid = client.start_test_run(StartTestRun('test set', datetime.now(timezone.utc), 'description'))
+    client.start_suite(StartSuite(test_run_uuid, ['suite']))
+    client.finish_test_run(test_run_uuid, FinishTestRun(datetime.now(timezone.utc)))
+    return client
+
+
+def test_client_counts_requests_and_retries(listener, tmp_path):
+    listener.throttle_rate = 0.3
+    listener.retry_after = 0.001
+    client = _report(listener, str(tmp_path / 'stats.json'))
+
+    snapshot = client.stats()
+    requests = sum(stats['requests'] for stats in snapshot['endpoints'].values())
+    retries = sum(stats['retries'] for stats in snapshot['endpoints'].values())
+    assert requests == listener.requests
+    assert retries == listener.statuses().get(429, 0)
+    assert snapshot['calls']['succeeded'] == 3
+    assert snapshot['blocked']['calls'] >= 3
+    with open(tmp_path / 'stats.json', encoding='utf-8') as stats_file:
+        assert json.load(stats_file)['endpoints'].keys() == snapshot['endpoints'].keys()
+
+
+def test_stats_file_in_prometheus_format(listener, tmp_path):
+    _report(listener, str(tmp_path / 'stats.prom'))
+
+    text = (tmp_path / 'stats.prom').read_text()
+    assert 'orangebeard_client_requests_total{endpoint="POST suite/start",status="200"} 1' in text
+    assert 'orangebeard_client_calls_total{outcome="succeeded"} 3' in text
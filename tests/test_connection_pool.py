@@ -0,0 +1,64 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.config.AutoConfig import get_config
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartTestRun import StartTestRun
+
+_TOKEN = '00000000-0000-0000-0000-000000000000'
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _session(client: OrangebeardClient):
+    return client._OrangebeardClient__client
+
+
+def test_pool_settings_configure_the_session(listener):
+    config = OrangebeardParameters(token=_TOKEN, endpoint=listener.endpoint, project='project', connection_limit=7,
+                                   connection_limit_per_host=3, keepalive_timeout=5.0, dns_cache_ttl=60,
+                                   connect_timeout=2.0, read_timeout=9.0)
+    client = OrangebeardClient(orangebeard_config=config)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+
+    connector = _session(client).connector
+    assert (connector.limit, connector.limit_per_host) == (7, 3)
+    assert connector._keepalive_timeout == 5.0
+    assert connector._cached_hosts._ttl == 60
+    timeout = _session(client).timeout
+    assert (timeout.total, timeout.sock_connect, timeout.sock_read) == (None, 2.0, 9.0)
+
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+    assert _session(client).closed
+
+
+def test_pool_settings_are_read_from_the_config_file(tmp_path, monkeypatch):
+    monkeypatch.delenv('ORANGEBEARD_ENDPOINT', raising=False)
+    (tmp_path / 'orangebeard.json').write_text(json.dumps({'connectionLimit': 10, 'readTimeout': 1.5}))
+
+    config = get_config(str(tmp_path))
+
+    assert (config.connectionLimit, config.readTimeout) == (10, 1.5)
+    assert (config.connectionLimitPerHost, config.keepaliveTimeout, config.dnsCacheTtl, config.connectTimeout) \
+        == (0, 30.0, 300, 30.0)
+
+
+def test_read_timeout_ends_attempts_at_a_slow_listener(listener):
+    listener.latency = 2.0
+    config = OrangebeardParameters(token=_TOKEN, endpoint=listener.endpoint, project='project', read_timeout=0.1)
+    client = OrangebeardClient(orangebeard_config=config, retry_policy=RetryPolicy(
+        max_attempts=2, base_delay=0.001, max_delay=0.001, failure_threshold=100))
+
+    started = time.monotonic()
+    client.start_test_run(StartTestRun('test set', _now(), 'description'))
+
+    assert time.monotonic() - started < 1.5
+    assert listener.counts()['POST test-run/start'] == 2
+    assert client.stats()['calls']['failed'] == 1
+    client.close()
@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+
+import pytest
+
+from orangebeard.EntityRegistry import EntityRegistry
+
+
+def _registered_run(registry: EntityRegistry) -> tuple[uuid.UUID, uuid.UUID]:
+    run_uuid, test_uuid = uuid.uuid4(), uuid.uuid4()
+    registry.register(run_uuid, real_uuid=run_uuid)
+    registry.register(test_uuid, run_uuid)
+    return run_uuid, test_uuid
+
+
+def test_finished_test_is_released_once_nothing_below_it_is_pending():
+    registry = EntityRegistry()
+    run_uuid, test_uuid = _registered_run(registry)
+    log_uuid = uuid.uuid4()
+    registry.register(log_uuid, test_uuid)
+    registry.resolve(test_uuid, uuid.uuid4())
+
+    registry.close(test_uuid)
+    assert test_uuid in registry and log_uuid in registry
+
+    registry.resolve(log_uuid, uuid.uuid4())
+    assert test_uuid not in registry and log_uuid not in registry
+    assert run_uuid in registry
+    assert len(registry) == 1
+
+
+def test_closed_calls_are_released_as_soon_as_they_resolve():
+    registry = EntityRegistry()
+    _, test_uuid = _registered_run(registry)
+    log_uuid, attachment_uuid = uuid.uuid4(), uuid.uuid4()
+    registry.register(log_uuid, test_uuid, closed=True)
+    registry.register(attachment_uuid, log_uuid, closed=True)
+
+    registry.resolve(log_uuid, uuid.uuid4())
+    assert log_uuid in registry
+
+    registry.resolve(attachment_uuid, uuid.uuid4())
+    assert log_uuid not in registry and attachment_uuid not in registry
+    assert test_uuid in registry
+
+
+def test_released_calls_stay_resolvable():
+    registry = EntityRegistry()
+    _, test_uuid = _registered_run(registry)
+    real_uuid = uuid.uuid4()
+    registry.resolve(test_uuid, real_uuid)
+    registry.close(test_uuid)
+
+    assert test_uuid not in registry
+    resolution = registry[test_uuid]
+    assert resolution.is_set()
+    assert asyncio.run(resolution.wait()) == real_uuid
+
+
+def test_unknown_calls_are_not_resolvable():
+    registry = EntityRegistry()
+
+    assert registry.get(uuid.uuid4()) is None
+    with pytest.raises(KeyError):
+        registry[uuid.uuid4()]
+
+
+def test_calls_below_a_released_entity_are_released_once_resolved():
+    registry = EntityRegistry()
+    _, test_uuid = _registered_run(registry)
+    registry.resolve(test_uuid, uuid.uuid4())
+    registry.close(test_uuid)
+
+    late_log_uuid = uuid.uuid4()
+    registry.register(late_log_uuid, test_uuid)
+    assert late_log_uuid in registry
+    registry.resolve(late_log_uuid, uuid.uuid4())
+    assert late_log_uuid not in registry
+
+    known_uuid = uuid.uuid4()
+    registry.register(known_uuid, test_uuid, real_uuid=known_uuid)
+    assert known_uuid not in registry
+    assert registry[known_uuid].real_uuid == known_uuid
+
+
+def test_only_the_last_released_calls_are_remembered():
+    registry = EntityRegistry(max_released=2)
+    run_uuid = uuid.uuid4()
+    registry.register(run_uuid, real_uuid=run_uuid)
+    log_uuids = [uuid.uuid4() for _ in range(3)]
+    for log_uuid in log_uuids:
+        registry.register(log_uuid, run_uuid, closed=True)
+        registry.resolve(log_uuid, uuid.uuid4())
+
+    assert registry.get(log_uuids[0]) is None
+    assert registry.get(log_uuids[1]) is not None
+    assert registry.get(log_uuids[2]) is not None
+
+
+def test_has_children():
+    registry = EntityRegistry()
+    _, test_uuid = _registered_run(registry)
+    log_uuid = uuid.uuid4()
+    registry.register(log_uuid, test_uuid)
+
+    assert registry.has_children(test_uuid)
+    assert not registry.has_children(log_uuid)
+    assert not registry.has_children(uuid.uuid4())
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+
+import orangebeard
+
+
+def _loaded_modules(code: str) -> set[str]:
+    """The modules of interest that running the code in a fresh interpreter leaves loaded."""
+    output = subprocess.run([sys.executable, '-c', code + '\nimport sys\nprint(" ".join(sys.modules))'],
+                            capture_output=True, text=True, check=True).stdout
+    return set(output.split()) & {'aiohttp', 'orangebeard.OrangebeardClient', 'orangebeard.AsyncOrangebeardClient'}
+
+
+def test_importing_the_package_loads_no_client():
+    assert _loaded_modules('import orangebeard') == set()
+
+
+def test_importing_the_client_does_not_load_aiohttp():
+    assert _loaded_modules('from orangebeard import OrangebeardClient') == {'orangebeard.OrangebeardClient'}
+    assert 'aiohttp' not in _loaded_modules('from orangebeard.OrangebeardClient import OrangebeardClient\n'
+                                            'from orangebeard.AsyncOrangebeardClient import AsyncOrangebeardClient')
+
+
+def test_importing_the_cli_does_not_load_aiohttp():
+    assert 'aiohttp' not in _loaded_modules('import orangebeard.Cli')
+
+
+def test_the_config_is_looked_up_on_first_use():
+    code = 'from orangebeard.config import AutoConfig\nprint("config" in vars(AutoConfig))\n'
+    output = subprocess.run([sys.executable, '-c', code + 'AutoConfig.config\nprint("config" in vars(AutoConfig))'],
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.split() == ['False', 'True']
+
+
+def test_package_attributes_are_the_client_classes():
+    from orangebeard.OrangebeardLogHandler import OrangebeardLogHandler
+
+    assert orangebeard.OrangebeardLogHandler is OrangebeardLogHandler
+    with pytest.raises(AttributeError):
+        _ = orangebeard.Unknown
+
+
+def test_package_attributes_stay_classes_once_their_modules_are_imported():
+    code = ('import orangebeard.AsyncOrangebeardClient\n'
+            'from orangebeard import AsyncOrangebeardClient, OrangebeardClient\n'
+            'print(isinstance(AsyncOrangebeardClient, type), isinstance(OrangebeardClient, type))')
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.split() == ['True', 'True']
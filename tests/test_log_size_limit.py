@@ -0,0 +1,97 @@
+import gzip
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+from tests.mock_listener import MockListener
+
+_MESSAGE = ''.join(f'line {i}\n' for i in range(1000))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _send_logs(listener: MockListener, messages: list, **settings) -> tuple[list[str], list[bytes]]:
+    """Send logs with the given messages; returns the messages the listener got and the attachment bodies."""
+    config = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                   project='project')
+    for key, value in settings.items():
+        setattr(config, key, value)
+    client = OrangebeardClient(orangebeard_config=config)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+    for message in messages:
+        client.log(Log(test_run_uuid, test_uuid, message, LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _now()))
+    client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+    assert client.stats()['calls']['failed'] == 0
+
+    sent_messages, attachments = [], []
+    for endpoint, _, body in listener.received:
+        if endpoint == 'POST log':
+            sent_messages.append(json.loads(body)['message'])
+        elif endpoint == 'POST log/batch':
+            sent_messages.extend(log['message'] for log in json.loads(body))
+        elif endpoint == 'POST attachment':
+            attachments.append(body)
+    return sent_messages, attachments
+
+
+@pytest.mark.parametrize('log_batch_size', [1, 10])
+def test_long_message_is_cut_down_and_attached_in_full(listener, log_batch_size):
+    (message,), (attachment,) = _send_logs(listener, [_MESSAGE], logSizeLimit=1000, logBatchSize=log_batch_size)
+
+    assert len(message) <= 1000
+    cut = re.fullmatch(r'(.*?)\n\n\[\.\.\. (\d+) of (\d+) characters left out, the full message is attached as '
+                       r'log-message\.txt\.gz \.\.\.]\n\n(.*)', message, re.DOTALL)
+    head, left_out, total, tail = cut.groups()
+    assert _MESSAGE.startswith(head) and _MESSAGE.endswith(tail)
+    assert 0 <= len(head) - 3 * len(tail) < 4, 'three quarters of what is kept is the start'
+    assert int(total) == len(_MESSAGE)
+    assert int(left_out) == len(_MESSAGE) - len(head) - len(tail)
+    assert b'log-message.txt.gz' in attachment
+    assert gzip.compress(_MESSAGE.encode(), mtime=0) in attachment
+
+
+def test_limit_shorter_than_the_marker_keeps_only_the_marker(listener):
+    (message,), _ = _send_logs(listener, [_MESSAGE], logSizeLimit=10)
+
+    assert message.strip().startswith(f'[... {len(_MESSAGE)} of {len(_MESSAGE)} characters left out')
+
+
+def test_messages_within_the_limit_are_sent_as_they_are(listener):
+    messages, attachments = _send_logs(listener, ['x' * 1000, _MESSAGE], logSizeLimit=1000)
+
+    assert messages[0] == 'x' * 1000
+    assert len(messages[1]) <= 1000
+    assert len(attachments) == 1
+
+
+def test_messages_are_not_cut_down_without_a_limit(listener):
+    messages, attachments = _send_logs(listener, [_MESSAGE], logSizeLimit=None)
+
+    assert messages == [_MESSAGE]
+    assert attachments == []
+
+
+def test_messages_that_are_not_str(listener):
+    messages, attachments = _send_logs(listener, [None, 42, ValueError('failed'), ''], logSizeLimit=1000)
+
+    assert messages == ['_empty_', '42', 'failed', '_empty_']
+    assert attachments == []
@@ -0,0 +1,193 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from tests.mock_listener import MockListener
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+
+_TOKEN = '00000000-0000-0000-0000-000000000000'
+
+
+def _client(listener: MockListener, retry_policy: RetryPolicy = None, **settings) -> OrangebeardClient:
+    config = OrangebeardParameters(token=_TOKEN, endpoint=listener.endpoint, project='project')
+    for key, value in settings.items():
+        setattr(config, key, value)
+    return OrangebeardClient(orangebeard_config=config, retry_policy=retry_policy)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _report_tests(client: OrangebeardClient, test_run_uuid, tests: int, threads: int) -> list[threading.Thread]:
+    def worker(first: int) -> None:
+        for i in range(first, tests, threads):
+            suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['shared', f's{i % 3}']))[-1]
+            test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, f'test {i}', _now(), Type.TEST))
+            client.log(Log(test_run_uuid, test_uuid, f'log {i}', LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _now()))
+            client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+
+    workers = [threading.Thread(target=worker, args=(first,), daemon=True) for first in range(threads)]
+    for thread in workers:
+        thread.start()
+    return workers
+
+
+def _report_from_threads(**settings) -> dict[str, int]:
+    with MockListener(latency=0.001) as listener:
+        client = _client(listener, **settings)
+        test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+        workers = _report_tests(client, test_run_uuid, tests=200, threads=16)
+        deadline = time.monotonic() + 60
+        for thread in workers:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        assert not any(thread.is_alive() for thread in workers), 'threads sharing the client got stuck'
+        client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+        assert client.stats()['calls']['failed'] == 0
+        return listener.counts()
+
+
+def test_threads_share_a_client_without_background_loop():
+    counts = _report_from_threads()
+
+    assert counts['POST suite/start'] == 3
+    assert counts['POST test/start'] == 200
+    assert counts['PUT test/finish/{id}'] == 200
+
+
+def test_threads_share_a_client_with_background_loop():
+    counts = _report_from_threads(backgroundLoop=True)
+
+    assert counts['POST suite/start'] == 3
+    assert counts['POST test/start'] == 200
+
+
+def test_failed_and_throttled_requests_are_retried():
+    retry_policy = RetryPolicy(max_attempts=10, base_delay=0.001, max_delay=0.01, failure_threshold=1000)
+    with MockListener(latency=0.001, error_rate=0.2, throttle_rate=0.2, retry_after=0.001, seed=1) as listener:
+        client = _client(listener, retry_policy)
+        test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+        workers = _report_tests(client, test_run_uuid, tests=50, threads=4)
+        for thread in workers:
+            thread.join(timeout=60)
+        client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+        assert client.stats()['calls']['failed'] == 0
+        assert listener.statuses().keys() >= {200, 429, 500}
+        assert listener.counts()['PUT test/finish/{id}'] > 50
+
+
+def _report_logs_to(listener: MockListener, logs: int, attachments: int = 0, **settings) -> OrangebeardClient:
+    client = _client(listener, **settings)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+    for i in range(logs):
+        log_uuid = client.log(Log(test_run_uuid, test_uuid, f'log {i}', LogLevel.INFO, LogFormat.PLAIN_TEXT, None,
+                                  _now()))
+        if i < attachments:
+            client.send_attachment(Attachment(AttachmentFile(f'{i}.txt', b'content'),
+                                              AttachmentMetaData(test_run_uuid, test_uuid, log_uuid)))
+    client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+    return client
+
+
+def _report_logs(logs: int, attachments: int, log_batch: bool = True, **settings) -> dict[str, int]:
+    with MockListener(latency=0.001, log_batch=log_batch) as listener:
+        client = _report_logs_to(listener, logs, attachments, **settings)
+
+        assert client.stats()['calls']['failed'] == 0
+        assert client.stats()['calls']['dropped'] == 0
+        return listener.counts()
+
+
+def test_logs_are_sent_one_by_one_by_default():
+    counts = _report_logs(logs=250, attachments=0)
+
+    assert counts['POST log'] == 250
+    assert 'POST log/batch' not in counts
+
+
+def test_logs_are_batched_with_log_batch_size():
+    counts = _report_logs(logs=250, attachments=0, logBatchSize=100)
+
+    assert 'POST log' not in counts
+    assert counts['POST log/batch'] == 3
+
+
+def test_logs_are_combined_without_a_batch_endpoint():
+    counts = _report_logs(logs=250, attachments=0, log_batch=False, logBatchSize=100)
+
+    assert counts['POST log/batch'] <= 3
+    assert 1 <= counts['POST log'] < 250
+
+
+def test_attachments_of_batched_logs_are_sent():
+    counts = _report_logs(logs=50, attachments=10, logBatchSize=100)
+
+    assert counts['POST attachment'] == 10
+    assert 'POST log' not in counts
+
+
+def test_coalesce_window_is_ignored_without_background_loop(listener):
+    client = _client(listener, coalesceWindow=60.0)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+
+    assert listener.counts().get('POST test/start') == 1
+    client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+
+def test_coalesce_window_holds_test_starts_back_with_background_loop(listener):
+    client = _client(listener, backgroundLoop=True, coalesceWindow=0.2)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    short_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'short', _now(), Type.TEST))
+    client.finish_test(short_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    long_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'long', _now(), Type.TEST))
+    time.sleep(0.5)
+
+    assert listener.counts().get('POST test/start') == 2
+    client.finish_test(long_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    endpoints = [endpoint for endpoint, _, _ in listener.received]
+    assert endpoints.index('PUT test/finish/{id}') == endpoints.index('POST test/start') + 1
+
+
+def test_finishing_reports_the_call_outcomes(listener, capsys):
+    _report_logs_to(listener, logs=3)
+
+    assert 'Orangebeard calls: 8 succeeded, 0 failed, 0 dropped, 0 spooled' in capsys.readouterr().out
+
+
+def test_drain_timeout_bounds_the_log_flush(listener, capsys):
+    client = _client(listener, logBatchSize=100, logBatchDelay=60.0, drainTimeout=0.2)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+    client.log(Log(test_run_uuid, test_uuid, 'log', LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _now()))
+    listener.latency = 1.0
+
+    started = time.monotonic()
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    assert time.monotonic() - started < 1.9, 'only the finish call itself waits for the listener'
+    assert client.stats()['calls']['dropped'] == 1
+    assert 'Stopped waiting for 1 Orangebeard calls after 0.2 seconds' in capsys.readouterr().out
@@ -0,0 +1,133 @@
+import logging
+import threading
+import uuid
+
+import pytest
+
+from orangebeard.OrangebeardLogHandler import OrangebeardLogHandler
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogLevel import LogLevel
+
+_RUN_UUID, _TEST_UUID, _STEP_UUID = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+class _RecordingClient:
+    def __init__(self) -> None:
+        self.logs: list[Log] = []
+
+    def log(self, log: Log) -> None:
+        self.logs.append(log)
+
+
+@pytest.fixture
+def client():
+    return _RecordingClient()
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger(f'test.{uuid.uuid4()}')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def _attach(logger: logging.Logger, handler: OrangebeardLogHandler) -> OrangebeardLogHandler:
+    logger.addHandler(handler)
+    return handler
+
+
+@pytest.mark.parametrize('levelno, level', [
+    (logging.CRITICAL, LogLevel.ERROR),
+    (logging.ERROR, LogLevel.ERROR),
+    (logging.WARNING, LogLevel.WARN),
+    (logging.INFO, LogLevel.INFO),
+    (logging.DEBUG, LogLevel.DEBUG),
+    (5, LogLevel.DEBUG),
+])
+def test_level_of(levelno, level):
+    assert OrangebeardLogHandler.level_of(levelno) == level
+
+
+def test_records_go_to_the_test_or_step_of_their_thread(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client))
+    logger.info('before')
+    with handler.test_context(_RUN_UUID, _TEST_UUID):
+        logger.warning('in the test')
+        with handler.test_context(_RUN_UUID, _TEST_UUID, _STEP_UUID):
+            logger.info('in the step')
+            thread = threading.Thread(target=logger.info, args=('other thread',))
+            thread.start()
+            thread.join()
+    logger.info('after')
+
+    assert [(log.message, log.logLevel, log.stepUUID) for log in client.logs] == [
+        ('in the test', LogLevel.WARN, None), ('in the step', LogLevel.INFO, _STEP_UUID)]
+    assert all(log.testUUID == _TEST_UUID for log in client.logs)
+
+
+def test_repeated_records_are_collapsed(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client))
+    with handler.test_context(_RUN_UUID, _TEST_UUID):
+        for _ in range(5):
+            logger.info('polling')
+        logger.info('done')
+        logger.info('done')
+
+    assert [log.message for log in client.logs] == [
+        'polling', 'Previous message repeated 4 more times', 'done', 'Previous message repeated 1 more times']
+
+
+def test_repeats_are_sent_on_flush(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client))
+    handler.set_context(_RUN_UUID, _TEST_UUID)
+    logger.info('polling')
+    logger.info('polling')
+    handler.flush()
+
+    assert [log.message for log in client.logs] == ['polling', 'Previous message repeated 1 more times']
+
+
+def test_records_over_the_rate_are_dropped_and_counted(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client, rate=0.001, burst=3, fold=False))
+    with handler.test_context(_RUN_UUID, _TEST_UUID):
+        for i in range(10):
+            logger.info(f'record {i}')
+
+    assert [log.message for log in client.logs] == [
+        'record 0', 'record 1', 'record 2', '7 log messages were dropped to stay within 0.001 per second']
+    assert client.logs[-1].logLevel == LogLevel.WARN
+
+
+def test_dropped_records_are_reported_on_flush(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client, rate=0.001, burst=1, fold=False))
+    handler.set_context(_RUN_UUID, _TEST_UUID, _STEP_UUID)
+    logger.info('first')
+    logger.info('second')
+    handler.flush()
+    handler.flush()
+
+    assert [log.message for log in client.logs] == [
+        'first', '1 log messages were dropped to stay within 0.001 per second']
+    assert client.logs[-1].stepUUID == _STEP_UUID
+
+
+def test_errors_are_never_dropped(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client, rate=0.001, burst=1, fold=False))
+    with handler.test_context(_RUN_UUID, _TEST_UUID):
+        logger.info('first')
+        logger.info('second')
+        logger.error('failure')
+        logger.critical('crash')
+
+    assert [log.message for log in client.logs] == [
+        'first', '1 log messages were dropped to stay within 0.001 per second', 'failure', 'crash']
+
+
+def test_records_below_the_level_are_ignored(client, logger):
+    handler = _attach(logger, OrangebeardLogHandler(client, level=logging.INFO))
+    with handler.test_context(_RUN_UUID, _TEST_UUID):
+        logger.debug('details')
+        logger.info('summary')
+
+    assert [log.message for log in client.logs] == ['summary']
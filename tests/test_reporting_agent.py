@@ -0,0 +1,78 @@
+import json
+import multiprocessing
+from datetime import datetime, timezone
+from uuid import UUID
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.ReportingAgent import AgentClient, ReportingAgent
+from orangebeard.Spool import UUID_PATTERN
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishStep import FinishStep
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartStep import StartStep
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+
+_TOKEN = '00000000-0000-0000-0000-000000000000'
+_WORKERS = 3
+_TESTS = 10
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _report(address, authkey: bytes, test_run_uuid: UUID, worker: int) -> None:
+    client = AgentClient(address, authkey)
+    for i in range(_TESTS):
+        suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['shared', f'worker {worker}']))[-1]
+        test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, f'test {i}', _now(), Type.TEST))
+        step_uuid = client.start_step(StartStep(test_run_uuid, test_uuid, 'step', _now()))
+        log_uuid = client.log(Log(test_run_uuid, test_uuid, f'log {i}', LogLevel.INFO, LogFormat.PLAIN_TEXT,
+                                  step_uuid, _now()))
+        client.send_attachment(Attachment(AttachmentFile(f'{worker}-{i}.txt', b'content'),
+                                          AttachmentMetaData(test_run_uuid, test_uuid, log_uuid, step_uuid)))
+        client.finish_step(step_uuid, FinishStep(test_run_uuid, Status.PASSED, _now()))
+        client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.close()
+
+
+def test_workers_report_through_one_client(listener):
+    config = OrangebeardParameters(token=_TOKEN, endpoint=listener.endpoint, project='project', background_loop=True)
+    client = OrangebeardClient(orangebeard_config=config)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    agent = ReportingAgent(client)
+    agent.start()
+
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_report, args=(agent.address, agent.authkey, test_run_uuid, worker))
+               for worker in range(_WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    assert all(worker.exitcode == 0 for worker in workers)
+    agent.stop()
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    counts = listener.counts()
+    for endpoint in ('POST test/start', 'POST step/start', 'POST log', 'POST attachment', 'PUT step/finish/{id}',
+                     'PUT test/finish/{id}'):
+        assert counts[endpoint] == _WORKERS * _TESTS, endpoint
+    assert client.stats()['calls']['failed'] == 0
+
+    started_suites = [name for endpoint, _, body in listener.received if endpoint == 'POST suite/start'
+                      for name in json.loads(body)['suiteNames']]
+    assert sorted(started_suites) == ['shared'] + [f'worker {worker}' for worker in range(_WORKERS)]
+
+    issued = listener.issued | {_TOKEN}
+    for _, path, body in listener.received:
+        assert set(UUID_PATTERN.findall(path + body.decode(errors='replace'))) <= issued
@@ -0,0 +1,104 @@
+import asyncio
+
+from orangebeard.RequestScheduler import RequestPriority, RequestScheduler
+
+
+async def _hold(scheduler: RequestScheduler, priority: RequestPriority, name: str, admitted: list[str],
+                release: asyncio.Event) -> None:
+    async with scheduler.slot(priority):
+        admitted.append(name)
+        await release.wait()
+
+
+def test_slots_are_bounded():
+    async def scenario():
+        scheduler = RequestScheduler(asyncio.get_running_loop(), max_in_flight=2)
+        admitted, release = [], asyncio.Event()
+        for name in 'abc':
+            scheduler.submit(_hold(scheduler, RequestPriority.LOG, name, admitted, release))
+        await asyncio.sleep(0)
+
+        assert admitted == ['a', 'b']
+        assert scheduler.in_flight == 2
+        assert scheduler.queue_depth == 1
+        release.set()
+        await scheduler.drain()
+        assert admitted == ['a', 'b', 'c']
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiting_requests_are_admitted_by_priority_then_arrival():
+    async def scenario():
+        scheduler = RequestScheduler(asyncio.get_running_loop(), max_in_flight=1)
+        admitted, release = [], asyncio.Event()
+        scheduler.submit(_hold(scheduler, RequestPriority.LOG, 'busy', admitted, release))
+        await asyncio.sleep(0)
+        for name, priority in (('log 1', RequestPriority.LOG), ('attachment', RequestPriority.ATTACHMENT),
+                               ('finish', RequestPriority.FINISH), ('log 2', RequestPriority.LOG),
+                               ('start', RequestPriority.START)):
+            scheduler.submit(_hold(scheduler, priority, name, admitted, release))
+        await asyncio.sleep(0)
+
+        release.set()
+        await scheduler.drain()
+        assert admitted == ['busy', 'start', 'finish', 'log 1', 'log 2', 'attachment']
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        scheduler = RequestScheduler(asyncio.get_running_loop(), max_in_flight=1)
+        admitted, release = [], asyncio.Event()
+        scheduler.submit(_hold(scheduler, RequestPriority.LOG, 'busy', admitted, release))
+        await asyncio.sleep(0)
+        cancelled = scheduler.submit(_hold(scheduler, RequestPriority.START, 'cancelled', admitted, release))
+        scheduler.submit(_hold(scheduler, RequestPriority.LOG, 'waiting', admitted, release))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+        release.set()
+        await scheduler.drain()
+        assert admitted == ['busy', 'waiting']
+        assert scheduler.in_flight == 0
+        assert scheduler.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_drain_waits_for_calls_submitted_while_draining():
+    async def scenario():
+        scheduler = RequestScheduler(asyncio.get_running_loop())
+        done = []
+
+        async def call(name: str, follow_up: bool) -> None:
+            await asyncio.sleep(0.01)
+            done.append(name)
+            if follow_up:
+                scheduler.submit(call('follow-up', False))
+
+        scheduler.submit(call('first', True))
+        assert await scheduler.drain() == 0
+        assert done == ['first', 'follow-up']
+        assert scheduler.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_drain_timeout_cancels_remaining_calls():
+    async def scenario():
+        scheduler = RequestScheduler(asyncio.get_running_loop())
+        fast = scheduler.submit(asyncio.sleep(0.01))
+        slow = scheduler.submit(asyncio.sleep(10))
+        reports = []
+
+        assert await scheduler.drain(timeout=0.1, report=reports.append, report_interval=0.05) == 1
+        assert fast.done() and not fast.cancelled()
+        assert slow.cancelled()
+        assert reports and all(count == 1 for count in reports)
+
+    asyncio.run(scenario())
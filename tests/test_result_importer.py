@@ -0,0 +1,91 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.ResultImporter import ResultImporter, read_junit, read_ndjson
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+
+_FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+_JUNIT = os.path.join(_FIXTURES, 'results.xml')
+_NDJSON = os.path.join(_FIXTURES, 'results.ndjson')
+_ATTACHMENT = os.path.join(_FIXTURES, 'attachments', 'user.json')
+_START = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+
+
+def test_read_junit():
+    tests = list(read_junit(_JUNIT))
+
+    assert [(test.suite_path, test.name, test.status) for test in tests] == [
+        (['api', 'users'], 'creates a user', Status.PASSED),
+        (['api', 'users'], 'deletes a user', Status.FAILED),
+        (['api', 'api.Health'], 'is healthy', Status.FAILED),
+        (['api'], 'is documented', Status.SKIPPED),
+        (['ui'], 'renders', Status.PASSED),
+    ]
+    created, deleted, healthy, documented, renders = tests
+    assert created.logs == [(LogLevel.INFO, 'created user 1')]
+    assert created.attachments == [_ATTACHMENT]
+    assert deleted.logs == [(LogLevel.ERROR, 'AssertionError: expected 204\n\nTraceback: line 12'),
+                            (LogLevel.WARN, 'connection reset')]
+    assert healthy.logs == [(LogLevel.ERROR, 'TimeoutError')]
+    assert documented.logs == [(LogLevel.INFO, 'not ready')]
+    assert renders.end_time - renders.start_time == timedelta(seconds=1000)
+
+
+def test_read_junit_times_test_cases_one_after_the_other():
+    created, deleted, healthy, documented, _ = read_junit(_JUNIT)
+
+    assert created.start_time == _START
+    assert created.end_time == deleted.start_time == _START + timedelta(seconds=0.5)
+    assert deleted.end_time == _START + timedelta(seconds=1.75)
+    assert healthy.start_time == _START, 'the outer suite has its own cursor'
+    assert documented.start_time == healthy.end_time
+
+
+def test_read_ndjson_skips_malformed_lines(capsys):
+    tests = list(read_ndjson(_NDJSON))
+
+    assert [(test.suite_path, test.name, test.status) for test in tests] == [
+        (['api', 'users'], 'creates a user', Status.PASSED),
+        (['api', 'users'], 'deletes a user', Status.FAILED),
+        (['ui'], 'renders', Status.SKIPPED),
+        (['tests'], 'no suite', Status.PASSED),
+    ]
+    skipped = [line for line in capsys.readouterr().out.splitlines() if line.startswith('Skipping line')]
+    assert [line.split(' of ')[0] for line in skipped] == ['Skipping line 5', 'Skipping line 6', 'Skipping line 7']
+
+
+def test_read_ndjson_fields():
+    created, deleted, renders, _ = read_ndjson(_NDJSON)
+
+    assert created.attachments == [_ATTACHMENT]
+    assert created.end_time == _START + timedelta(seconds=0.5)
+    assert deleted.start_time == deleted.end_time == created.end_time
+    assert deleted.logs == [(LogLevel.ERROR, 'expected 204'), (LogLevel.INFO, 'cleanup done')]
+    assert renders.description == 'the start page'
+    assert renders.end_time - renders.start_time == timedelta(seconds=2)
+
+
+def test_importing_reports_every_test_once_per_suite_path(listener):
+    config = OrangebeardParameters(token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint,
+                                   project='project', background_loop=True)
+    client = OrangebeardClient(orangebeard_config=config)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _START, 'description'))
+
+    importer = ResultImporter(client, test_run_uuid)
+    importer.report(read_junit(_JUNIT))
+    client.finish_test_run(test_run_uuid, FinishTestRun(datetime.now(timezone.utc)))
+
+    assert importer.counts == {'tests': 5, 'logs': 5, 'attachments': 1}
+    counts = listener.counts()
+    assert counts['POST test/start'] == 5
+    assert counts['PUT test/finish/{id}'] == 5
+    assert counts['POST attachment'] == 1
+    suite_starts = [json.loads(body) for endpoint, _, body in listener.received if endpoint == 'POST suite/start']
+    started_paths = sorted(tuple(start['suiteNames']) for start in suite_starts)
+    assert started_paths == [('api', 'users'), ('api.Health',), ('ui',)]
@@ -0,0 +1,112 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from orangebeard.RetryPolicy import CircuitState, RetryPolicy
+
+
+def test_backoff_stays_within_bounds():
+    random.seed(1)
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    delay = None
+    for _ in range(100):
+        previous = delay
+        delay = policy.backoff(previous)
+        assert 0.5 <= delay <= 4.0
+        assert delay <= max(0.5, (previous or 0.5) * 3)
+
+
+def test_backoff_grows_up_to_the_cap():
+    random.seed(1)
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    delays = [policy.backoff(None)]
+    for _ in range(20):
+        delays.append(policy.backoff(delays[-1]))
+
+    assert max(delays) > 3.0
+    assert max(delays) <= 8.0
+
+
+@pytest.mark.parametrize('status, headers, expected', [
+    (429, {'Retry-After': '2'}, 2.0),
+    (503, {'Retry-After': '1.5'}, 1.5),
+    (429, {'Retry-After': '120'}, 16.0),
+    (429, {'Retry-After': '-3'}, 0.0),
+    (503, {}, None),
+    (503, {'Other': 'header'}, None),
+    (500, {'Retry-After': '2'}, None),
+    (429, {'Retry-After': 'soon'}, None),
+])
+def test_retry_after_seconds(status, headers, expected):
+    assert RetryPolicy(max_delay=16.0).retry_after(status, headers) == expected
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+
+    delay = RetryPolicy().retry_after(429, {'Retry-After': format_datetime(retry_at, usegmt=True)})
+    assert 3.0 <= delay <= 5.0
+
+
+def test_throttling_without_retry_after_backs_off():
+    delay = RetryPolicy(base_delay=0.5, max_delay=4.0).retry_after(429, {'Other': 'header'})
+    assert 0.5 <= delay <= 1.5
+
+
+@pytest.mark.parametrize('status, retryable, failure', [
+    (None, True, True),
+    (408, True, False),
+    (429, True, False),
+    (500, True, True),
+    (503, True, False),
+    (400, False, False),
+    (404, False, False),
+])
+def test_classification(status, retryable, failure):
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(status) == retryable
+    assert policy.is_failure(status) == failure
+
+
+def test_circuit_opens_after_consecutive_failures():
+    policy = RetryPolicy(failure_threshold=3, recovery_time=60.0)
+    for _ in range(2):
+        policy.record_failure()
+    policy.record_success()
+    for _ in range(2):
+        policy.record_failure()
+    assert policy.state is CircuitState.CLOSED
+    assert policy.attempt_delay() == 0.0
+
+    policy.record_failure()
+    assert policy.state is CircuitState.OPEN
+    assert policy.attempt_delay() is None
+
+
+def test_half_open_circuit_lets_a_single_probe_through():
+    policy = RetryPolicy(base_delay=0.25, failure_threshold=1, recovery_time=0.05)
+    policy.record_failure()
+    time.sleep(0.06)
+
+    assert policy.attempt_delay() == 0.0
+    assert policy.state is CircuitState.HALF_OPEN
+    assert policy.attempt_delay() == 0.25
+
+    policy.record_success()
+    assert policy.state is CircuitState.CLOSED
+    assert policy.attempt_delay() == 0.0
+
+
+def test_failed_probe_reopens_the_circuit():
+    policy = RetryPolicy(failure_threshold=1, recovery_time=0.05)
+    policy.record_failure()
+    time.sleep(0.06)
+    assert policy.attempt_delay() == 0.0
+
+    policy.record_failure()
+    assert policy.state is CircuitState.OPEN
+    assert policy.attempt_delay() is None
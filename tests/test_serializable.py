@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+from orangebeard.entity.Attribute import Attribute
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.Serializable import Serializable
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestType import TestType as Type
+
+_UUID = UUID(int=1)
+_TIME = datetime(2024, 5, 1, 10, 0, 0, 250000, tzinfo=timezone.utc)
+
+
+def test_fields_are_written_in_slot_order_without_none_values():
+    log = Log(_UUID, _UUID, 'café', LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _TIME)
+
+    assert log.to_json() == (
+        '{"testRunUUID": "00000000-0000-0000-0000-000000000001", '
+        '"testUUID": "00000000-0000-0000-0000-000000000001", "logTime": "2024-05-01T10:00:00.250000+0000", '
+        '"message": "caf\\u00e9", "logLevel": "INFO", "logFormat": "PLAIN_TEXT"}')
+
+
+def test_nested_entities_keep_their_none_values():
+    start_test_run = StartTestRun('set', _TIME, None, [Attribute('key', 'value'), Attribute('tag')])
+
+    assert start_test_run.to_json() == (
+        '{"testSetName": "set", "startTime": "2024-05-01T10:00:00.250000+0000", '
+        '"attributes": [{"key": "key", "value": "value"}, {"key": null, "value": "tag"}]}')
+
+
+def test_output_matches_json_dumps_of_the_fields():
+    start_test = StartTest(_UUID, _UUID, 'test', _TIME, Type.TEST, 'description', [Attribute('key', 'value')])
+
+    assert start_test.to_json() == json.dumps({
+        'testRunUUID': str(_UUID), 'suiteUUID': str(_UUID), 'testName': 'test', 'testType': 'TEST',
+        'description': 'description', 'attributes': [{'key': 'key', 'value': 'value'}],
+        'startTime': '2024-05-01T10:00:00.250000+0000'})
+
+
+def test_subclasses_serialize_inherited_fields_first():
+    class Base(Serializable):
+        __slots__ = ('first', 'second')
+
+    class Derived(Base):
+        __slots__ = ('third',)
+
+    entity = Derived()
+    entity.first, entity.second, entity.third = 1, None, 3
+
+    assert Derived._fields == ('first', 'second', 'third')
+    assert entity.to_json() == '{"first": 1, "third": 3}'
+
+
+def test_unset_slots_are_skipped():
+    class Partial(Serializable):
+        __slots__ = ('first', 'second')
+
+    entity = Partial()
+    entity.second = 2
+
+    assert entity.to_json() == '{"second": 2}'
+
+
+def test_classes_without_slots_are_serialized_from_their_dict():
+    config = OrangebeardParameters(token='token', project='project')
+    config.extra = 'value'
+
+    serialized = json.loads(config.to_json())
+
+    assert (serialized['token'], serialized['project'], serialized['extra']) == ('token', 'project', 'value')
+    assert 'endpoint' not in serialized
+
+
+def test_missing_fields_raise_key_error():
+    log = Log(_UUID, _UUID, 'message', LogLevel.INFO, LogFormat.PLAIN_TEXT, None, _TIME)
+
+    assert log['message'] == 'message'
+    with pytest.raises(KeyError, match=r'\[unknown] not found in Log'):
+        _ = log['unknown']
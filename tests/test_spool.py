@@ -0,0 +1,123 @@
+import glob
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.RetryPolicy import RetryPolicy
+from orangebeard.Spool import Spool, UUID_PATTERN, read_spool
+from orangebeard.entity.Attachment import Attachment, AttachmentFile, AttachmentMetaData
+from orangebeard.entity.FinishTest import FinishTest
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.Log import Log
+from orangebeard.entity.LogFormat import LogFormat
+from orangebeard.entity.LogLevel import LogLevel
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTest import StartTest
+from orangebeard.entity.StartTestRun import StartTestRun
+from orangebeard.entity.TestStatus import TestStatus as Status
+from orangebeard.entity.TestType import TestType as Type
+from tests.mock_listener import MockListener
+
+_TOKEN = '00000000-0000-0000-0000-000000000000'
+
+
+def _client(listener: MockListener, **settings) -> OrangebeardClient:
+    config = OrangebeardParameters(token=_TOKEN, endpoint=listener.endpoint, project='project')
+    for key, value in settings.items():
+        setattr(config, key, value)
+    return OrangebeardClient(orangebeard_config=config,
+                             retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _spool_test_run(listener: MockListener, spool_directory: str, **settings) -> OrangebeardClient:
+    listener.error_rate = 1.0
+    client = _client(listener, spoolDirectory=spool_directory, **settings)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+    suite_uuid = client.start_suite(StartSuite(test_run_uuid, ['suite']))[-1]
+    test_uuid = client.start_test(StartTest(test_run_uuid, suite_uuid, 'test', _now(), Type.TEST))
+    for i in range(5):
+        log_uuid = client.log(Log(test_run_uuid, test_uuid, f'log {i}', LogLevel.INFO, LogFormat.PLAIN_TEXT, None,
+                                  _now()))
+    client.send_attachment(Attachment(AttachmentFile('output.txt', b'content'),
+                                      AttachmentMetaData(test_run_uuid, test_uuid, log_uuid)))
+    client.finish_test(test_uuid, FinishTest(test_run_uuid, Status.PASSED, _now()))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+    listener.error_rate = 0.0
+    return client
+
+
+def _replay(listener: MockListener, spool_file: str) -> None:
+    client = _client(listener)
+    client.replay_spool(spool_file)
+    client.close()
+
+
+def _replayed(listener: MockListener) -> list[str]:
+    """The endpoints of the requests the listener answered, checking they only refer to UUIDs it handed out."""
+    issued = listener.issued
+    for _, path, body in listener.received:
+        referred = set(UUID_PATTERN.findall(path)) | set(UUID_PATTERN.findall(body.decode(errors='replace')))
+        assert referred <= issued | {_TOKEN}, 'a temporary UUID was sent'
+    return [endpoint for endpoint, _, _ in listener.received]
+
+
+def test_spool_round_trip(tmp_path):
+    with MockListener(latency=0, record=True) as listener:
+        client = _spool_test_run(listener, str(tmp_path))
+        assert client.stats()['calls']['spooled'] == 11
+        assert listener.received == []
+        spool_file, = glob.glob(str(tmp_path / 'orangebeard-spool-*.ndjson'))
+
+        _replay(listener, spool_file)
+
+        endpoints = _replayed(listener)
+        assert endpoints[:3] == ['POST test-run/start', 'POST suite/start', 'POST test/start']
+        assert sorted(endpoints[3:-1]) == ['POST attachment'] + ['POST log'] * 5 + ['PUT test/finish/{id}']
+        assert endpoints[-1] == 'PUT test-run/finish/{id}'
+
+
+@pytest.mark.parametrize('log_batch, batches, logs', [(True, 1, 0), (False, 0, 5)])
+def test_spooled_log_batches_are_replayed(tmp_path, log_batch, batches, logs):
+    with MockListener(latency=0, record=True, log_batch=log_batch) as listener:
+        _spool_test_run(listener, str(tmp_path), logBatchSize=10)
+        spool_file, = glob.glob(str(tmp_path / 'orangebeard-spool-*.ndjson'))
+
+        _replay(listener, spool_file)
+
+        endpoints = _replayed(listener)
+        assert endpoints.count('POST log/batch') == batches
+        assert endpoints.count('POST log') == logs
+        assert 'POST attachment' in endpoints
+
+
+def test_spooling_client_cannot_replay(tmp_path):
+    with MockListener(latency=0) as listener:
+        client = _spool_test_run(listener, str(tmp_path))
+        spool_file, = glob.glob(str(tmp_path / 'orangebeard-spool-*.ndjson'))
+
+        with pytest.raises(RuntimeError):
+            client.replay_spool(spool_file)
+
+
+def test_spool_keeps_calls_and_attachment_content_in_order(tmp_path):
+    spool = Spool(str(tmp_path / 'spool'))
+    assert spool.path is None
+
+    spool.append('POST', 'listener/v3/project/log', '{"message": "first"}', ['placeholder'])
+    spool.append('POST', 'listener/v3/project/attachment', '{}', ['other'], AttachmentFile('a.txt', b'content'))
+    spool.close()
+
+    first, attachment = read_spool(spool.path)
+    assert spool.count == 2
+    assert (first['method'], json.loads(first['body']), first['placeholders']) == \
+        ('POST', {'message': 'first'}, ['placeholder'])
+    assert attachment['file']['name'] == 'a.txt'
+    with open(attachment['file']['path'], 'rb') as content:
+        assert content.read() == b'content'
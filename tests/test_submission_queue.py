@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+from orangebeard.SubmissionQueue import SubmissionQueue
+
+
+def test_calls_of_each_thread_run_in_order_on_the_loop_thread():
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    queue = SubmissionQueue(loop)
+    calls: list[tuple[int, int, threading.Thread]] = []
+
+    def producer(number: int) -> None:
+        for sequence in range(1000):
+            queue.put(lambda *call: calls.append(call + (threading.current_thread(),)), number, sequence)
+
+    producers = [threading.Thread(target=producer, args=(number,)) for number in range(8)]
+    for thread in producers:
+        thread.start()
+    for thread in producers:
+        thread.join()
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    loop_thread.join()
+    loop.close()
+
+    assert len(calls) == 8000
+    assert len(queue) == 0
+    assert all(thread is loop_thread for _, _, thread in calls)
+    for number in range(8):
+        assert [sequence for producer_number, sequence, _ in calls if producer_number == number] == list(range(1000))
+
+
+def test_failing_call_does_not_hold_up_later_calls():
+    loop = asyncio.new_event_loop()
+    errors, calls = [], []
+    loop.set_exception_handler(lambda _, context: errors.append(context['exception']))
+    queue = SubmissionQueue(loop)
+
+    def fail() -> None:
+        raise ValueError('failed')
+
+    queue.put(fail)
+    queue.put(calls.append, 'after')
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+    assert calls == ['after']
+    assert [str(error) for error in errors] == ['failed']
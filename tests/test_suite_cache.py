@@ -0,0 +1,66 @@
+import json
+from datetime import datetime, timezone
+
+from orangebeard.OrangebeardClient import OrangebeardClient
+from orangebeard.entity.FinishTestRun import FinishTestRun
+from orangebeard.entity.OrangebeardParameters import OrangebeardParameters
+from orangebeard.entity.StartSuite import StartSuite
+from orangebeard.entity.StartTestRun import StartTestRun
+from tests.mock_listener import MockListener
+
+
+def _client(listener: MockListener) -> OrangebeardClient:
+    return OrangebeardClient(orangebeard_config=OrangebeardParameters(
+        token='00000000-0000-0000-0000-000000000000', endpoint=listener.endpoint, project='project'))
+
+
+def _suite_starts(listener: MockListener) -> list[dict]:
+    return [json.loads(body) for endpoint, _, body in listener.received if endpoint == 'POST suite/start']
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def test_started_suite_paths_are_not_started_again(listener):
+    client = _client(listener)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+
+    first = client.start_suite(StartSuite(test_run_uuid, ['api', 'users']))
+    again = client.start_suite(StartSuite(test_run_uuid, ['api', 'users']))
+    parent = client.start_suite(StartSuite(test_run_uuid, ['api']))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    assert again == first
+    assert parent == first[:1]
+    assert [start['suiteNames'] for start in _suite_starts(listener)] == [['api', 'users']]
+
+
+def test_only_the_unknown_part_of_a_path_is_started(listener):
+    client = _client(listener)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+
+    api_uuid, users_uuid = client.start_suite(StartSuite(test_run_uuid, ['api', 'users']))
+    orders = client.start_suite(StartSuite(test_run_uuid, ['api', 'orders', 'open']))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    assert orders[0] == api_uuid
+    assert len(set(orders)) == 3 and users_uuid not in orders
+    first, second = _suite_starts(listener)
+    assert second['suiteNames'] == ['orders', 'open']
+    assert second['parentSuiteUUID'] == client.resolutions[api_uuid].real_uuid
+    assert first.get('parentSuiteUUID') is None
+
+
+def test_paths_are_cached_per_parent(listener):
+    client = _client(listener)
+    test_run_uuid = client.start_test_run(StartTestRun('test set', _now(), 'description'))
+
+    api_uuid = client.start_suite(StartSuite(test_run_uuid, ['api']))[0]
+    nested = client.start_suite(StartSuite(test_run_uuid, ['api'], parentSuiteUUID=api_uuid))
+    nested_again = client.start_suite(StartSuite(test_run_uuid, ['api'], parentSuiteUUID=api_uuid))
+    client.finish_test_run(test_run_uuid, FinishTestRun(_now()))
+
+    assert nested == nested_again
+    assert nested[0] != api_uuid
+    assert len(_suite_starts(listener)) == 2
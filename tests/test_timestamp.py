@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytz
+
+from orangebeard.entity import Timestamp as timestamp_module
+from orangebeard.entity.Timestamp import Timestamp, now
+
+_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+_FORMAT_WITHOUT_FRACTION = '%Y-%m-%dT%H:%M:%S%z'
+
+
+@pytest.mark.parametrize('moment', [
+    datetime(2024, 5, 1, 10, 30, 15, 123456),
+    datetime(2024, 5, 1, 10, 30, 15),
+    datetime(2024, 5, 1, 10, 30, 15, 999999, tzinfo=timezone.utc),
+    datetime(2024, 12, 31, 23, 59, 59, 1, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(2024, 1, 1, 0, 0, 0, 500000, tzinfo=timezone(timedelta(hours=-3, minutes=-30))),
+    datetime(2024, 5, 1, 10, 30, 15, 42, tzinfo=timezone(timedelta(hours=1, seconds=15))),
+    pytz.timezone('Europe/Amsterdam').localize(datetime(2024, 3, 31, 3, 0, 0, 7)),
+    datetime(1969, 7, 20, 20, 17, 40, 250000, tzinfo=timezone.utc),
+    datetime(2024, 5, 1, 10, 30, 15, 123456).astimezone(),
+])
+def test_of_formats_like_strftime(moment):
+    assert str(Timestamp.of(moment)) == moment.strftime(_FORMAT)
+    assert str(Timestamp.of(moment, fraction=False)) == moment.strftime(_FORMAT_WITHOUT_FRACTION)
+
+
+def test_of_converts_precision():
+    moment = datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=timezone.utc)
+    with_fraction = Timestamp.of(moment)
+
+    assert Timestamp.of(with_fraction) is with_fraction
+    assert str(Timestamp.of(with_fraction, fraction=False)) == '2024-05-01T10:30:15+0000'
+    assert with_fraction.epoch_micros == int(moment.timestamp()) * 1_000_000 + 123456
+
+
+def test_consecutive_timestamps_in_the_same_second():
+    first = datetime(2024, 5, 1, 10, 30, 15, 1, tzinfo=timezone.utc)
+    second = first + timedelta(microseconds=5)
+    other_offset = second.astimezone(timezone(timedelta(hours=2)))
+
+    assert str(Timestamp.of(first)) == '2024-05-01T10:30:15.000001+0000'
+    assert str(Timestamp.of(second)) == '2024-05-01T10:30:15.000006+0000'
+    assert str(Timestamp.of(other_offset)) == '2024-05-01T12:30:15.000006+0200'
+
+
+def test_now_is_the_local_time():
+    before = datetime.now().astimezone()
+    current = now()
+    after = datetime.now().astimezone()
+
+    # the clock is anchored up to 15 minutes ago, so it may have drifted a little from the wall clock since
+    assert before.timestamp() - 1 <= current.epoch_micros / 1_000_000 <= after.timestamp() + 1
+    assert str(current)[-5:] == before.strftime('%z')
+
+
+class _Clocks:
+    def __init__(self) -> None:
+        self.monotonic = 1_000 * 1_000_000_000
+        self.wall = 1_714_557_600 * 1_000_000_000
+
+    def advance(self, seconds: float, wall_jump: float = 0.0) -> None:
+        self.monotonic += int(seconds * 1_000_000_000)
+        self.wall += int((seconds + wall_jump) * 1_000_000_000)
+
+
+@pytest.fixture
+def clocks(monkeypatch):
+    clocks = _Clocks()
+    monkeypatch.setattr(timestamp_module, '_clock', (None, 0, 0))
+    monkeypatch.setattr(time, 'monotonic_ns', lambda: clocks.monotonic)
+    monkeypatch.setattr(time, 'time_ns', lambda: clocks.wall)
+    return clocks
+
+
+def test_now_follows_the_monotonic_clock_between_checks(clocks):
+    first = now().epoch_micros
+    clocks.advance(10, wall_jump=-3600)
+
+    assert now().epoch_micros - first == 10_000_000
+
+
+def test_now_is_anchored_to_the_wall_clock_again_every_15_minutes(clocks):
+    first = now().epoch_micros
+    clocks.advance(10, wall_jump=3600)
+    clocks.advance(900)
+
+    assert now().epoch_micros - first == (3600 + 910) * 1_000_000
+
+
+def test_now_is_anchored_again_when_the_monotonic_clock_goes_back(clocks):
+    first = now().epoch_micros
+    clocks.monotonic -= 1_000_000_000
+    clocks.wall += 5_000_000_000
+
+    assert now().epoch_micros - first == 5_000_000
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+from orangebeard.UuidResolution import UuidResolution
+
+
+def test_known_uuid_is_resolved_at_once():
+    async def scenario():
+        real_uuid = uuid.uuid4()
+        resolution = UuidResolution(real_uuid)
+
+        assert resolution.is_set()
+        assert await resolution.wait() == real_uuid
+
+    asyncio.run(scenario())
+
+
+def test_waiters_wake_up_on_resolve():
+    async def scenario():
+        resolution = UuidResolution()
+        waiters = [asyncio.create_task(resolution.wait()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert not any(waiter.done() for waiter in waiters)
+
+        real_uuid = uuid.uuid4()
+        resolution.resolve(real_uuid)
+        assert await asyncio.gather(*waiters) == [real_uuid] * 3
+        assert resolution.real_uuid == real_uuid
+
+    asyncio.run(scenario())
+
+
+def test_failed_call_resolves_to_none():
+    async def scenario():
+        resolution = UuidResolution()
+        resolution.resolve(None)
+
+        assert resolution.is_set()
+        assert await resolution.wait() is None
+
+    asyncio.run(scenario())
+
+
+def test_deferred_call_is_made_once_by_the_first_waiter():
+    async def scenario():
+        resolution = UuidResolution()
+        real_uuid = uuid.uuid4()
+        claims = []
+
+        async def call() -> None:
+            resolution.resolve(real_uuid)
+
+        def claim():
+            claims.append(real_uuid)
+            return call()
+
+        resolution.defer(claim)
+        assert await asyncio.gather(resolution.wait(), resolution.wait()) == [real_uuid, real_uuid]
+        assert claims == [real_uuid]
+
+    asyncio.run(scenario())
+
+
+def test_deferred_call_claimed_elsewhere_is_waited_for():
+    async def scenario():
+        resolution = UuidResolution()
+        resolution.defer(lambda: None)
+        waiter = asyncio.create_task(resolution.wait())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        real_uuid = uuid.uuid4()
+        resolution.resolve(real_uuid)
+        assert await waiter == real_uuid
+
+    asyncio.run(scenario())